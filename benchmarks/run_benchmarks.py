@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from typing import Callable, List, Optional
+
+from benchmarks.synthetic_data import SyntheticDataGenerator
+from src.metrics import MetricsRecorder
+
+
+class BenchmarkSuite:
+    """
+    Clase para medir el tiempo y la memoria máxima de cada etapa del flujo sobre datos sintéticos
+    de distintos tamaños y compararlos con una línea base guardada.
+
+    Etapas medidas:
+        - 'process_data': lectura por bloques, limpieza, unión y eliminación de duplicados (DataLoader).
+        - 'sentiment_scores': preprocesamiento y cálculo de puntuaciones (SentimentAnalysis).
+        - 'aggregate_book_data': agregación por libro para los rankings (BestBooks).
+    """
+
+    STAGES = ["process_data", "sentiment_scores", "aggregate_book_data"]
+    DEFAULT_SCALES = [10_000, 100_000, 1_000_000, 10_000_000]
+    DEFAULT_TOLERANCE = 0.2
+    # Por debajo de este tiempo las diferencias son ruido de medición
+    MIN_SECONDS = 0.1
+
+    def __init__(
+        self,
+        work_path: str,
+        scales: Optional[List[int]] = None,
+        stages: Optional[List[str]] = None,
+        seed: int = 0,
+        trace_memory: bool = False
+    ):
+        """
+        Inicializa la batería de pruebas.
+
+        Args:
+            work_path (str): Carpeta de trabajo para los datos sintéticos y las salidas.
+            scales (List[int], opcional): Números de reseñas a medir. Por defecto, de 10 mil a 10 millones.
+            stages (List[str], opcional): Etapas a medir. Por defecto, todas.
+            seed (int): Semilla de los datos sintéticos.
+            trace_memory (bool): Si es True, mide también el pico de memoria reservada por Python con
+                tracemalloc. Es más preciso por etapa, pero ralentiza las etapas con mucho código Python.
+        """
+        self.work_path = work_path
+        self.scales = scales or self.DEFAULT_SCALES
+        self.stages = stages or self.STAGES
+        unknown = set(self.stages) - set(self.STAGES)
+        if unknown:
+            raise ValueError(f"Etapas desconocidas: {sorted(unknown)}. Use algunas de {self.STAGES}.")
+        self.seed = seed
+        self.trace_memory = trace_memory
+
+    def run(self) -> dict:
+        """
+        Ejecuta las etapas en cada escala.
+
+        Returns:
+            dict: Resultados con las claves 'environment' y 'scales' (métricas por escala y etapa).
+        """
+        results = {"environment": self._environment(), "scales": {}}
+        for n_reviews in self.scales:
+            print(f"\n=== Escala: {n_reviews} reseñas ===")
+            data_path = self._prepare_data(n_reviews)
+            results["scales"][str(n_reviews)] = self._run_scale(data_path, n_reviews)
+        return results
+
+    def _prepare_data(self, n_reviews: int) -> str:
+        """
+        Genera los datos sintéticos de una escala, reutilizándolos si ya existen.
+        """
+        data_path = os.path.join(self.work_path, f"data_{n_reviews}_{self.seed}")
+        files = [os.path.join(data_path, name) for name in ("books_data.csv", "books_rating.csv")]
+        if not all(os.path.exists(path) for path in files):
+            SyntheticDataGenerator(n_reviews, seed=self.seed).generate(data_path)
+        return data_path
+
+    def _run_scale(self, data_path: str, n_reviews: int) -> dict:
+        """
+        Mide las etapas configuradas sobre los datos de una escala.
+        """
+        # Importaciones diferidas: la configuración de rutas debe estar definida antes de crear las clases
+        os.environ["DATA_PATH"] = data_path
+        os.environ["OUTPUT_PATH"] = os.path.join(self.work_path, "output")
+        os.makedirs(os.environ["OUTPUT_PATH"], exist_ok=True)
+        from src.data_loader import DataLoader
+        from src.sentiment_analysis import SentimentAnalysis
+        from src.book_stats import BookStats
+        from src.best_books import BestBooks
+
+        metrics = {}
+        state = {}
+
+        def process_data():
+            loader = DataLoader()
+            state["processed"], state["unmatched"] = loader.process_data(loader.load_data(streaming=True))
+            state["text_store"] = loader.text_store
+            return n_reviews, len(state["processed"])
+
+        def sentiment_scores():
+            sentiment_analyzer = SentimentAnalysis(state["processed"], text_store=state["text_store"])
+            sentiment_analyzer.preprocess_text()
+            sentiment_analyzer.calculate_sentiment_scores()
+            return len(state["processed"]), len(state["processed"])
+
+        def aggregate_book_data():
+            best_books = BestBooks(state["processed"], book_stats=BookStats(state["processed"]))
+            books = best_books._aggregate_book_data()
+            return len(state["processed"]), len(books)
+
+        stage_functions = {
+            "process_data": process_data,
+            "sentiment_scores": sentiment_scores,
+            "aggregate_book_data": aggregate_book_data,
+        }
+        # Las etapas posteriores necesitan los datos procesados aunque no se midan
+        if "process_data" not in self.stages:
+            process_data()
+        for stage in self.STAGES:
+            if stage in self.stages:
+                metrics[stage] = self._measure(stage_functions[stage], self.trace_memory)
+                print(f"[{stage}] {metrics[stage]}")
+        return metrics
+
+    @staticmethod
+    def _measure(function: Callable, trace_memory: bool = False) -> dict:
+        """
+        Ejecuta una etapa y mide su tiempo de reloj, su tiempo de CPU y su memoria máxima.
+
+        'peak_mb' es la memoria residente (RSS) máxima del proceso, muestreada en un hilo durante la etapa (None fuera de
+        Linux, donde no se puede leer la memoria actual); con `trace_memory`
+        se añade el pico de memoria reservada por Python según tracemalloc.
+
+        Args:
+            function (Callable): Etapa a ejecutar; devuelve las filas de entrada y de salida.
+            trace_memory (bool): Si es True, activa tracemalloc durante la etapa.
+
+        Returns:
+            dict: Métricas de la etapa.
+        """
+        recorder = MetricsRecorder(enabled=True, live=False, trace_memory=trace_memory)
+        with recorder.stage(function.__name__) as stage:
+            stage.rows_in, stage.rows_out = function()
+        report = stage.to_dict()
+        metrics = {
+            "seconds": report["wall_seconds"],
+            "cpu_seconds": report["cpu_seconds"],
+            "peak_mb": report["peak_rss_mb"],
+            "rows_in": int(stage.rows_in),
+            "rows_out": int(stage.rows_out),
+            "rows_per_second": report["rows_per_second"],
+        }
+        if report["traced_peak_mb"] is not None:
+            metrics["traced_peak_mb"] = report["traced_peak_mb"]
+        return metrics
+
+    @staticmethod
+    def _environment() -> dict:
+        """
+        Describe el entorno de la medición, para interpretar las comparaciones con la línea base.
+        """
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+    @classmethod
+    def compare(cls, results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+        """
+        Compara los resultados con la línea base y devuelve las regresiones de tiempo o de memoria.
+
+        Args:
+            results (dict): Resultados de `run`.
+            baseline (dict): Resultados guardados como línea base.
+            tolerance (float): Aumento relativo permitido (0.2 = 20 %).
+
+        Returns:
+            List[str]: Descripción de cada regresión encontrada.
+        """
+        regressions = []
+        for scale, stages in results["scales"].items():
+            for stage, metrics in stages.items():
+                reference = baseline.get("scales", {}).get(scale, {}).get(stage)
+                if not reference:
+                    continue
+                for metric in ["seconds", "peak_mb"]:
+                    if metric == "seconds" and reference[metric] < cls.MIN_SECONDS:
+                        continue
+                    if reference[metric] and metrics[metric] is not None and metrics[metric] > reference[metric] * (1 + tolerance):
+                        change = metrics[metric] / reference[metric] - 1
+                        regressions.append(
+                            f"{stage} @ {scale}: {metric} {reference[metric]} -> {metrics[metric]} (+{change:.0%})"
+                        )
+        return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Ejecuta la batería de pruebas desde la línea de comandos.
+
+    Returns:
+        int: 1 si se encontraron regresiones respecto a la línea base, 0 en otro caso.
+    """
+    benchmarks_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Mide el rendimiento del flujo sobre datos sintéticos.")
+    parser.add_argument("--scales", type=int, nargs="+", default=BenchmarkSuite.DEFAULT_SCALES[:2],
+                        help="Números de reseñas a medir (por defecto 10000 y 100000).")
+    parser.add_argument("--stages", nargs="+", choices=BenchmarkSuite.STAGES, help="Etapas a medir (por defecto todas).")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos sintéticos.")
+    parser.add_argument("--work-path", default=os.path.join(benchmarks_path, "work"), help="Carpeta de trabajo.")
+    parser.add_argument("--baseline", default=os.path.join(benchmarks_path, "baseline.json"), help="Archivo de línea base.")
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda los resultados como nueva línea base.")
+    parser.add_argument("--tolerance", type=float, default=BenchmarkSuite.DEFAULT_TOLERANCE,
+                        help="Aumento relativo permitido antes de marcar una regresión.")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Mide también el pico de memoria de Python con tracemalloc (más lento).")
+    args = parser.parse_args(argv)
+
+    results = BenchmarkSuite(args.work_path, args.scales, args.stages, args.seed, args.trace_memory).run()
+    output = args.output or os.path.join(args.work_path, "results.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultados guardados en: {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Línea base actualizada: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No hay línea base para comparar. Use --save-baseline para crearla.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = BenchmarkSuite.compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regresiones respecto a la línea base:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("Sin regresiones respecto a la línea base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
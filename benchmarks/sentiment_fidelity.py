@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+from benchmarks.synthetic_data import SyntheticDataGenerator
+
+
+class SentimentFidelityReport:
+    """
+    Clase para comparar el motor por lotes (BatchSentimentScorer) con el analizador de referencia de
+    VADER sobre las mismas reseñas: distribución del error de 'compound', coincidencia de las
+    etiquetas de `SentimentAnalysis._classify_sentiment` y tiempo de cada motor.
+    """
+
+    # Límites de los intervalos del histograma del error absoluto de 'compound'
+    ERROR_BINS = [0.0, 1e-4, 1e-3, 1e-2, 1e-1, 2.0]
+    LABELS = ["positivo", "neutral", "negativo"]
+
+    def __init__(self, reviews: List[str]):
+        """
+        Inicializa el informe.
+
+        Args:
+            reviews (List[str]): Reseñas ya preprocesadas, como las recibe el cálculo de sentimiento.
+        """
+        self.reviews = reviews
+
+    def run(self) -> dict:
+        """
+        Puntúa las reseñas con ambos motores y compara los resultados.
+
+        Returns:
+            dict: Informe con las claves 'n_reviews', 'timing', 'exact_match_rate', 'compound_error' y 'labels'.
+        """
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        from src.batch_sentiment import BatchSentimentScorer
+        from src.sentiment_analysis import SentimentAnalysis
+
+        reference_analyzer = SentimentIntensityAnalyzer()
+        batch_scorer = BatchSentimentScorer(reference_analyzer)
+
+        print(f"Puntuando {len(self.reviews)} reseñas con VADER...")
+        start = time.perf_counter()
+        reference = [reference_analyzer.polarity_scores(review) for review in self.reviews]
+        reference_seconds = time.perf_counter() - start
+
+        print("Puntuando con el motor por lotes...")
+        start = time.perf_counter()
+        batch = []
+        for block in range(0, len(self.reviews), SentimentAnalysis.DEFAULT_CHUNK_SIZE):
+            batch.extend(batch_scorer.polarity_scores_batch(self.reviews[block:block + SentimentAnalysis.DEFAULT_CHUNK_SIZE]))
+        batch_seconds = time.perf_counter() - start
+
+        reference_compound = np.array([score["compound"] for score in reference])
+        batch_compound = np.array([score["compound"] for score in batch])
+        error = np.abs(reference_compound - batch_compound)
+        histogram, _ = np.histogram(error, bins=self.ERROR_BINS)
+
+        reference_labels = pd.Series([SentimentAnalysis._classify_sentiment(value) for value in reference_compound])
+        batch_labels = pd.Series([SentimentAnalysis._classify_sentiment(value) for value in batch_compound])
+        confusion = pd.crosstab(reference_labels, batch_labels).reindex(index=self.LABELS, columns=self.LABELS, fill_value=0)
+
+        n_reviews = len(self.reviews)
+        return {
+            "n_reviews": n_reviews,
+            "timing": {
+                "reference_seconds": round(reference_seconds, 3),
+                "batch_seconds": round(batch_seconds, 3),
+                "speedup": round(reference_seconds / batch_seconds, 1) if batch_seconds else None,
+            },
+            "exact_match_rate": sum(a == b for a, b in zip(reference, batch)) / n_reviews if n_reviews else None,
+            "compound_error": {
+                "mean": float(error.mean()) if n_reviews else None,
+                "p50": float(np.percentile(error, 50)) if n_reviews else None,
+                "p99": float(np.percentile(error, 99)) if n_reviews else None,
+                "max": float(error.max()) if n_reviews else None,
+                "histogram": {
+                    f"[{low:g}, {high:g})": int(count)
+                    for low, high, count in zip(self.ERROR_BINS[:-1], self.ERROR_BINS[1:], histogram)
+                },
+            },
+            "labels": {
+                "agreement_rate": float((reference_labels == batch_labels).mean()) if n_reviews else None,
+                "confusion": {label: confusion.loc[label].astype(int).to_dict() for label in self.LABELS},
+            },
+        }
+
+    @staticmethod
+    def load_reviews(rating_file: str, n_reviews: int, lowercase: bool = True) -> List[str]:
+        """
+        Lee las primeras reseñas de un archivo con el formato de 'books_rating'.
+
+        Args:
+            rating_file (str): Ruta del archivo CSV.
+            n_reviews (int): Número de reseñas a leer.
+            lowercase (bool): Si es True, se preprocesan como en SentimentAnalysis (minúsculas).
+
+        Returns:
+            List[str]: Reseñas.
+        """
+        texts = pd.read_csv(rating_file, usecols=["review/text"], nrows=n_reviews)["review/text"]
+        texts = texts.str.lower() if lowercase else texts
+        return texts.fillna("").tolist()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Genera el informe de fidelidad desde la línea de comandos.
+
+    Returns:
+        int: 1 si la coincidencia de etiquetas queda por debajo de `--min-agreement`, 0 en otro caso.
+    """
+    benchmarks_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Compara el motor de sentimiento por lotes con VADER.")
+    parser.add_argument("--reviews", type=int, default=100_000, help="Número de reseñas a comparar.")
+    parser.add_argument("--data", help="Archivo 'books_rating.csv' a usar (por defecto, datos sintéticos).")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos sintéticos.")
+    parser.add_argument("--raw", action="store_true", help="Compara los textos originales, sin pasarlos a minúsculas.")
+    parser.add_argument("--work-path", default=os.path.join(benchmarks_path, "work"), help="Carpeta de trabajo.")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el informe.")
+    parser.add_argument("--min-agreement", type=float, default=0.999,
+                        help="Coincidencia mínima de etiquetas aceptada (por defecto 0.999).")
+    args = parser.parse_args(argv)
+
+    rating_file = args.data
+    if not rating_file:
+        data_path = os.path.join(args.work_path, f"data_{args.reviews}_{args.seed}")
+        rating_file = os.path.join(data_path, "books_rating.csv")
+        if not os.path.exists(rating_file):
+            SyntheticDataGenerator(args.reviews, seed=args.seed).generate(data_path)
+
+    reviews = SentimentFidelityReport.load_reviews(rating_file, args.reviews, lowercase=not args.raw)
+    report = SentimentFidelityReport(reviews).run()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    output = args.output or os.path.join(args.work_path, "sentiment_fidelity.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nInforme guardado en: {output}")
+
+    if report["labels"]["agreement_rate"] is not None and report["labels"]["agreement_rate"] < args.min_agreement:
+        print(f"La coincidencia de etiquetas es menor que {args.min_agreement}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
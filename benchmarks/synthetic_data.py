@@ -0,0 +1,212 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+class SyntheticDataGenerator:
+    """
+    Clase para generar archivos 'books_data.csv' y 'books_rating.csv' sintéticos con la estructura
+    del conjunto de Amazon Books Reviews y una distribución realista:
+
+    - Reseñas por título con distribución de Zipf (pocos libros concentran la mayoría).
+    - Listas de varios autores y categorías en formato de lista de Python, con valores nulos.
+    - Textos de reseña repetidos (reseñas cortas idénticas) junto a textos compuestos al azar.
+    - Reseñas de títulos que no existen en 'books_data.csv' y filas duplicadas.
+
+    Las reseñas se escriben por bloques, por lo que se pueden generar desde 10 mil hasta 10
+    millones de filas con memoria acotada.
+    """
+
+    BOOKS_DATA_COLUMNS = [
+        "Title", "description", "authors", "image", "previewLink", "publisher",
+        "publishedDate", "infoLink", "categories", "ratingsCount",
+    ]
+    BOOKS_RATING_COLUMNS = [
+        "Id", "Title", "Price", "User_id", "profileName", "review/helpfulness",
+        "review/score", "review/time", "review/summary", "review/text",
+    ]
+    CATEGORIES = [
+        "Fiction", "History", "Biography & Autobiography", "Religion", "Juvenile Fiction",
+        "Business & Economics", "Computers", "Cooking", "Science", "Poetry", "Travel",
+        "Juvenile Fiction, family", "Health & Fitness", "Philosophy", "Art",
+    ]
+    REPEATED_TEXTS = [
+        "Great book!", "Loved it.", "Terrible, do not buy.", "It was ok.", "Five stars",
+        "Boring and too long.", "A must read for everyone.", "Not what I expected.",
+    ]
+    WORDS = [
+        "the", "book", "story", "author", "characters", "plot", "ending", "writing", "pages",
+        "chapter", "read", "really", "very", "quite", "not", "but", "and", "was", "is", "it",
+        "good", "great", "excellent", "wonderful", "love", "enjoyed", "beautiful", "interesting",
+        "bad", "boring", "terrible", "awful", "hate", "disappointing", "slow", "confusing",
+    ]
+    DEFAULT_CHUNK_SIZE = 500_000
+
+    def __init__(
+        self,
+        n_reviews: int,
+        n_books: Optional[int] = None,
+        seed: int = 0,
+        zipf_exponent: float = 1.1,
+        unmatched_fraction: float = 0.02,
+        repeated_text_fraction: float = 0.3,
+        duplicate_fraction: float = 0.01,
+        chunk_size: Optional[int] = None
+    ):
+        """
+        Inicializa el generador.
+
+        Args:
+            n_reviews (int): Número de filas de 'books_rating.csv'.
+            n_books (int, opcional): Número de libros de 'books_data.csv'. Por defecto, una décima
+                parte de las reseñas (como mínimo 100).
+            seed (int): Semilla del generador aleatorio; la misma semilla produce los mismos archivos.
+            zipf_exponent (float): Exponente de la distribución de reseñas por título.
+            unmatched_fraction (float): Fracción de reseñas cuyo título no existe en 'books_data.csv'.
+            repeated_text_fraction (float): Fracción de reseñas con un texto corto repetido.
+            duplicate_fraction (float): Fracción de reseñas que repiten una fila anterior del mismo bloque.
+            chunk_size (int, opcional): Filas de reseñas generadas y escritas por bloque.
+        """
+        self.n_reviews = int(n_reviews)
+        self.n_books = int(n_books or max(self.n_reviews // 10, 100))
+        self.seed = seed
+        self.zipf_exponent = zipf_exponent
+        self.unmatched_fraction = unmatched_fraction
+        self.repeated_text_fraction = repeated_text_fraction
+        self.duplicate_fraction = duplicate_fraction
+        self.chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+
+    def generate(self, output_path: str):
+        """
+        Genera los dos archivos CSV en la carpeta indicada.
+
+        Args:
+            output_path (str): Carpeta de salida.
+        """
+        os.makedirs(output_path, exist_ok=True)
+        rng = np.random.default_rng(self.seed)
+        print(f"Generando {self.n_books} libros y {self.n_reviews} reseñas en: {output_path}")
+
+        titles = self._titles()
+        self._books_data(rng, titles).to_csv(os.path.join(output_path, "books_data.csv"), index=False)
+
+        # Probabilidad de cada título según su rango (Zipf truncada); el orden de los rangos es aleatorio
+        weights = 1.0 / np.arange(1, self.n_books + 1) ** self.zipf_exponent
+        weights = weights[rng.permutation(self.n_books)]
+        probabilities = weights / weights.sum()
+
+        rating_file = os.path.join(output_path, "books_rating.csv")
+        for start in range(0, self.n_reviews, self.chunk_size):
+            n_rows = min(self.chunk_size, self.n_reviews - start)
+            chunk = self._books_rating(rng, titles, probabilities, start, n_rows)
+            chunk.to_csv(rating_file, index=False, mode="w" if start == 0 else "a", header=start == 0)
+            print(f"Reseñas generadas: {start + n_rows}/{self.n_reviews}")
+        print("Datos sintéticos generados.")
+
+    def _titles(self) -> np.ndarray:
+        """
+        Devuelve los títulos de los libros.
+        """
+        return np.asarray([f"Synthetic Book {i}" for i in range(self.n_books)], dtype=object)
+
+    def _books_data(self, rng: np.random.Generator, titles: np.ndarray) -> pd.DataFrame:
+        """
+        Genera la tabla de libros con listas de autores y categorías.
+        """
+        n_authors = max(self.n_books // 3, 10)
+        author_names = np.asarray([f"Author {i}" for i in range(n_authors)], dtype=object)
+
+        authors = []
+        for count in rng.choice([0, 1, 1, 1, 2, 3], self.n_books):
+            names = author_names[rng.integers(0, n_authors, count)]
+            authors.append(str(list(names)) if count else None)
+
+        categories = []
+        for count in rng.choice([0, 1, 1, 1, 1, 2], self.n_books):
+            names = [self.CATEGORIES[i] for i in rng.choice(len(self.CATEGORIES), count, replace=False)]
+            categories.append(str(names) if count else None)
+
+        ratings_count = rng.integers(1, 5000, self.n_books).astype(np.float64)
+        ratings_count[rng.random(self.n_books) < 0.3] = np.nan
+        return pd.DataFrame({
+            "Title": titles,
+            "description": "Synthetic description.",
+            "authors": authors,
+            "image": "http://books.example/image.jpg",
+            "previewLink": "http://books.example/preview",
+            "publisher": "Synthetic Press",
+            "publishedDate": rng.integers(1900, 2023, self.n_books).astype(str),
+            "infoLink": "http://books.example/info",
+            "categories": categories,
+            "ratingsCount": ratings_count,
+        }, columns=self.BOOKS_DATA_COLUMNS)
+
+    def _books_rating(
+        self,
+        rng: np.random.Generator,
+        titles: np.ndarray,
+        probabilities: np.ndarray,
+        start: int,
+        n_rows: int
+    ) -> pd.DataFrame:
+        """
+        Genera un bloque de reseñas.
+        """
+        book_ids = rng.choice(self.n_books, n_rows, p=probabilities)
+        review_titles = titles[book_ids]
+        unmatched = rng.random(n_rows) < self.unmatched_fraction
+        review_titles[unmatched] = [f"Unknown Book {i}" for i in rng.integers(0, self.n_books, unmatched.sum())]
+
+        scores = rng.choice([1.0, 2.0, 3.0, 4.0, 5.0], n_rows, p=[0.07, 0.06, 0.09, 0.2, 0.58])
+        texts = self._review_texts(rng, n_rows)
+
+        chunk = pd.DataFrame({
+            "Id": book_ids,
+            "Title": review_titles,
+            "Price": np.round(rng.uniform(1, 60, n_rows), 2),
+            "User_id": [f"U{i}" for i in rng.integers(0, max(self.n_reviews // 5, 1), n_rows)],
+            "profileName": "Synthetic reader",
+            "review/helpfulness": "0/0",
+            "review/score": scores,
+            "review/time": rng.integers(900_000_000, 1_360_000_000, n_rows),
+            "review/summary": "Synthetic summary",
+            "review/text": texts,
+        }, columns=self.BOOKS_RATING_COLUMNS, index=np.arange(start, start + n_rows))
+
+        # Filas duplicadas: repiten una fila anterior del bloque
+        rows = np.arange(n_rows)
+        duplicates = np.flatnonzero(rng.random(n_rows) < self.duplicate_fraction)
+        duplicates = duplicates[duplicates > 0]
+        rows[duplicates] = rng.integers(0, duplicates)
+        return chunk.iloc[rows]
+
+    def _review_texts(self, rng: np.random.Generator, n_rows: int) -> np.ndarray:
+        """
+        Genera los textos de las reseñas: cortos repetidos, compuestos al azar o nulos.
+        """
+        texts = np.empty(n_rows, dtype=object)
+        kind = rng.random(n_rows)
+        repeated = kind < self.repeated_text_fraction
+        missing = kind > 0.995
+        composed = ~repeated & ~missing
+
+        texts[repeated] = np.asarray(self.REPEATED_TEXTS, dtype=object)[rng.integers(0, len(self.REPEATED_TEXTS), repeated.sum())]
+        texts[missing] = None
+
+        # Textos compuestos: entre 5 y 60 palabras tomadas del vocabulario
+        lengths = rng.integers(5, 61, composed.sum())
+        words = np.asarray(self.WORDS, dtype=object)[rng.integers(0, len(self.WORDS), lengths.sum())]
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        texts[composed] = [" ".join(words[bounds[i]:bounds[i + 1]]).capitalize() + "." for i in range(len(lengths))]
+        return texts
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: python -m benchmarks.synthetic_data <número_de_reseñas> <carpeta_de_salida> [semilla]")
+        sys.exit(1)
+
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    SyntheticDataGenerator(int(sys.argv[1]), seed=seed).generate(sys.argv[2])
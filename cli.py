@@ -0,0 +1,132 @@
+import time
+
+# Inicio del proceso, para el informe de importaciones
+STARTED = time.perf_counter()
+
+import sys
+import json
+import argparse
+from src import config
+from src.import_report import ImportTimer
+
+# Cada subcomando importa solo lo que necesita: `load` no carga matplotlib, seaborn ni VADER, `score` no
+# carga las bibliotecas de gráficos ni de Excel, `query` no carga pandas, NumPy ni PyArrow, y listar las
+# etapas no lee los datos de entrada.
+
+
+def load_command(args):
+    """
+    Carga y procesa los datos, actualizando la caché de datos procesados.
+    """
+    import main
+
+    results = main.main(["data"], resume=not args.no_resume)
+    if results is not None:
+        print(f"Datos procesados: {len(results['data'])} filas.")
+
+
+def score_command(args):
+    """
+    Calcula las puntuaciones de sentimiento que faltan en la caché de puntuaciones.
+    """
+    import main
+
+    results = main.main(["sentiment"], resume=not args.no_resume)
+    if results is not None:
+        print(f"Distribución de sentimientos:\n{results['sentiment']['Sentiment'].value_counts()}")
+
+
+def eda_command(args):
+    """
+    Ejecuta el análisis exploratorio: con RENDER_MODE=headless genera sus gráficos como imágenes en
+    CHARTS_PATH; si no, los muestra en pantalla.
+    """
+    import main
+
+    headless = config.get("RENDER_MODE", "interactive") == "headless"
+    pipeline = main.build_pipeline(headless)
+    stages = ["eda_totals", "eda_charts"] if headless else [name for name in pipeline.stages if name.startswith("eda_")]
+    results = main.main(stages, resume=not args.no_resume)
+    if results is not None and headless:
+        main.render_charts(results["eda_charts"])
+
+
+def export_command(args):
+    """
+    Identifica los mejores libros y exporta los rankings en los formatos de EXPORT_FORMATS.
+    """
+    import main
+
+    main.main(["best_books"], resume=not args.no_resume, preview=args.preview)
+
+
+def query_command(args):
+    """
+    Responde consultas de sentimiento por libro o categoría desde el estado de la ingesta incremental, sin
+    cargar las reseñas. Sin --book ni --category, inicia el servidor HTTP de consultas.
+    """
+    from src.sentiment_query import SentimentQueryIndex
+
+    try:
+        index = SentimentQueryIndex.from_state()
+    except FileNotFoundError as e:
+        print(e)
+        sys.exit(1)
+    if not args.book and not args.category:
+        index.serve()
+        return
+    result = index.batch(books=args.book, categories=args.category, match=args.match)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Declara los subcomandos y sus opciones.
+    """
+    parser = argparse.ArgumentParser(description="Análisis de reseñas de libros de Amazon por subcomandos.")
+    parser.add_argument("--import-report", action="store_true",
+                        help="Muestra al terminar el tiempo de importación de cada paquete.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, function, help_text, aliases in [
+        ("load", load_command, "Carga y procesa los datos y actualiza la caché.", ["cache"]),
+        ("score", score_command, "Calcula las puntuaciones de sentimiento pendientes.", []),
+        ("eda", eda_command, "Ejecuta el análisis exploratorio y sus gráficos.", []),
+        ("export", export_command, "Exporta los rankings de los mejores libros.", []),
+    ]:
+        subparser = subparsers.add_parser(name, help=help_text, aliases=aliases)
+        subparser.add_argument("--no-resume", action="store_true",
+                               help="Descarta los puntos de control de una ejecución fallida.")
+        subparser.set_defaults(function=function)
+    subparsers.choices["export"].add_argument(
+        "--preview", action="store_true", help="Exporta los rankings de la vista previa (muestra estratificada)."
+    )
+
+    query = subparsers.add_parser("query", help="Consulta el sentimiento por libro o categoría, o inicia el servidor.")
+    query.add_argument("--book", nargs="+", help="Títulos de libros.")
+    query.add_argument("--category", nargs="+", help="Nombres de categorías.")
+    query.add_argument("--match", default="exact", choices=("exact", "ignore_case", "prefix"), help="Modo de búsqueda.")
+    query.set_defaults(function=query_command)
+    return parser
+
+
+def main(argv=None):
+    """
+    Ejecuta el subcomando indicado en la línea de comandos.
+    """
+    args = build_parser().parse_args(argv)
+    timer = ImportTimer() if args.import_report else None
+    if timer is not None:
+        timer.start()
+    config.load()
+    try:
+        args.function(args)
+    finally:
+        if timer is not None:
+            timer.stop()
+            timer.report()
+            print(f"Tiempo total del subcomando '{args.command}': {time.perf_counter() - STARTED:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,113 +1,313 @@
-from src.data_loader import DataLoader
-from src.eda import EDA
-from src.sentiment_analysis import SentimentAnalysis
-from src.best_books import BestBooks
+import os
+import argparse
+from typing import TYPE_CHECKING, List, Optional
+from src.pipeline import Pipeline, PipelineError, Stage
+from src import config, metrics
 
+if TYPE_CHECKING:
+    from src.exporter import RankingExporter
 
-def main():
-    """
-    Ejecuta el flujo completo del análisis de datos.
-    """
-    # Inicializar el cargador de datos
-    data_loader = DataLoader()
+# Las clases de análisis se importan dentro de cada etapa (o se declaran como 'módulo:atributo'), para
+# que importar este módulo o ejecutar solo algunas etapas no cargue pandas, matplotlib, seaborn o VADER
+# si no se usan.
 
-    # Cargar y procesar los datos
-    print("Cargando y procesando los datos...")
-    raw_data = data_loader.load_data()
-    processed_data, unmatched_data = data_loader.process_data(raw_data)
 
+def load_data(loader, sampler=None):
+    """
+    Carga y procesa los datos (desde la caché o por bloques, para acotar el uso de memoria).
+
+    Con TEXT_STORE=1 los textos de las reseñas quedan en el almacén de textos del cargador y solo
+    se leen, por lotes, al calcular el sentimiento. En la vista previa solo se conserva la muestra
+    estratificada del muestreador.
+    """
+    processed_data, unmatched_data = loader.load_processed_data(sampler=sampler)
     if processed_data.empty:
-        print("No se pudo procesar la información. Verifique los datos de entrada.")
-        return
+        raise ValueError("No se pudo procesar la información. Verifique los datos de entrada.")
 
     # Mostrar información sobre los registros no coincidentes
     print(f"Registros no coincidentes:\n{unmatched_data}")
+    if loader.title_resolver is not None:
+        print(f"Títulos resueltos sin coincidencia exacta:\n{loader.title_resolver.matches()}")
+    return processed_data
 
-    # Iniciar el análisis exploratorio
-    print("\nIniciando análisis exploratorio de datos (EDA)...")
-    eda = EDA(processed_data)
 
-    # Visualización: Valoraciones promedio por libro
-    print("\nGenerando visualización: Valoraciones promedio por libro...")
-    eda.average_rating_per_book()
+def compute_book_stats(data, sampler=None):
+    """
+    Calcula las estadísticas por libro compartidas por EDA y BestBooks. En la vista previa se ponderan
+    con los pesos de la muestra, de modo que los conteos estiman los de los datos completos.
+    """
+    from src.book_stats import BookStats
 
-    # Total de reseñas y valoraciones
-    print("\nCalculando total de reseñas y valoraciones...")
-    eda.total_reviews_and_ratings()
+    book_stats = BookStats(data, weights=sampler.weights() if sampler is not None else None)
+    book_stats.table  # Se calcula aquí para que las etapas siguientes la compartan
+    return book_stats
 
-    # Visualización: Autores más populares
-    print("\nGenerando visualización: Autores más populares...")
-    eda.most_popular_authors()
 
-    # Visualización: Categorías más populares
-    print("\nGenerando visualización: Categorías más populares...")
-    eda.most_popular_categories()
+def score_sentiment(data, indexes, loader):
+    """
+    Calcula las puntuaciones de sentimiento (solo los textos que no están en la caché).
 
-    # Visualización: Top 10 libros con más reseñas
-    print("\nGenerando visualización: Top 10 libros con más reseñas...")
-    eda.visualize_top_books_by_reviews()
+    Las columnas nuevas se añaden a una copia superficial de los datos, para no modificar el
+    DataFrame que leen a la vez las etapas de EDA.
+    """
+    from src.sentiment_analysis import SentimentAnalysis
+    from src.sentiment_cache import SentimentScoreCache
 
-    # Visualización: Top 10 libros mejor calificados con más de 1000 reseñas
-    print("\nGenerando visualización: Top 10 libros mejor calificados con más de 3000 reseñas...")
-    eda.visualize_top_books_by_ratings()
+    score_cache = SentimentScoreCache()
+    sentiment_analyzer = SentimentAnalysis(
+        data.copy(deep=False), score_cache=score_cache, indexes=indexes, text_store=loader.text_store
+    )
+    sentiment_analyzer.preprocess_text()
+    scored_data = sentiment_analyzer.calculate_sentiment_scores()
+    print(f"Caché de puntuaciones: {score_cache.stats()}")
+    score_cache.close()
+    return scored_data
 
-    # Visualización: Top 5 autores con más calificaciones de 5
-    print("\nGenerando visualización: Top 5 autores con más calificaciones de 5...")
-    eda.visualize_top_authors_by_ratings(rating=5)
 
-    # Visualización: Top 5 autores con más calificaciones de 1
-    print("\nGenerando visualización: Top 5 autores con más calificaciones de 1...")
-    eda.visualize_top_authors_by_ratings(rating=1)
+def create_sentiment_analyzer(sentiment, indexes):
+    """
+    Crea el analizador de sentimiento sobre los datos ya puntuados, para las visualizaciones y consultas.
+    """
+    from src.sentiment_analysis import SentimentAnalysis
 
-    # Iniciar el análisis de sentimientos
-    print("\nIniciando análisis de sentimientos...")
-    sentiment_analyzer = SentimentAnalysis(processed_data)
+    return SentimentAnalysis(sentiment, indexes=indexes)
 
-    # Preprocesar texto de las reseñas
-    sentiment_analyzer.preprocess_text()
 
-    # Calcular puntuaciones de sentimiento
-    processed_data = sentiment_analyzer.calculate_sentiment_scores()
+def render_charts(chart_specs):
+    """
+    Genera sin interfaz gráfica los gráficos de sus especificaciones (matplotlib solo se importa en los
+    procesos que dibujan).
+    """
+    from src.chart_renderer import ChartRenderer
+
+    return ChartRenderer().render_all(chart_specs)
+
+
+def export_best_books(sentiment, book_sentiment_stats, exporter):
+    """
+    Identifica los mejores libros y exporta todos los rankings en una sola pasada.
+    """
+    from src.best_books import BestBooks
+
+    return BestBooks(sentiment, book_stats=book_sentiment_stats, exporter=exporter).export_rankings()
+
+
+def save_incremental_state(sentiment, indexes, loader):
+    """
+    Guarda los totales como estado base para incorporar lotes de reseñas nuevas.
+    """
+    from src.incremental import IncrementalUpdater
+
+    return IncrementalUpdater().save_baseline(sentiment, indexes=indexes, text_store=loader.text_store)
 
-    # Visualizaciones de distribución de sentimientos
-    print("\nGenerando visualizaciones de la distribución de sentimientos...")
-    sentiment_analyzer.visualize_sentiment_distribution()
 
-    # Visualización: Top 20 libros con más reseñas positivas, neutras y negativas
-    print("\nGenerando visualización: Top 20 libros por tipo de sentimiento...")
-    sentiment_analyzer.visualize_top_books_by_sentiment()
+def write_preview_report(sentiment, sampler, output_path):
+    """
+    Estima los promedios y conteos de los datos completos a partir de la muestra, con intervalos de
+    confianza, y guarda el informe en la carpeta de la vista previa.
+    """
+    from src.preview import PreviewEstimator
+
+    report = PreviewEstimator(sampler).report(sentiment)
+    PreviewEstimator.write(report, os.path.join(output_path, "preview_report.json"))
+    return report
+
+
+def run_key(headless: bool, preview: bool) -> str:
+    """
+    Identifica los datos de entrada y el modo de ejecución, para reutilizar solo los puntos de control
+    que les corresponden.
+    """
+    from src.data_loader import DataLoader
+    from src.preview import StratifiedSampler
+
+    key = f"{DataLoader().source_stamp()}-{'headless' if headless else 'interactive'}"
+    if preview:
+        sampler = StratifiedSampler()
+        key += f"-preview-{sampler.size}-{sampler.seed}"
+    return key
+
+
+def build_pipeline(headless: bool, exporter: Optional["RankingExporter"] = None, preview: bool = False) -> Pipeline:
+    """
+    Declara las etapas del análisis y sus dependencias.
+
+    Args:
+        headless (bool): Si es True, los gráficos se generan como imágenes en lugar de mostrarse.
+        exporter (RankingExporter, opcional): Exportador de los mejores libros. Con la escritura en segundo
+            plano, la etapa de exportación no guarda punto de control, porque termina antes que los archivos.
+            Si no se indica, la etapa de exportación crea uno con la configuración del archivo .env.
+        preview (bool): Si es True, el análisis se hace sobre una muestra estratificada de las reseñas, con un
+            informe de estimaciones de los datos completos, y no se guarda el estado incremental.
+
+    Returns:
+        Pipeline: Flujo del análisis.
+    """
+    # Declarar el flujo no importa las clases de análisis ni lee los datos de entrada: las etapas se
+    # resuelven y la clave de ejecución se calcula al ejecutarlo
+    background = exporter.background if exporter is not None else os.getenv("EXPORT_BACKGROUND", "0") == "1"
+    output_path = exporter.output_path if exporter is not None else os.getenv("OUTPUT_PATH")
+    sample = ["sampler"] if preview else []
+    stages = [
+        Stage("loader", "src.data_loader:DataLoader"),
+        *([Stage("sampler", "src.preview:StratifiedSampler")] if preview else []),
+        Stage("data", load_data, ["loader"] + sample, message="Cargando y procesando los datos..."),
+        Stage("indexes", "src.incidence_index:IncidenceIndexes", ["data"]),  # Índices de autores y categorías compartidos
+        Stage("book_stats", compute_book_stats, ["data"] + sample),
+        Stage("eda", "src.eda:EDA", ["data", "indexes", "book_stats"], message="Iniciando análisis exploratorio de datos (EDA)..."),
+        Stage("eda_totals", lambda eda: eda.total_reviews_and_ratings(), ["eda"], checkpoint=True,
+              message="Calculando total de reseñas y valoraciones..."),
+    ]
+
+    if headless:
+        # Solo se preparan los datos agregados; los gráficos se generan al final en paralelo
+        stages.append(Stage("eda_charts", lambda eda: eda.chart_specs(), ["eda"], checkpoint=True))
+    else:
+        stages += [
+            Stage(name, function, ["eda"], main_thread=True, message=message)
+            for name, function, message in [
+                ("eda_average_rating", lambda eda: eda.average_rating_per_book(),
+                 "Generando visualización: Valoraciones promedio por libro..."),
+                ("eda_popular_authors", lambda eda: eda.most_popular_authors(),
+                 "Generando visualización: Autores más populares..."),
+                ("eda_popular_categories", lambda eda: eda.most_popular_categories(),
+                 "Generando visualización: Categorías más populares..."),
+                ("eda_top_books_by_reviews", lambda eda: eda.visualize_top_books_by_reviews(),
+                 "Generando visualización: Top 10 libros con más reseñas..."),
+                ("eda_top_books_by_ratings", lambda eda: eda.visualize_top_books_by_ratings(),
+                 "Generando visualización: Top 10 libros mejor calificados con más de 3000 reseñas..."),
+                ("eda_top_authors_rating_5", lambda eda: eda.visualize_top_authors_by_ratings(rating=5),
+                 "Generando visualización: Top 5 autores con más calificaciones de 5..."),
+                ("eda_top_authors_rating_1", lambda eda: eda.visualize_top_authors_by_ratings(rating=1),
+                 "Generando visualización: Top 5 autores con más calificaciones de 1..."),
+            ]
+        ]
+
+    stages += [
+        # Los datos procesados y las puntuaciones ya se guardan en sus cachés, por lo que estas etapas
+        # no necesitan punto de control: al reanudar se recuperan desde ellas
+        Stage("sentiment", score_sentiment, ["data", "indexes", "loader"], message="Iniciando análisis de sentimientos..."),
+        Stage("sentiment_analyzer", create_sentiment_analyzer, ["sentiment", "indexes"]),
+    ]
+
+    if headless:
+        stages += [
+            Stage("sentiment_charts", lambda sentiment_analyzer: sentiment_analyzer.chart_specs(), ["sentiment_analyzer"],
+                  checkpoint=True),
+            Stage("render_charts", lambda eda_charts, sentiment_charts: render_charts(eda_charts + sentiment_charts),
+                  ["eda_charts", "sentiment_charts"], checkpoint=True, message="Generando gráficos sin interfaz gráfica..."),
+        ]
+    else:
+        stages += [
+            Stage(name, function, ["sentiment_analyzer"], main_thread=True, message=message)
+            for name, function, message in [
+                ("sentiment_distribution", lambda sentiment_analyzer: sentiment_analyzer.visualize_sentiment_distribution(),
+                 "Generando visualizaciones de la distribución de sentimientos..."),
+                ("sentiment_top_books", lambda sentiment_analyzer: sentiment_analyzer.visualize_top_books_by_sentiment(),
+                 "Generando visualización: Top 20 libros por tipo de sentimiento..."),
+                ("sentiment_top_authors_score",
+                 lambda sentiment_analyzer: sentiment_analyzer.visualize_top_authors_by_sentiment_score(),
+                 "Generando visualización: Autores con puntuación promedio más alta y más baja..."),
+                ("sentiment_top_authors_reviews", lambda sentiment_analyzer: [
+                    sentiment_analyzer.visualize_top_authors_by_review_sentiment(sentiment) for sentiment in ("positivo", "negativo")
+                ], "Generando visualización: Autores con más reseñas positivas y negativas..."),
+                ("sentiment_top_categories_reviews", lambda sentiment_analyzer: [
+                    sentiment_analyzer.visualize_top_categories_by_review_sentiment(sentiment) for sentiment in ("positivo", "negativo")
+                ], "Generando visualización: Categorías con más reseñas positivas y negativas..."),
+                ("sentiment_by_book", lambda sentiment_analyzer: sentiment_analyzer.average_sentiment_by_book(),
+                 "Calculando sentimiento promedio por libro..."),
+                ("sentiment_by_category", lambda sentiment_analyzer: sentiment_analyzer.average_sentiment_by_category(),
+                 "Calculando sentimiento promedio por categoría..."),
+            ]
+        ]
 
-    # Visualización: Top 20 autores por puntuación promedio de sentimiento
-    print("\nGenerando visualización: Autores con puntuación promedio más alta y más baja...")
-    sentiment_analyzer.visualize_top_authors_by_sentiment_score()
+    # Identificar y exportar los mejores libros: todos los rankings en una sola pasada, al tener las puntuaciones
+    stages += [
+        Stage("book_sentiment_stats", lambda book_stats, sentiment: book_stats.with_data(sentiment), ["book_stats", "sentiment"]),
+        Stage("best_books",
+              lambda sentiment, book_sentiment_stats: export_best_books(sentiment, book_sentiment_stats, exporter),
+              ["sentiment", "book_sentiment_stats"], checkpoint=not background,
+              message="Identificando y exportando los mejores libros..."),
+    ]
 
-    # Visualización: Top 20 autores con más reseñas positivas y negativas
-    print("\nGenerando visualización: Autores con más reseñas positivas y negativas...")
-    sentiment_analyzer.visualize_top_authors_by_review_sentiment("positivo")
-    sentiment_analyzer.visualize_top_authors_by_review_sentiment("negativo")
+    if preview:
+        # Una muestra no sirve como estado base de la ingesta incremental
+        stages.append(
+            Stage("preview_report", lambda sentiment, sampler: write_preview_report(sentiment, sampler, output_path),
+                  ["sentiment", "sampler"], checkpoint=True, message="Generando el informe de la vista previa...")
+        )
+    else:
+        # Guardar los totales como estado base para incorporar lotes de reseñas nuevas
+        stages.append(
+            Stage("incremental_state", save_incremental_state, ["sentiment", "indexes", "loader"], checkpoint=True,
+                  message="Guardando estado para la ingesta incremental...")
+        )
 
-    # Visualización: Top 20 categorías con más reseñas positivas y negativas
-    print("\nGenerando visualización: Categorías con más reseñas positivas y negativas...")
-    sentiment_analyzer.visualize_top_categories_by_review_sentiment("positivo")
-    sentiment_analyzer.visualize_top_categories_by_review_sentiment("negativo")
+    return Pipeline(stages, run_key=lambda: run_key(headless, preview))
+
+
+def main(stages: Optional[List[str]] = None, resume: bool = True, preview: bool = False):
+    """
+    Ejecuta el flujo del análisis de datos.
 
-    # Análisis de sentimiento promedio por libro
-    print("\nCalculando sentimiento promedio por libro...")
-    sentiment_analyzer.average_sentiment_by_book()
+    Las etapas se declaran con sus dependencias y las independientes se ejecutan a la vez (por
+    ejemplo, las visualizaciones de EDA mientras se calcula el sentimiento, o la exportación de los
+    mejores libros mientras se guarda el estado incremental). Si una etapa falla, la siguiente
+    ejecución retoma desde los puntos de control guardados.
 
-    # Análisis de sentimiento promedio por categoría
-    print("\nCalculando sentimiento promedio por categoría...")
-    sentiment_analyzer.average_sentiment_by_category()
+    Con EXPORT_BACKGROUND=1, los archivos de los mejores libros se escriben en un hilo en segundo
+    plano y el flujo espera a que terminen antes de finalizar.
 
-    # Identificar y exportar los mejores libros
-    print("\nIdentificando y exportando los mejores libros...")
-    best_books = BestBooks(processed_data)  # Usar el processed_data actualizado
-    best_books.top_books_by_reviews()
-    best_books.top_books_by_average_rating()
-    best_books.top_books_by_sentiment()
+    Con RENDER_MODE=headless en el archivo .env, los gráficos no se muestran en pantalla: se
+    generan como imágenes en procesos paralelos a partir de los datos ya agregados, junto con
+    un índice resumen, y se omiten las consultas interactivas.
 
+    En la vista previa, el análisis se hace sobre una muestra estratificada de PREVIEW_SIZE reseñas y
+    los mejores libros y el informe de estimaciones se guardan en OUTPUT_PATH/preview.
+
+    Args:
+        stages (List[str], opcional): Etapas a ejecutar (con sus dependencias). Por defecto, todas.
+        resume (bool): Si es False, se descartan los puntos de control de una ejecución anterior.
+        preview (bool): Si es True, se ejecuta la vista previa sobre una muestra de las reseñas.
+
+    Returns:
+        dict: Resultado de cada etapa ejecutada o recuperada, o None si alguna etapa falló.
+    """
+    from src.exporter import RankingExporter
+
+    config.load()
+    headless = os.getenv("RENDER_MODE", "interactive") == "headless"
+    output_path = os.getenv("OUTPUT_PATH")
+    exporter = RankingExporter(os.path.join(output_path, "preview") if preview and output_path else None)
+
+    try:
+        results = build_pipeline(headless, exporter, preview).run(stages, resume=resume)
+    except PipelineError:
+        return None
+    finally:
+        # Las exportaciones en segundo plano terminan antes de escribir el informe de métricas
+        try:
+            exporter.close()
+        except Exception as e:
+            print(f"Error al exportar los mejores libros: {e}")
+        metrics.recorder.write_report()
     print("\nAnálisis finalizado.")
+    return results
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Análisis de reseñas de libros de Amazon.")
+    parser.add_argument("--stages", nargs="+", help="Etapas a ejecutar, con sus dependencias (por defecto todas).")
+    parser.add_argument("--no-resume", action="store_true", help="Descarta los puntos de control de una ejecución fallida.")
+    parser.add_argument("--list", action="store_true", help="Muestra las etapas disponibles y sus dependencias.")
+    parser.add_argument("--preview", action="store_true",
+                        help="Analiza una muestra estratificada de las reseñas y estima los resultados completos.")
+    args = parser.parse_args()
+
+    if args.list:
+        config.load()
+        pipeline = build_pipeline(os.getenv("RENDER_MODE", "interactive") == "headless", preview=args.preview)
+        for stage in pipeline.stages.values():
+            print(f"{stage.name}: {', '.join(stage.requires) or '-'}")
+    else:
+        main(args.stages, resume=not args.no_resume, preview=args.preview)
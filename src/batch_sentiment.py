@@ -0,0 +1,371 @@
+import string
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import List, Optional
+from vaderSentiment import vaderSentiment as vader
+
+
+class BatchSentimentScorer:
+    """
+    Motor de puntuación de sentimiento por lotes, compatible con VADER.
+
+    En lugar de recorrer cada reseña palabra por palabra en Python, tokeniza un bloque completo de
+    reseñas a la vez con Arrow, traduce cada palabra a un identificador de un vocabulario en arreglos
+    (léxico de VADER, intensificadores, negaciones y palabras de las reglas) y aplica las reglas de
+    VADER con operaciones sobre arreglos: negaciones, intensificadores y atenuantes, "but",
+    mayúsculas, "least", expresiones especiales y énfasis por signos de exclamación e interrogación.
+
+    Las puntuaciones tienen el mismo formato y, salvo diferencias de Unicode entre Arrow y Python
+    en caracteres poco habituales, los mismos valores que `SentimentIntensityAnalyzer.polarity_scores`.
+    """
+
+    # Palabras que las reglas comparan con las vecinas de cada palabra del léxico
+    RULE_WORDS = ["no", "least", "at", "very", "kind", "of", "or", "nor", "but", "never", "so", "this", "without", "doubt"]
+
+    def __init__(self, analyzer: Optional[vader.SentimentIntensityAnalyzer] = None):
+        """
+        Inicializa el motor con el léxico y los emojis de VADER.
+
+        Args:
+            analyzer (SentimentIntensityAnalyzer, opcional): Analizador de referencia del que se toman
+                el léxico y los emojis. Por defecto se crea uno nuevo.
+        """
+        analyzer = analyzer or vader.SentimentIntensityAnalyzer()
+        self.special_cases = [(tuple(key.split()), value) for key, value in vader.SPECIAL_CASES.items()]
+        self.booster_ngrams = [(tuple(key.split()), value) for key, value in vader.BOOSTER_DICT.items() if " " in key]
+
+        words = set(analyzer.lexicon) | set(vader.BOOSTER_DICT) | set(vader.NEGATE) | set(self.RULE_WORDS)
+        words |= {word for key, _ in self.special_cases + self.booster_ngrams for word in key}
+        vocabulary = sorted(words)
+        self.vocabulary = pa.array(vocabulary, type=pa.large_string())
+        self._ids = {word: word_id for word_id, word in enumerate(vocabulary)}
+        # El identificador len(vocabulary) corresponde a las palabras fuera del vocabulario
+        self.unknown = len(vocabulary)
+
+        self._valence = np.zeros(self.unknown + 1)
+        self._in_lexicon = np.zeros(self.unknown + 1, dtype=bool)
+        self._booster = np.zeros(self.unknown + 1)
+        self._is_booster = np.zeros(self.unknown + 1, dtype=bool)
+        self._is_negation = np.zeros(self.unknown + 1, dtype=bool)
+        for word, valence in analyzer.lexicon.items():
+            self._valence[self._ids[word]] = valence
+            self._in_lexicon[self._ids[word]] = True
+        for word, value in vader.BOOSTER_DICT.items():
+            self._booster[self._ids[word]] = value
+            self._is_booster[self._ids[word]] = True
+        self._is_negation[[self._ids[word] for word in vader.NEGATE]] = True
+
+        # VADER sustituye los emojis carácter a carácter, por lo que solo cuentan los de un carácter
+        self._emojis = {emoji: description for emoji, description in analyzer.emojis.items() if len(emoji) == 1}
+        self._emoji_chars = frozenset(self._emojis)
+
+    def polarity_scores(self, text: str) -> dict:
+        """
+        Calcula las puntuaciones de sentimiento de un texto.
+
+        Args:
+            text (str): Texto de la reseña.
+
+        Returns:
+            dict: Diccionario con las claves 'neg', 'neu', 'pos' y 'compound'.
+        """
+        return self.polarity_scores_batch([text])[0]
+
+    def polarity_scores_batch(self, reviews: List[str]) -> List[dict]:
+        """
+        Calcula las puntuaciones de sentimiento de un bloque de reseñas.
+
+        Args:
+            reviews (List[str]): Textos de las reseñas.
+
+        Returns:
+            List[dict]: Diccionarios con las claves 'neg', 'neu', 'pos' y 'compound', en el mismo
+            orden que las reseñas.
+        """
+        # Todos los emojis son caracteres no ASCII: la mayoría de las reseñas se descartan sin recorrerlas
+        texts = pa.array(
+            [
+                self._replace_emojis(text) if not text.isascii() and not self._emoji_chars.isdisjoint(text) else text
+                for text in reviews
+            ],
+            type=pa.large_string()
+        )
+        tokens = _Tokens(self, texts)
+        sentiments = np.zeros(tokens.count)
+        scored, valence = self._lexicon_valence(tokens)
+        sentiments[scored] = valence
+        sentiments = self._but_check(tokens, sentiments)
+
+        exclamations = pc.count_substring(texts, "!").to_numpy()
+        questions = pc.count_substring(texts, "?").to_numpy()
+        return self._score_valence(tokens, sentiments, exclamations, questions)
+
+    def _replace_emojis(self, text: str) -> str:
+        """
+        Sustituye los emojis por su descripción, igual que VADER.
+        """
+        parts, previous_space = [], True
+        for char in text:
+            if char in self._emojis:
+                if not previous_space:
+                    parts.append(" ")
+                parts.append(self._emojis[char])
+                previous_space = False
+            else:
+                parts.append(char)
+                previous_space = char == " "
+        return "".join(parts).strip()
+
+    def _lexicon_valence(self, tokens: "_Tokens"):
+        """
+        Calcula la valencia de las palabras del léxico aplicando las reglas que dependen de las
+        palabras vecinas.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Posiciones de las palabras puntuadas y su valencia.
+        """
+        words = tokens.words
+        kind_of = (words == self._id("kind")) & (tokens.neighbor(words, -1, self.unknown) == self._id("of"))
+        scored = np.flatnonzero(self._in_lexicon[words] & ~self._is_booster[words] & ~kind_of)
+
+        word = words[scored]
+        position = tokens.position[scored]
+        previous = [tokens.neighbor(words, k, self.unknown, scored) for k in (1, 2, 3)]
+        following = [tokens.neighbor(words, -k, self.unknown, scored) for k in (1, 2)]
+        previous_upper = [tokens.neighbor(tokens.upper, k, False, scored) for k in (1, 2, 3)]
+        previous_negated = [tokens.neighbor(tokens.negated, k, False, scored) for k in (1, 2, 3)]
+        cap_differential = tokens.cap_differential[scored]
+
+        lexicon_valence = self._valence[word]
+        valence = lexicon_valence.copy()
+
+        # "no" seguido de una palabra del léxico niega esa palabra en lugar de puntuar por sí mismo
+        valence[(word == self._id("no")) & self._in_lexicon[following[0]]] = 0.0
+        no = self._id("no")
+        after_no = (previous[0] == no) | (previous[1] == no) | (
+            (previous[2] == no) & ((previous[0] == self._id("or")) | (previous[0] == self._id("nor")))
+        )
+        valence = np.where(after_no, lexicon_valence * vader.N_SCALAR, valence)
+
+        # Palabra en mayúsculas cuando el resto del texto no lo está
+        emphasized = tokens.upper[scored] & cap_differential
+        valence = np.where(emphasized, np.where(valence > 0, valence + vader.C_INCR, valence - vader.C_INCR), valence)
+
+        for start in range(3):
+            applies = (position > start) & ~self._in_lexicon[previous[start]]
+            new_valence = valence + self._scalar_inc_dec(
+                previous[start], previous_upper[start], cap_differential, valence, start
+            )
+            new_valence = self._negation_check(new_valence, previous, previous_negated, start)
+            if start == 2:
+                new_valence = np.where(applies, self._special_idioms_check(new_valence, word, tokens, scored, previous), new_valence)
+            valence = np.where(applies, new_valence, valence)
+
+        return scored, self._least_check(valence, position, previous)
+
+    def _scalar_inc_dec(self, neighbor, neighbor_upper, cap_differential, valence, start):
+        """
+        Aporte de un intensificador o atenuante situado `start + 1` palabras antes, atenuado con la distancia.
+        """
+        is_booster = self._is_booster[neighbor]
+        scalar = self._booster[neighbor]
+        scalar = np.where(is_booster & (valence < 0), -scalar, scalar)
+        emphasized = is_booster & neighbor_upper & cap_differential
+        scalar = np.where(emphasized, np.where(valence > 0, scalar + vader.C_INCR, scalar - vader.C_INCR), scalar)
+        if start == 1:
+            scalar = np.where(scalar != 0, scalar * 0.95, scalar)
+        elif start == 2:
+            scalar = np.where(scalar != 0, scalar * 0.9, scalar)
+        return scalar
+
+    def _negation_check(self, valence, previous, previous_negated, start):
+        """
+        Aplica las negaciones situadas `start + 1` palabras antes, con las excepciones de VADER
+        ("never so/this" intensifica y "without doubt" no niega).
+        """
+        negated = valence * vader.N_SCALAR
+        if start == 0:
+            return np.where(previous_negated[0], negated, valence)
+
+        so_this = [(word == self._id("so")) | (word == self._id("this")) for word in previous]
+        never, without, doubt = self._id("never"), self._id("without"), self._id("doubt")
+        if start == 1:
+            intensified = (previous[1] == never) & so_this[0]
+            unchanged = (previous[1] == without) & (previous[0] == doubt)
+        else:
+            intensified = ((previous[2] == never) & so_this[1]) | so_this[0]
+            unchanged = (previous[2] == without) & ((previous[1] == doubt) | (previous[0] == doubt))
+        return np.where(
+            intensified, valence * 1.25, np.where(unchanged, valence, np.where(previous_negated[start], negated, valence))
+        )
+
+    def _special_idioms_check(self, valence, word, tokens, scored, previous):
+        """
+        Aplica las expresiones especiales de VADER ("the shit", "kiss of death"...) y los atenuantes
+        de dos palabras ("kind of", "sort of"...) alrededor de cada palabra.
+        """
+        following = [tokens.neighbor(tokens.words, -k, self.unknown, scored) for k in (1, 2)]
+        one, two, three = previous
+        # En el orden de VADER: gana la primera secuencia que coincide; las siguientes la reemplazan
+        sequences = [(one, word), (two, one, word), (two, one), (three, two, one), (three, two)]
+        special = np.full(len(word), np.nan)
+        for sequence in reversed(sequences):
+            for key, value in self.special_cases:
+                special[self._matches(sequence, key)] = value
+        for sequence in [(word, following[0]), (word, following[0], following[1])]:
+            for key, value in self.special_cases:
+                special[self._matches(sequence, key)] = value
+        valence = np.where(np.isnan(special), valence, special)
+
+        for sequence in [(three, two, one), (three, two), (two, one)]:
+            for key, value in self.booster_ngrams:
+                valence = np.where(self._matches(sequence, key), valence + value, valence)
+        return valence
+
+    def _least_check(self, valence, position, previous):
+        """
+        Niega la palabra precedida por "least", salvo en "at least" y "very least".
+        """
+        least = (previous[0] == self._id("least")) & ~self._in_lexicon[previous[0]]
+        first_case = (position > 1) & least
+        negate = first_case & (previous[1] != self._id("at")) & (previous[1] != self._id("very"))
+        negate |= ~first_case & (position > 0) & least
+        return np.where(negate, valence * vader.N_SCALAR, valence)
+
+    def _but_check(self, tokens: "_Tokens", sentiments: np.ndarray) -> np.ndarray:
+        """
+        Atenúa las palabras anteriores al primer "but" de cada reseña y refuerza las posteriores.
+
+        VADER localiza cada valencia por su valor con `list.index`, de modo que cuando dos palabras
+        terminan con el mismo valor alguna se escala dos veces o ninguna. Las valencias nulas no
+        cambian, así que se reproduce ese recorrido solo sobre las valencias no nulas de las reseñas
+        con "but".
+        """
+        but = np.flatnonzero(tokens.words == self._id("but"))
+        if not len(but):
+            return sentiments
+        texts, first = np.unique(tokens.text[but], return_index=True)
+        first_but = np.full(tokens.n_texts, -1)
+        first_but[texts] = tokens.position[but[first]]
+
+        rows = np.flatnonzero((first_but[tokens.text] >= 0) & (sentiments != 0))
+        if not len(rows):
+            return sentiments
+        values, positions = sentiments[rows].tolist(), tokens.position[rows].tolist()
+        bounds = np.flatnonzero(np.diff(tokens.text[rows])) + 1
+        for start, end in zip([0, *bounds.tolist()], [*bounds.tolist(), len(rows)]):
+            text_values, but_position = values[start:end], first_but[tokens.text[rows[start]]]
+            for value in text_values:
+                index = text_values.index(value)
+                if positions[start + index] < but_position:
+                    text_values[index] = value * 0.5
+                elif positions[start + index] > but_position:
+                    text_values[index] = value * 1.5
+            values[start:end] = text_values
+
+        sentiments = sentiments.copy()
+        sentiments[rows] = values
+        return sentiments
+
+    @staticmethod
+    def _score_valence(tokens: "_Tokens", sentiments, exclamations, questions) -> List[dict]:
+        """
+        Combina las valencias de cada reseña en las puntuaciones 'neg', 'neu', 'pos' y 'compound'.
+        """
+        n_texts = tokens.n_texts
+        sum_s = np.bincount(tokens.text, weights=sentiments, minlength=n_texts)
+        pos_sum = np.bincount(tokens.text, weights=np.where(sentiments > 0, sentiments + 1, 0.0), minlength=n_texts)
+        neg_sum = np.bincount(tokens.text, weights=np.where(sentiments < 0, sentiments - 1, 0.0), minlength=n_texts)
+        neu_count = np.bincount(tokens.text, weights=sentiments == 0, minlength=n_texts)
+
+        # Énfasis por signos de exclamación (hasta 4) y de interrogación (2 o más)
+        amplifier = np.minimum(exclamations, 4) * 0.292
+        amplifier = amplifier + np.where(questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0)
+
+        sum_s = np.where(sum_s > 0, sum_s + amplifier, np.where(sum_s < 0, sum_s - amplifier, sum_s))
+        compound = np.clip(sum_s / np.sqrt(sum_s * sum_s + 15), -1.0, 1.0)
+
+        more_positive, more_negative = pos_sum > np.abs(neg_sum), pos_sum < np.abs(neg_sum)
+        pos_sum = np.where(more_positive, pos_sum + amplifier, pos_sum)
+        neg_sum = np.where(more_negative, neg_sum - amplifier, neg_sum)
+        total = pos_sum + np.abs(neg_sum) + neu_count
+
+        has_tokens = tokens.counts > 0
+        safe_total = np.where(has_tokens, total, 1.0)
+        scores = {
+            "neg": np.where(has_tokens, np.abs(neg_sum / safe_total), 0.0),
+            "neu": np.where(has_tokens, np.abs(neu_count / safe_total), 0.0),
+            "pos": np.where(has_tokens, np.abs(pos_sum / safe_total), 0.0),
+            "compound": np.where(has_tokens, compound, 0.0),
+        }
+        # El redondeo se hace con round de Python para obtener exactamente los mismos valores que VADER
+        return [
+            {"neg": round(neg, 3), "neu": round(neu, 3), "pos": round(pos, 3), "compound": round(value, 4)}
+            for neg, neu, pos, value in zip(*(scores[key].tolist() for key in ("neg", "neu", "pos", "compound")))
+        ]
+
+    def _matches(self, sequence, key) -> np.ndarray:
+        """
+        Indica dónde la secuencia de identificadores coincide con las palabras de `key`.
+        """
+        if len(sequence) != len(key):
+            return np.zeros(len(sequence[0]), dtype=bool)
+        matches = sequence[0] == self._ids[key[0]]
+        for word_ids, word in zip(sequence[1:], key[1:]):
+            matches &= word_ids == self._ids[word]
+        return matches
+
+    def _id(self, word: str) -> int:
+        """
+        Devuelve el identificador de una palabra del vocabulario.
+        """
+        return self._ids[word]
+
+
+class _Tokens:
+    """
+    Palabras de un bloque de reseñas en arreglos planos: identificador en el vocabulario, reseña,
+    posición dentro de la reseña y propiedades usadas por las reglas.
+    """
+
+    def __init__(self, scorer: BatchSentimentScorer, texts: pa.Array):
+        # Arrow separa por los mismos espacios que str.split, pero deja cadenas vacías en los extremos
+        token_lists = pc.utf8_split_whitespace(texts)
+        raw = token_lists.flatten()
+        non_empty = pc.greater(pc.utf8_length(raw), 0)
+        raw = raw.filter(non_empty)
+        self.text = pc.list_parent_indices(token_lists).to_numpy()[non_empty.to_numpy(zero_copy_only=False)]
+
+        self.n_texts = len(texts)
+        self.counts = np.bincount(self.text, minlength=self.n_texts)
+        self.count = len(raw)
+        starts = np.cumsum(self.counts) - self.counts
+        self.position = np.arange(self.count) - starts[self.text]
+        self.length = self.counts[self.text]
+
+        # Como VADER, se quitan los signos de puntuación de los extremos salvo que queden dos caracteres o menos
+        stripped = pc.utf8_trim(raw, characters=string.punctuation)
+        words = pc.if_else(pc.less_equal(pc.utf8_length(stripped), 2), raw, stripped)
+        lower = pc.utf8_lower(words)
+
+        self.words = pc.index_in(lower, value_set=scorer.vocabulary).fill_null(scorer.unknown).to_numpy().astype(np.int64)
+        self.upper = pc.utf8_is_upper(words).to_numpy(zero_copy_only=False)
+        self.negated = scorer._is_negation[self.words] | pc.match_substring(lower, "n't").to_numpy(zero_copy_only=False)
+
+        # Solo cuentan las mayúsculas si algunas palabras, pero no todas, están en mayúsculas
+        upper_count = np.bincount(self.text, weights=self.upper, minlength=self.n_texts)
+        cap_differential = (self.counts - upper_count > 0) & (self.counts - upper_count < self.counts)
+        self.cap_differential = cap_differential[self.text]
+
+    def neighbor(self, values: np.ndarray, k: int, fill, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Devuelve, para cada palabra de `rows`, el valor de la palabra situada `k` posiciones antes
+        (o `-k` después) en la misma reseña, o `fill` si no existe.
+        """
+        rows = np.arange(self.count) if rows is None else rows
+        position = self.position[rows] - k
+        valid = (position >= 0) & (position < self.length[rows])
+        result = np.full(len(rows), fill, dtype=values.dtype)
+        result[valid] = values[rows[valid] - k]
+        return result
@@ -1,6 +1,9 @@
 import pandas as pd
-import os
-from dotenv import load_dotenv
+from typing import Dict, List, Optional
+from src.book_stats import BookStats
+from src.exporter import RankingExporter
+from src.topk import top_k
+from src import metrics
 
 
 class BestBooks:
@@ -8,83 +11,111 @@ class BestBooks:
     Clase para identificar y exportar los mejores libros según criterios específicos.
     """
 
-    def __init__(self, data: pd.DataFrame):
+    # Rankings exportados: columna de orden, archivo de salida y mensaje
+    RANKINGS = {
+        "Review Count": ("top_libros_numero_resenas", "Identificando los libros con más reseñas..."),
+        "Average Rating": ("top_libros_calificacion_promedio", "Identificando los libros con las mejores calificaciones promedio..."),
+        "Average Sentiment": ("top_libros_sentimiento_promedio", "Identificando los libros con el sentimiento promedio más positivo..."),
+    }
+
+    def __init__(
+        self,
+        data: Optional[pd.DataFrame],
+        book_stats: Optional[BookStats] = None,
+        exporter: Optional[RankingExporter] = None
+    ):
         """
         Inicializa la clase BestBooks con el DataFrame procesado.
 
         Args:
-            data (pd.DataFrame): DataFrame procesado que contiene la información de los libros.
+            data (pd.DataFrame, opcional): DataFrame procesado que contiene la información de los libros.
+                Puede omitirse si se indican las estadísticas por libro.
+            book_stats (BookStats, opcional): Estadísticas por libro compartidas con otros análisis.
+                Si no se indican, se calculan a partir de `data` la primera vez que se usan.
+            exporter (RankingExporter, opcional): Exportador de los rankings. Si no se indica, se crea uno
+                con la configuración del archivo .env.
         """
         self.data = data
-        load_dotenv()
-        self.output_path = os.getenv("OUTPUT_PATH")
-        if not self.output_path:
-            raise ValueError("La ruta de salida (OUTPUT_PATH) no está definida en el archivo .env.")
+        self.book_stats = book_stats or BookStats(data)
+        self.exporter = exporter or RankingExporter()
+        self.output_path = self.exporter.output_path
+        self._aggregated_data = None
 
+    @metrics.track()
     def top_books_by_reviews(self, top_n: int = 10):
         """
-        Exporta los libros con más reseñas a un archivo Excel.
+        Exporta los libros con más reseñas a un archivo Excel (y a los demás formatos configurados).
 
         Args:
             top_n (int): Número de libros a incluir.
         """
-        print("Identificando los libros con más reseñas...")
-        aggregated_data = self._aggregate_book_data()
-        books_by_reviews = aggregated_data.sort_values(by="Review Count", ascending=False).head(top_n)
-        books_by_reviews = books_by_reviews[["Title", "authors", "categories", "Review Count"]]
-
-        output_file = os.path.join(self.output_path, "top_libros_numero_resenas.xlsx")
-        books_by_reviews.to_excel(output_file, index=False)
-        print(f"Archivo exportado: {output_file}")
+        self.exporter.export(self.rankings(top_n, ["Review Count"]), combined=False)
 
+    @metrics.track()
     def top_books_by_average_rating(self, top_n: int = 10):
         """
-        Exporta los libros con las mejores calificaciones promedio a un archivo Excel.
+        Exporta los libros con las mejores calificaciones promedio a un archivo Excel (y a los demás
+        formatos configurados).
 
         Args:
             top_n (int): Número de libros a incluir.
         """
-        print("Identificando los libros con las mejores calificaciones promedio...")
-        aggregated_data = self._aggregate_book_data()
-        books_by_average_rating = aggregated_data.sort_values(by="Average Rating", ascending=False).head(top_n)
-        books_by_average_rating = books_by_average_rating[["Title", "authors", "categories", "Average Rating"]]
-
-        output_file = os.path.join(self.output_path, "top_libros_calificacion_promedio.xlsx")
-        books_by_average_rating.to_excel(output_file, index=False)
-        print(f"Archivo exportado: {output_file}")
+        self.exporter.export(self.rankings(top_n, ["Average Rating"]), combined=False)
 
+    @metrics.track()
     def top_books_by_sentiment(self, top_n: int = 10):
         """
-        Exporta los libros con el sentimiento promedio más positivo a un archivo Excel.
+        Exporta los libros con el sentimiento promedio más positivo a un archivo Excel (y a los demás
+        formatos configurados).
 
         Args:
             top_n (int): Número de libros a incluir.
         """
-        print("Identificando los libros con el sentimiento promedio más positivo...")
+        self.exporter.export(self.rankings(top_n, ["Average Sentiment"]), combined=False)
+
+    @metrics.track()
+    def export_rankings(self, top_n: int = 10):
+        """
+        Exporta todos los rankings disponibles en una sola pasada: el de sentimiento solo si las
+        estadísticas incluyen 'compound'. Con el formato 'workbook', se escriben como hojas de un
+        mismo libro de Excel.
+
+        Args:
+            top_n (int): Número de libros por ranking.
+        """
         aggregated_data = self._aggregate_book_data()
-        books_by_sentiment = aggregated_data.sort_values(by="Average Sentiment", ascending=False).head(top_n)
-        books_by_sentiment = books_by_sentiment[["Title", "authors", "categories", "Average Sentiment"]]
+        self.exporter.export(self.rankings(top_n, [column for column in self.RANKINGS if column in aggregated_data.columns]))
+
+    def rankings(self, top_n: int = 10, columns: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Calcula los rankings pedidos a partir de los datos agregados por libro, que se calculan una sola vez.
+
+        Args:
+            top_n (int): Número de libros por ranking.
+            columns (List[str], opcional): Columnas de orden de los rankings. Por defecto, todas las de RANKINGS.
 
-        output_file = os.path.join(self.output_path, "top_libros_sentimiento_promedio.xlsx")
-        books_by_sentiment.to_excel(output_file, index=False)
-        print(f"Archivo exportado: {output_file}")
+        Returns:
+            Dict[str, pd.DataFrame]: Rankings por nombre de archivo de salida.
+        """
+        aggregated_data = self._aggregate_book_data()
+        tables = {}
+        for column in columns or list(self.RANKINGS):
+            file_name, message = self.RANKINGS[column]
+            print(message)
+            tables[file_name] = top_k(aggregated_data, top_n, by=column)[["Title", "authors", "categories", column]]
+        return tables
 
+    @metrics.track("BestBooks.aggregate_book_data")
     def _aggregate_book_data(self) -> pd.DataFrame:
         """
         Agrega los datos por libro, calculando el conteo de reseñas, promedio de puntaje, y promedio de sentimiento.
+        Los valores se derivan de las estadísticas por libro y se calculan una sola vez por instancia.
 
         Returns:
             pd.DataFrame: DataFrame con las columnas 'Title', 'authors', 'categories', 'Review Count', 'Average Rating', y 'Average Sentiment'.
         """
-        print("Agregando datos por libro...")
-        aggregated_data = (
-            self.data.groupby(["Title", "authors", "categories"])
-            .agg(
-                Review_Count=("review/text", "count"),
-                Average_Rating=("review/score", "mean"),
-                Average_Sentiment=("compound", "mean"),
-            )
-            .reset_index()
-        )
-        print("Datos agregados correctamente.")
-        return aggregated_data
\ No newline at end of file
+        if self._aggregated_data is None:
+            print("Agregando datos por libro...")
+            self._aggregated_data = self.book_stats.by_book()
+            print("Datos agregados correctamente.")
+        return self._aggregated_data
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.text_store import TextStore
+from src import metrics
+
+
+class BookStats:
+    """
+    Clase con las estadísticas suficientes por libro (conteos, sumas, suma de cuadrados e histograma
+    de calificaciones), calculadas una sola vez sobre las reseñas y compartidas por EDA y BestBooks.
+
+    Los rankings, filtros por umbral y promedios se obtienen de esta tabla, cuyo tamaño depende del
+    número de libros y no del número de reseñas. Al ser sumas, dos tablas se pueden combinar. Con pesos
+    por fila (los de una muestra estratificada), las sumas ponderadas estiman las de los datos completos.
+    """
+
+    KEYS = ["Title", "authors", "categories"]
+    RATINGS = [1, 2, 3, 4, 5]
+    SENTIMENT_COLUMNS = ["n_compound", "sum_compound"]
+
+    def __init__(
+        self,
+        data: Optional[pd.DataFrame] = None,
+        table: Optional[pd.DataFrame] = None,
+        weights: Optional[np.ndarray] = None
+    ):
+        """
+        Inicializa las estadísticas a partir de las reseñas o de una tabla ya calculada.
+
+        Args:
+            data (pd.DataFrame, opcional): DataFrame procesado con una fila por reseña.
+            table (pd.DataFrame, opcional): Tabla de estadísticas suficientes ya calculada.
+            weights (np.ndarray, opcional): Peso de cada fila de `data`, por ejemplo el de una muestra
+                estratificada (StratifiedSampler.weights). Los conteos y sumas se ponderan y dejan de ser enteros.
+        """
+        if data is None and table is None:
+            raise ValueError("Se requiere el DataFrame de reseñas o una tabla de estadísticas.")
+        self.data = data
+        self.weights = weights
+        self._table = table
+        self._group_ids = None
+        self._titles = None
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """
+        Tabla de estadísticas por (Title, authors, categories). Se calcula la primera vez que se usa
+        y se completa con las columnas de sentimiento cuando 'compound' aparece en los datos.
+        """
+        if self._table is None:
+            self._table = self._compute_table()
+        if (
+            self.data is not None
+            and "compound" in self.data.columns
+            and "sum_compound" not in self._table.columns
+        ):
+            self._table = self._table.join(self._compute_sentiment())
+        return self._table
+
+    @metrics.track("BookStats.table")
+    def _compute_table(self) -> pd.DataFrame:
+        """
+        Calcula la tabla de estadísticas con una única agrupación sobre las reseñas.
+
+        Returns:
+            pd.DataFrame: Claves del libro y estadísticas suficientes.
+        """
+        print("Calculando estadísticas por libro...")
+        grouped = self.data.groupby(self.KEYS, observed=True, dropna=False, sort=True)
+        self._group_ids = grouped.ngroup().to_numpy()
+        keys = grouped.size().index.to_frame(index=False)
+
+        # En float64 también con el formato compacto de SentimentAnalysis (int8), para no desbordar las sumas
+        scores = self.data["review/score"].astype(np.float64)
+        stats = pd.DataFrame({
+            "n_rows": 1,
+            "n_reviews": TextStore.text_present(self.data),
+            "n_score": scores.notna(),
+            "sum_score": scores,
+            "sum_sq_score": scores * scores,
+            **{f"rating_{rating}": scores == rating for rating in self.RATINGS},
+        })
+        stats = self._weighted(stats).groupby(self._group_ids, sort=True).sum()
+
+        table = pd.concat([keys, stats.reset_index(drop=True)], axis=1)
+        if self.weights is None:
+            count_columns = ["n_rows", "n_reviews", "n_score"] + [f"rating_{rating}" for rating in self.RATINGS]
+            table[count_columns] = table[count_columns].astype(np.int64)
+        print("Estadísticas por libro calculadas.")
+        return table
+
+    def _compute_sentiment(self) -> pd.DataFrame:
+        """
+        Calcula las estadísticas de 'compound' reutilizando la agrupación ya calculada.
+
+        Returns:
+            pd.DataFrame: Columnas 'n_compound' y 'sum_compound', alineadas con la tabla.
+        """
+        print("Añadiendo sentimiento a las estadísticas por libro...")
+        if self._group_ids is None:
+            self._group_ids = self.data.groupby(self.KEYS, observed=True, dropna=False, sort=True).ngroup().to_numpy()
+        compound = self.data["compound"].astype(np.float64)
+        stats = pd.DataFrame({
+            "n_compound": compound.notna().astype(np.int64),
+            "sum_compound": compound,
+        })
+        return self._weighted(stats).groupby(self._group_ids, sort=True).sum().reset_index(drop=True)
+
+    def _weighted(self, stats: pd.DataFrame) -> pd.DataFrame:
+        """
+        Multiplica las contribuciones de cada fila por su peso, si hay pesos.
+        """
+        if self.weights is None:
+            return stats
+        # Los valores nulos no contribuyen, igual que en la suma sin pesos
+        return stats.mul(self.weights, axis=0).fillna(0.0)
+
+    def by_book(self) -> pd.DataFrame:
+        """
+        Devuelve las métricas por libro (Title, authors, categories), excluyendo libros sin autor o categoría.
+
+        Returns:
+            pd.DataFrame: DataFrame con las columnas 'Title', 'authors', 'categories', 'Review Count',
+            'Average Rating' y, si hay sentimiento, 'Average Sentiment'.
+        """
+        table = self.table.dropna(subset=self.KEYS).reset_index(drop=True)
+        books = table[self.KEYS].copy()
+        books["Review Count"] = table["n_reviews"]
+        books["Average Rating"] = table["sum_score"] / table["n_score"].where(table["n_score"] > 0)
+        if "sum_compound" in table.columns:
+            books["Average Sentiment"] = table["sum_compound"] / table["n_compound"].where(table["n_compound"] > 0)
+        return books
+
+    def by_title(self) -> pd.DataFrame:
+        """
+        Devuelve las métricas por título, sumando las estadísticas de todas sus combinaciones de
+        autores y categorías.
+
+        Returns:
+            pd.DataFrame: DataFrame con las columnas 'Title', 'Row Count', 'Review Count' y 'Average Rating'.
+        """
+        if self._titles is None:
+            table = self.table.groupby("Title", observed=True, sort=True)[["n_rows", "n_reviews", "n_score", "sum_score"]].sum()
+            self._titles = pd.DataFrame({
+                "Row Count": table["n_rows"],
+                "Review Count": table["n_reviews"],
+                "Average Rating": table["sum_score"] / table["n_score"].where(table["n_score"] > 0),
+            }).reset_index()
+        return self._titles
+
+    def with_data(self, data: pd.DataFrame) -> "BookStats":
+        """
+        Devuelve estadísticas sobre las mismas reseñas con más columnas (por ejemplo, con el sentimiento
+        ya calculado), reutilizando la tabla y la agrupación ya calculadas.
+
+        Args:
+            data (pd.DataFrame): DataFrame con las mismas filas y en el mismo orden que `self.data`.
+
+        Returns:
+            BookStats: Estadísticas sobre `data`.
+        """
+        stats = BookStats(data, table=self.table, weights=self.weights)
+        stats._group_ids = self._group_ids
+        return stats
+
+    @classmethod
+    def combine(cls, *stats: "BookStats") -> "BookStats":
+        """
+        Combina varias tablas de estadísticas sumando las de un mismo libro.
+
+        Args:
+            *stats (BookStats): Estadísticas a combinar.
+
+        Returns:
+            BookStats: Estadísticas combinadas.
+        """
+        tables = [item.table.astype({key: object for key in cls.KEYS}) for item in stats]
+        combined = (
+            pd.concat(tables, ignore_index=True)
+            .groupby(cls.KEYS, dropna=False, sort=True)
+            .sum(min_count=0)
+            .reset_index()
+        )
+        return cls(table=combined)
@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+import pandas as pd
+import pyarrow as pa
+from typing import Optional, Tuple
+from src import config
+
+
+class ProcessedDataCache:
+    """
+    Clase para guardar y recuperar los datos procesados en un formato columnar binario (Arrow IPC).
+
+    Las entradas se identifican por una huella de los archivos de origen (tamaño, fecha de
+    modificación y hash del contenido) y por la versión de la lógica de procesamiento, de modo
+    que cualquier cambio en los datos o en el procesamiento invalida la caché.
+    """
+
+    HASH_BLOCK_SIZE = 8 * 1024 * 1024
+    FINGERPRINTS_FILE = "fingerprints.json"
+
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Inicializa la caché y carga la configuración desde el archivo .env.
+
+        Args:
+            cache_path (str, opcional): Carpeta de la caché. Por defecto se usa CACHE_PATH del archivo .env.
+        """
+        config.load()
+        self.cache_path = cache_path or os.getenv("CACHE_PATH")
+        if not self.cache_path:
+            raise ValueError("La ruta de la caché (CACHE_PATH) no está definida en el archivo .env.")
+        os.makedirs(self.cache_path, exist_ok=True)
+
+    def build_key(self, files: dict, processing_version: str) -> str:
+        """
+        Construye la clave de la caché a partir de la huella de cada archivo de origen.
+
+        Args:
+            files (dict): Diccionario con el nombre lógico y la ruta de cada archivo de origen.
+            processing_version (str): Versión de la lógica de procesamiento.
+
+        Returns:
+            str: Clave hexadecimal de la entrada de caché.
+        """
+        fingerprints = {name: self._file_fingerprint(path) for name, path in sorted(files.items())}
+        payload = json.dumps({"files": fingerprints, "version": processing_version}, sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def load(self, key: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Recupera los datos procesados de la caché. Los DataFrames se construyen completos en memoria.
+
+        Args:
+            key (str): Clave de la entrada de caché.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame] o None: DataFrame procesado y registros no coincidentes,
+            o None si la entrada no existe o no se puede leer.
+        """
+        processed_file, unmatched_file = self._entry_files(key)
+        if not (os.path.exists(processed_file) and os.path.exists(unmatched_file)):
+            print("No se encontró una caché válida para los datos procesados.")
+            return None
+
+        try:
+            print(f"Cargando datos procesados desde la caché: {self.cache_path}")
+            return self._read_table(processed_file), self._read_table(unmatched_file)
+        except (OSError, pa.ArrowException) as e:
+            print(f"Error al leer la caché, se reprocesarán los datos: {e}")
+            return None
+
+    def save(self, key: str, processed_data: pd.DataFrame, unmatched_data: pd.DataFrame):
+        """
+        Guarda los datos procesados en la caché y elimina las entradas obsoletas.
+
+        Args:
+            key (str): Clave de la entrada de caché.
+            processed_data (pd.DataFrame): DataFrame procesado.
+            unmatched_data (pd.DataFrame): DataFrame con los registros no coincidentes.
+        """
+        print(f"Guardando datos procesados en la caché: {self.cache_path}")
+        processed_file, unmatched_file = self._entry_files(key)
+        self._write_table(processed_data, processed_file)
+        self._write_table(unmatched_data, unmatched_file)
+
+        # Solo se conserva la entrada vigente (y su almacén de textos, si lo tiene)
+        current = {os.path.basename(processed_file), os.path.basename(unmatched_file)}
+        text_store_prefix = os.path.basename(self.text_store_path(key))
+        for file_name in os.listdir(self.cache_path):
+            if file_name.endswith(".arrow") and file_name not in current:
+                os.remove(os.path.join(self.cache_path, file_name))
+            elif file_name.startswith("texts_") and not file_name.startswith(f"{text_store_prefix}."):
+                os.remove(os.path.join(self.cache_path, file_name))
+        print("Caché actualizada.")
+
+    def text_store_path(self, key: str) -> str:
+        """
+        Devuelve la ruta (sin extensión) del almacén de textos de una entrada de caché en modo diferido.
+
+        Args:
+            key (str): Clave de la entrada de caché.
+
+        Returns:
+            str: Ruta del almacén de textos.
+        """
+        return os.path.join(self.cache_path, f"texts_{key}")
+
+    def _entry_files(self, key: str) -> Tuple[str, str]:
+        """
+        Devuelve las rutas de los archivos de una entrada de caché.
+        """
+        return (
+            os.path.join(self.cache_path, f"processed_{key}.arrow"),
+            os.path.join(self.cache_path, f"unmatched_{key}.arrow"),
+        )
+
+    def _file_fingerprint(self, path: str) -> dict:
+        """
+        Calcula la huella de un archivo: tamaño, fecha de modificación y hash del contenido.
+
+        El hash del contenido se reutiliza mientras el tamaño y la fecha de modificación no
+        cambien, para no volver a leer archivos de varios GB en cada ejecución.
+
+        Args:
+            path (str): Ruta del archivo.
+
+        Returns:
+            dict: Diccionario con las claves 'size', 'mtime' y 'hash'.
+        """
+        stat = os.stat(path)
+        fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+        known = self._read_fingerprints()
+        entry = known.get(os.path.abspath(path))
+        if entry and entry["size"] == fingerprint["size"] and entry["mtime"] == fingerprint["mtime"]:
+            fingerprint["hash"] = entry["hash"]
+            return fingerprint
+
+        print(f"Calculando hash de contenido de {path}...")
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        fingerprint["hash"] = digest.hexdigest()
+
+        known[os.path.abspath(path)] = fingerprint
+        self._write_fingerprints(known)
+        return fingerprint
+
+    def _read_fingerprints(self) -> dict:
+        """
+        Lee las huellas de archivos calculadas en ejecuciones anteriores.
+        """
+        fingerprints_file = os.path.join(self.cache_path, self.FINGERPRINTS_FILE)
+        try:
+            with open(fingerprints_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_fingerprints(self, fingerprints: dict):
+        """
+        Guarda las huellas de archivos para reutilizarlas en próximas ejecuciones.
+        """
+        fingerprints_file = os.path.join(self.cache_path, self.FINGERPRINTS_FILE)
+        with open(fingerprints_file, "w", encoding="utf-8") as f:
+            json.dump(fingerprints, f, indent=2)
+
+    @staticmethod
+    def _write_table(data: pd.DataFrame, path: str):
+        """
+        Escribe un DataFrame como archivo Arrow IPC sin compresión, que se lee sin descomprimir.
+        La escritura es atómica: se escribe en un archivo temporal y luego se renombra.
+        """
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        tmp_path = f"{path}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_table(path: str) -> pd.DataFrame:
+        """
+        Lee un archivo Arrow IPC y lo convierte a DataFrame.
+
+        El archivo se mapea en memoria para que Arrow lo lea sin una copia intermedia, pero `to_pandas`
+        copia todas las columnas: el DataFrame ocupa la memoria completa, igual que al procesar los CSV.
+        """
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
@@ -0,0 +1,148 @@
+import os
+import json
+import html
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from src import config, metrics
+
+
+def _init_worker():
+    """
+    Configura un proceso del pool para dibujar sin ventana (backend no interactivo 'Agg').
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_chart(spec: dict, path: str) -> str:
+    """
+    Dibuja un gráfico a partir de su especificación y lo guarda como imagen.
+
+    La especificación solo contiene datos ya agregados (conteos de histograma, tablas top-N),
+    por lo que cada proceso recibe unos pocos valores y no el DataFrame de reseñas.
+
+    Args:
+        spec (dict): Especificación del gráfico (ver ChartRenderer).
+        path (str): Ruta del archivo de imagen.
+
+    Returns:
+        str: Ruta del archivo generado.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=spec.get("figsize", (10, 6)))
+    kind = spec["kind"]
+    if kind == "hist":
+        # Histogramas precalculados: un valor por intervalo, ponderado con su conteo
+        for series in spec["series"]:
+            edges = series["edges"]
+            ax.hist(edges[:-1], bins=edges, weights=series["counts"], alpha=series.get("alpha", 1.0),
+                    color=series.get("color"), label=series.get("label"), edgecolor=series.get("edgecolor"))
+        if spec.get("xticks"):
+            ax.set_xticks(spec["xticks"])
+            ax.tick_params(axis="x", labelrotation=45)
+    elif kind == "barh":
+        ax.barh(spec["labels"], spec["values"], color=spec.get("color", "C0"))
+        ax.invert_yaxis()  # El primer elemento de la tabla arriba
+    elif kind == "bar":
+        ax.bar(spec["labels"], spec["values"], color=spec.get("color", "C0"))
+        ax.tick_params(axis="x", labelrotation=spec.get("rotation", 0))
+    elif kind == "pie":
+        ax.pie(spec["values"], labels=spec["labels"], colors=spec.get("colors"),
+               explode=[0.1] * len(spec["values"]), autopct="%1.1f%%", shadow=True)
+    else:
+        plt.close(fig)
+        raise ValueError(f"Tipo de gráfico no soportado: {kind}")
+
+    ax.set_title(spec.get("title", ""), fontsize=14)
+    ax.set_xlabel(spec.get("xlabel", ""))
+    ax.set_ylabel(spec.get("ylabel", ""))
+    if spec.get("grid"):
+        ax.grid(axis=spec["grid"], linestyle="--", alpha=0.7)
+    if any(series.get("label") for series in spec.get("series", [])):
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=spec.get("dpi", 100))
+    plt.close(fig)
+    return path
+
+
+class ChartRenderer:
+    """
+    Clase para generar todos los gráficos sin interfaz gráfica, en procesos paralelos, a partir de
+    especificaciones con datos ya agregados.
+
+    Cada especificación es un diccionario con las claves:
+        - 'name': nombre del archivo de imagen (sin extensión).
+        - 'kind': 'hist', 'barh', 'bar' o 'pie'.
+        - 'title', 'xlabel', 'ylabel', 'figsize' y 'grid' (opcionales).
+        - Para 'hist': 'series', lista de diccionarios con 'edges', 'counts' y, opcionalmente,
+          'label', 'color', 'alpha' y 'edgecolor'; además 'xticks' (opcional).
+        - Para 'barh' y 'bar': 'labels', 'values' y 'color' (opcional).
+        - Para 'pie': 'labels', 'values' y 'colors' (opcional).
+    """
+
+    def __init__(self, output_path: Optional[str] = None, n_jobs: Optional[int] = None):
+        """
+        Inicializa el generador y carga la configuración desde el archivo .env.
+
+        Args:
+            output_path (str, opcional): Carpeta de las imágenes. Por defecto se usa CHARTS_PATH del
+                archivo .env o la subcarpeta 'charts' de OUTPUT_PATH.
+            n_jobs (int, opcional): Número de procesos. Por defecto se usa RENDER_WORKERS del archivo
+                .env (0 usa todos los núcleos).
+        """
+        config.load()
+        self.output_path = output_path or os.getenv("CHARTS_PATH")
+        if not self.output_path:
+            base_path = os.getenv("OUTPUT_PATH")
+            if not base_path:
+                raise ValueError("La ruta de salida (CHARTS_PATH u OUTPUT_PATH) no está definida en el archivo .env.")
+            self.output_path = os.path.join(base_path, "charts")
+        os.makedirs(self.output_path, exist_ok=True)
+        self.n_jobs = n_jobs if n_jobs is not None else int(os.getenv("RENDER_WORKERS", 0))
+
+    @metrics.track()
+    def render_all(self, specs: List[dict]) -> str:
+        """
+        Genera las imágenes de todas las especificaciones en paralelo y escribe un índice resumen.
+
+        Args:
+            specs (List[dict]): Especificaciones de los gráficos.
+
+        Returns:
+            str: Ruta del índice generado ('index.html').
+        """
+        n_jobs = min(self.n_jobs or os.cpu_count() or 1, max(len(specs), 1))
+        paths = [os.path.join(self.output_path, f"{spec['name']}.png") for spec in specs]
+        print(f"Generando {len(specs)} gráficos en {n_jobs} procesos: {self.output_path}")
+
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as executor:
+            list(executor.map(_render_chart, specs, paths))
+
+        index_path = self._write_index(specs)
+        print(f"Gráficos generados. Índice: {index_path}")
+        return index_path
+
+    def _write_index(self, specs: List[dict]) -> str:
+        """
+        Escribe el índice resumen: una página HTML con todos los gráficos y un JSON con su listado.
+        """
+        entries = [
+            {"name": spec["name"], "title": spec.get("title", ""), "kind": spec["kind"], "file": f"{spec['name']}.png"}
+            for spec in specs
+        ]
+        with open(os.path.join(self.output_path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+
+        sections = "\n".join(
+            f'<section><h2>{html.escape(entry["title"])}</h2><img src="{html.escape(entry["file"])}"></section>'
+            for entry in entries
+        )
+        index_path = os.path.join(self.output_path, "index.html")
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write(
+                '<!DOCTYPE html>\n<html lang="es">\n<head><meta charset="utf-8"><title>Gráficos</title></head>\n'
+                f"<body>\n<h1>Gráficos del análisis</h1>\n{sections}\n</body>\n</html>\n"
+            )
+        return index_path
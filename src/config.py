@@ -0,0 +1,39 @@
+import os
+import threading
+
+# Si el archivo .env ya se leyó en este proceso
+_loaded = False
+_lock = threading.Lock()
+
+
+def load():
+    """
+    Carga las variables del archivo .env en el entorno, una sola vez por proceso.
+
+    Todas las clases llaman a esta función antes de leer su configuración con `os.getenv`; solo la
+    primera llamada busca y lee el archivo. Como en `load_dotenv`, las variables ya definidas en el
+    entorno tienen prioridad sobre las del archivo.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
+
+
+def get(name: str, default=None):
+    """
+    Devuelve una variable de configuración, leyendo antes el archivo .env si aún no se ha leído.
+
+    Args:
+        name (str): Nombre de la variable.
+        default: Valor si la variable no está definida.
+
+    Returns:
+        str: Valor de la variable, o `default`.
+    """
+    load()
+    return os.getenv(name, default)
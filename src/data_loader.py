@@ -1,8 +1,22 @@
 import os
+import json
+import itertools
+import re
+import tempfile
+import numpy as np
 import pandas as pd
-from dotenv import load_dotenv
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from concurrent.futures import ThreadPoolExecutor
 import ast  # Para evaluar cadenas con listas como Python objects
-from typing import Tuple
+from typing import Iterator, Optional, Tuple
+from src.cache import ProcessedDataCache
+from src.partitioned_join import PartitionedJoin
+from src.text_store import TextStore
+from src.dedup import RowDeduplicator
+from src.preview import StratifiedSampler
+from src.title_resolver import TitleResolver
+from src import config, metrics
 
 
 class DataLoader:
@@ -10,34 +24,146 @@ class DataLoader:
     Clase para la carga, limpieza y procesamiento de datos desde una ubicación especificada.
     """
 
-    def __init__(self):
+    # Columnas que realmente utiliza process_data y tipos compactos para su lectura
+    BOOKS_DATA_COLUMNS = ["Title", "authors", "categories", "ratingsCount"]
+    BOOKS_RATING_COLUMNS = ["Title", "review/score", "review/text"]
+    BOOKS_DATA_DTYPES = {"ratingsCount": "float32"}
+    # 'review/score' se mantiene en float64: en float32 los promedios por libro cambian en los
+    # últimos decimales y algunos libros caen en otro intervalo del histograma de calificaciones
+    BOOKS_RATING_DTYPES = {"review/score": "float64"}
+
+    # Formato habitual de las listas en 'authors' y 'categories': ['a', "b"], sin escapes ni saltos de línea
+    LIST_LITERAL_PATTERN = re.compile(
+        r"""\[(?:'[^'\\\n\r]*'|"[^"\\\n\r]*")(?:, (?:'[^'\\\n\r]*'|"[^"\\\n\r]*"))*\]"""
+    )
+    LIST_ITEM_PATTERN = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+
+    # Versión de la lógica de procesamiento; debe incrementarse al cambiar process_data
+    # para invalidar los datos procesados guardados en caché
+    PROCESSING_VERSION = "2"
+
+    # Columnas de texto repetidas en cada reseña que se codifican como categóricas
+    ENCODED_COLUMNS = ["Title", "authors", "categories"]
+
+    # Tamaño de bloque por defecto para la carga en modo streaming
+    DEFAULT_CHUNK_SIZE = 500_000
+
+    # Lectores de CSV: el de pandas (un hilo) y el de Arrow (varios hilos, por bloques de bytes)
+    CSV_ENGINES = ("pandas", "pyarrow")
+    # Bytes por bloque que cada hilo del lector de Arrow analiza por separado
+    ARROW_BLOCK_SIZE = 16 * 2**20
+    # Valores que pandas lee como nulos por defecto; el lector de Arrow usa la misma lista
+    NULL_VALUES = [
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+        "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    ]
+
+    def __init__(
+        self,
+        chunksize: Optional[int] = None,
+        categorical: bool = True,
+        join_partitions: Optional[int] = None,
+        lazy_text: Optional[bool] = None,
+        csv_engine: Optional[str] = None,
+        title_matching: Optional[str] = None
+    ):
         """
         Inicializa la clase DataLoader y carga la configuración desde el archivo .env.
+
+        Args:
+            chunksize (int, opcional): Número de filas por bloque en la carga en modo streaming.
+                Si no se indica, se usa CHUNK_SIZE del archivo .env o el valor por defecto.
+            categorical (bool): Si es True, 'Title', 'authors' y 'categories' se entregan como columnas
+                categóricas (códigos enteros con una tabla de valores compartida) en lugar de cadenas.
+            join_partitions (int, opcional): Si es mayor que 0, la unión con 'books_data' se hace por
+                particiones, repartiendo ambos archivos en ese número de particiones en disco; el resultado
+                se reúne en memoria. Si no se indica, se usa JOIN_PARTITIONS del archivo .env (0 por
+                defecto: unión en memoria).
+            lazy_text (bool, opcional): Si es True, 'review/text' se guarda en un almacén compacto en disco
+                (TextStore) y el DataFrame procesado solo lleva un identificador entero por fila ('text_id');
+                los textos se leen por lotes al calcular el sentimiento. Si no se indica, se usa TEXT_STORE
+                del archivo .env (0 por defecto).
+            csv_engine (str, opcional): Lector de los archivos CSV: 'pandas' o 'pyarrow'. Con 'pyarrow', ambos
+                archivos se leen a la vez con el lector de Arrow, que analiza bloques del archivo en varios
+                hilos, y solo las columnas que necesita process_data. Si no se indica, se usa CSV_ENGINE del
+                archivo .env ('pandas' por defecto).
+            title_matching (str, opcional): Unión de las reseñas con los libros: 'exact' (por 'Title'),
+                'normalized' (además, por una clave normalizada del título) o 'fuzzy' (además, por
+                coincidencia aproximada con umbral TITLE_MATCH_THRESHOLD). Si no se indica, se usa
+                TITLE_MATCHING del archivo .env ('exact' por defecto).
         """
-        load_dotenv()  # Carga las variables del archivo .env
+        config.load()  # Carga las variables del archivo .env (una sola vez por proceso)
         self.data_path = os.getenv("DATA_PATH")  # Ruta de los datos
         if not self.data_path:
             raise ValueError("La ruta de los datos (DATA_PATH) no está definida en el archivo .env.")
+        self.chunksize = chunksize or int(os.getenv("CHUNK_SIZE", self.DEFAULT_CHUNK_SIZE))
+        if self.chunksize <= 0:
+            raise ValueError("El tamaño de bloque (CHUNK_SIZE) debe ser un entero positivo.")
+        self.categorical = categorical
+        self.join_partitions = join_partitions if join_partitions is not None else int(os.getenv("JOIN_PARTITIONS", 0))
+        self.join_workers = int(os.getenv("JOIN_WORKERS", 0)) or os.cpu_count() or 1
+        self.spill_path = os.getenv("SPILL_PATH")
+        self.lazy_text = lazy_text if lazy_text is not None else os.getenv("TEXT_STORE", "0") == "1"
+        self.csv_engine = csv_engine or os.getenv("CSV_ENGINE", "pandas")
+        if self.csv_engine not in self.CSV_ENGINES:
+            raise ValueError(f"Lector de CSV (CSV_ENGINE) no soportado: {self.csv_engine}. Use uno de {self.CSV_ENGINES}.")
+        self.title_matching = title_matching or os.getenv("TITLE_MATCHING", "exact")
+        if self.title_matching not in TitleResolver.MODES:
+            raise ValueError(f"Unión de títulos (TITLE_MATCHING) no soportada: {self.title_matching}. Use una de {TitleResolver.MODES}.")
+        self.title_match_threshold = float(os.getenv("TITLE_MATCH_THRESHOLD", TitleResolver.DEFAULT_THRESHOLD))
+        self.title_resolver = None  # Resolutor de títulos de los últimos datos procesados
+        self.text_store = None  # Almacén de textos de los últimos datos procesados en modo diferido
+        self._text_store_path = None
 
-    def load_data(self) -> dict:
+    @metrics.track()
+    def load_data(self, streaming: bool = False) -> dict:
         """
         Carga los datos desde la ubicación especificada.
 
+        En modo streaming solo se leen las columnas que necesita process_data, con tipos
+        compactos, y 'books_rating' se entrega como un iterador de bloques de `chunksize`
+        filas en lugar de un DataFrame completo. Con el lector de Arrow, ambos archivos se leen
+        a la vez y siempre solo con esas columnas.
+
+        Args:
+            streaming (bool): Si es True, carga 'books_rating' por bloques.
+
         Returns:
             dict: Un diccionario con los DataFrames cargados.
         """
         try:
             print(f"Cargando datos desde: {self.data_path}")
-            files = {
-                "books_data": os.path.join(self.data_path, "books_data.csv"),
-                "books_rating": os.path.join(self.data_path, "books_rating.csv")
-            }
+            files = self._source_files()
 
             for file_name, file_path in files.items():
                 print(f"Buscando {file_name} en {file_path}")
                 if not os.path.exists(file_path):
                     raise FileNotFoundError(f"El archivo {file_name} no se encuentra en {file_path}")
 
+            if self.csv_engine == "pyarrow":
+                print("Cargando datos con el lector de CSV de Arrow (ambos archivos a la vez)...")
+                data = self._read_arrow(files, streaming)
+                print("Lector por bloques preparado." if streaming else "Datos cargados correctamente.")
+                return data
+
+            if streaming:
+                print(f"Cargando datos en modo streaming (bloques de {self.chunksize} filas)...")
+                data = {
+                    "books_data": pd.read_csv(
+                        files["books_data"],
+                        usecols=self.BOOKS_DATA_COLUMNS,
+                        dtype=self.BOOKS_DATA_DTYPES
+                    ),
+                    "books_rating": pd.read_csv(
+                        files["books_rating"],
+                        usecols=self.BOOKS_RATING_COLUMNS,
+                        dtype=self.BOOKS_RATING_DTYPES,
+                        chunksize=self.chunksize
+                    )
+                }
+                print("Lector por bloques preparado.")
+                return data
+
             # Cargar los datos en DataFrames
             data = {
                 "books_data": pd.read_csv(files["books_data"]),
@@ -49,6 +175,230 @@ class DataLoader:
             print(f"Error al cargar los datos: {e}")
             return {}
 
+    def load_delta(self, delta_path: str) -> dict:
+        """
+        Carga 'books_data' junto con un archivo de reseñas nuevas con el formato de 'books_rating',
+        leyendo solo las columnas que necesita process_data y con los mismos tipos que el modo streaming.
+
+        Args:
+            delta_path (str): Ruta del archivo CSV con las reseñas nuevas.
+
+        Returns:
+            dict: Un diccionario con los DataFrames cargados.
+        """
+        try:
+            files = {"books_data": self._source_files()["books_data"], "books_rating": delta_path}
+            for file_name, file_path in files.items():
+                print(f"Buscando {file_name} en {file_path}")
+                if not os.path.exists(file_path):
+                    raise FileNotFoundError(f"El archivo {file_name} no se encuentra en {file_path}")
+
+            if self.csv_engine == "pyarrow":
+                data = self._read_arrow(files, streaming=False)
+                print("Datos cargados correctamente.")
+                return data
+
+            data = {
+                "books_data": pd.read_csv(
+                    files["books_data"], usecols=self.BOOKS_DATA_COLUMNS, dtype=self.BOOKS_DATA_DTYPES
+                ),
+                "books_rating": pd.read_csv(
+                    files["books_rating"], usecols=self.BOOKS_RATING_COLUMNS, dtype=self.BOOKS_RATING_DTYPES
+                )
+            }
+            print("Datos cargados correctamente.")
+            return data
+        except Exception as e:
+            print(f"Error al cargar los datos: {e}")
+            return {}
+
+    def _read_arrow(self, files: dict, streaming: bool) -> dict:
+        """
+        Lee ambos archivos a la vez, cada uno con el lector de CSV de Arrow en varios hilos, solo con las
+        columnas que necesita process_data y los mismos tipos que el modo streaming.
+
+        Args:
+            files (dict): Rutas de 'books_data' y 'books_rating'.
+            streaming (bool): Si es True, 'books_rating' se entrega como un iterador de bloques.
+
+        Returns:
+            dict: Un diccionario con los DataFrames cargados.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            books_data = executor.submit(
+                self._read_csv_arrow, files["books_data"], self.BOOKS_DATA_COLUMNS, self.BOOKS_DATA_DTYPES
+            )
+            books_rating = executor.submit(
+                self._read_chunks_arrow if streaming else self._read_csv_arrow,
+                files["books_rating"], self.BOOKS_RATING_COLUMNS, self.BOOKS_RATING_DTYPES
+            )
+            return {"books_data": books_data.result(), "books_rating": books_rating.result()}
+
+    def _read_csv_arrow(self, path: str, columns: list, dtypes: dict) -> pd.DataFrame:
+        """
+        Lee un archivo CSV completo con el lector de Arrow y lo convierte a pandas al final, liberando
+        la tabla de Arrow a medida que se convierte.
+        """
+        table = pa_csv.read_csv(path, **self._arrow_options(columns, dtypes))
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def _read_chunks_arrow(self, path: str, columns: list, dtypes: dict) -> Iterator[pd.DataFrame]:
+        """
+        Abre un archivo CSV con el lector por lotes de Arrow y lo entrega en bloques de `chunksize`
+        filas, con el mismo índice que los bloques de pandas.
+        """
+        reader = pa_csv.open_csv(path, **self._arrow_options(columns, dtypes))
+
+        def chunks():
+            # Los lotes de Arrow no coinciden con `chunksize`: se acumulan y se cortan sin copiar datos
+            pending, start = reader.schema.empty_table(), 0
+            for batch in itertools.chain(reader, [None]):
+                if batch is not None:
+                    pending = pa.concat_tables([pending, pa.Table.from_batches([batch])])
+                while pending.num_rows >= self.chunksize or (batch is None and pending.num_rows):
+                    chunk = pending.slice(0, self.chunksize).to_pandas(split_blocks=True)
+                    chunk.index = pd.RangeIndex(start, start + len(chunk))
+                    pending, start = pending.slice(len(chunk)), start + len(chunk)
+                    yield chunk
+
+        return chunks()
+
+    def _arrow_options(self, columns: list, dtypes: dict) -> dict:
+        """
+        Opciones del lector de Arrow equivalentes a las de pandas: textos entre comillas con saltos de
+        línea, los mismos valores nulos (también en las columnas de texto) y tipos fijos por columna.
+        """
+        return {
+            "read_options": pa_csv.ReadOptions(use_threads=True, block_size=self.ARROW_BLOCK_SIZE),
+            "parse_options": pa_csv.ParseOptions(newlines_in_values=True),
+            "convert_options": pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={
+                    column: pa.from_numpy_dtype(np.dtype(dtypes[column])) if column in dtypes else pa.string()
+                    for column in columns
+                },
+                null_values=self.NULL_VALUES,
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=True,
+            ),
+        }
+
+    @staticmethod
+    def row_fingerprints(data: pd.DataFrame, text_store: Optional[TextStore] = None) -> np.ndarray:
+        """
+        Calcula una huella de 64 bits por fila a partir de todas sus columnas. Las columnas
+        numéricas se llevan a float64 para que la huella no dependa del tipo con que se leyeron,
+        y las categóricas producen la misma huella que sus valores en texto.
+
+        Args:
+            data (pd.DataFrame): DataFrame procesado.
+            text_store (TextStore, opcional): Almacén de textos, si `data` lleva 'text_id' en lugar de
+                'review/text'. Los textos se leen por lotes y la huella es la misma que con los textos.
+
+        Returns:
+            np.ndarray: Huellas uint64, una por fila.
+        """
+        if text_store is not None and TextStore.ID_COLUMN in data.columns:
+            batch_size = TextStore.DEFAULT_BATCH_SIZE
+            parts = [
+                DataLoader.row_fingerprints(text_store.with_text(data.iloc[start:start + batch_size]))
+                for start in range(0, len(data), batch_size)
+            ]
+            return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+
+        # También las enteras, como 'review/score' en int8 en el formato compacto de SentimentAnalysis
+        numeric_columns = data.select_dtypes(include="number").columns
+        normalized = data.astype({column: "float64" for column in numeric_columns})
+        return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+    @metrics.track()
+    def load_processed_data(
+        self, streaming: bool = True, use_cache: bool = True, sampler: Optional[StratifiedSampler] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Carga y procesa los datos reutilizando la caché columnar cuando los archivos de origen
+        y la versión del procesamiento no han cambiado.
+
+        Args:
+            streaming (bool): Si es True, la carga sin caché se hace por bloques.
+            use_cache (bool): Si es False, se ignora la caché y no se actualiza.
+            sampler (StratifiedSampler, opcional): Si se indica, se devuelve solo una muestra estratificada
+                de los datos procesados, obtenida mientras se cargan. La caché se lee, pero no se actualiza.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: DataFrame combinado y limpio, y DataFrame con registros no coincidentes.
+        """
+        cache, key = None, None
+        self._text_store_path = None
+        if use_cache:
+            try:
+                cache = ProcessedDataCache()
+                key = cache.build_key(self._source_files(), self._processing_signature())
+                if self.lazy_text:
+                    # En modo diferido la entrada solo es válida junto con su almacén de textos
+                    self._text_store_path = cache.text_store_path(key)
+                cached = cache.load(key) if not self.lazy_text or TextStore.exists(self._text_store_path) else None
+                if cached is not None:
+                    if self.lazy_text:
+                        self.text_store = TextStore(self._text_store_path)
+                    if sampler is not None:
+                        sampler.add(cached[0])
+                        return sampler.sample(), cached[1]
+                    return cached
+            except (OSError, ValueError) as e:
+                print(f"Caché no disponible, se procesarán los datos: {e}")
+                cache, self._text_store_path = None, None
+
+        data = self.load_data(streaming=streaming)
+        if not data:
+            return pd.DataFrame(), pd.DataFrame()
+        processed_data, unmatched_data = self.process_data(data, sampler)
+        self._text_store_path = None
+
+        if cache is not None and sampler is None and not processed_data.empty:
+            cache.save(key, processed_data, unmatched_data)
+        return processed_data, unmatched_data
+
+    def source_stamp(self) -> str:
+        """
+        Devuelve una firma ligera de los archivos de origen (tamaño y fecha de modificación) y de la
+        versión del procesamiento, sin leer su contenido.
+
+        Returns:
+            str: Firma de los datos de entrada.
+        """
+        stamps = {}
+        for name, path in sorted(self._source_files().items()):
+            stat = os.stat(path) if os.path.exists(path) else None
+            stamps[name] = [stat.st_size, stat.st_mtime_ns] if stat else None
+        return json.dumps({"files": stamps, "processing": self._processing_signature()}, sort_keys=True)
+
+    def _processing_signature(self) -> str:
+        """
+        Devuelve la versión del procesamiento junto con las opciones que cambian su resultado.
+
+        Returns:
+            str: Firma del procesamiento usada en la clave de la caché.
+        """
+        signature = f"{self.PROCESSING_VERSION}-{'categorical' if self.categorical else 'object'}"
+        if self.title_matching == "normalized":
+            signature = f"{signature}-titles-normalized"
+        elif self.title_matching == "fuzzy":
+            signature = f"{signature}-titles-fuzzy-{self.title_match_threshold}"
+        return f"{signature}-textstore" if self.lazy_text else signature
+
+    def _source_files(self) -> dict:
+        """
+        Devuelve las rutas de los archivos de origen.
+
+        Returns:
+            dict: Diccionario con el nombre lógico y la ruta de cada archivo.
+        """
+        return {
+            "books_data": os.path.join(self.data_path, "books_data.csv"),
+            "books_rating": os.path.join(self.data_path, "books_rating.csv")
+        }
+
     @staticmethod
     def clean_column(value):
         """
@@ -67,54 +417,327 @@ class DataLoader:
             # Si falla, devuelve el valor original o NaN
             return value
 
-    def process_data(self, data: dict) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    @classmethod
+    def parse_list_value(cls, value):
+        """
+        Versión rápida de clean_column para el formato habitual de lista ['a', 'b'].
+        Cualquier otro valor se delega en clean_column, por lo que el resultado es siempre el mismo.
+
+        Args:
+            value (str): Valor de la columna.
+
+        Returns:
+            str: Cadena limpia con valores unidos por comas.
+        """
+        if isinstance(value, str):
+            if value == "[]":
+                return ""
+            if cls.LIST_LITERAL_PATTERN.fullmatch(value):
+                return ", ".join(single or double for single, double in cls.LIST_ITEM_PATTERN.findall(value))
+        return cls.clean_column(value)
+
+    @classmethod
+    def clean_series(cls, series: pd.Series) -> pd.Series:
+        """
+        Aplica la limpieza de clean_column a una columna completa, interpretando cada valor
+        distinto una sola vez y replicando el resultado en todas las filas que lo contienen.
+
+        Args:
+            series (pd.Series): Columna con listas en formato string.
+
+        Returns:
+            pd.Series: Columna limpia, con el mismo índice.
+        """
+        cleaned = {value: cls.parse_list_value(value) for value in series.dropna().unique()}
+        return series.map(cleaned)
+
+    @classmethod
+    def encode_columns(cls, books_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Codifica las columnas de texto de los libros como categóricas. Al unir las reseñas, cada fila
+        copia solo el código entero y las agrupaciones posteriores trabajan sobre esos códigos.
+
+        Args:
+            books_data (pd.DataFrame): DataFrame de libros ya limpio.
+
+        Returns:
+            pd.DataFrame: DataFrame con 'Title', 'authors' y 'categories' categóricas.
+        """
+        return books_data.astype({column: "category" for column in cls.ENCODED_COLUMNS})
+
+    @metrics.track()
+    def process_data(self, data: dict, sampler: Optional[StratifiedSampler] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Procesa los datos combinando ambos DataFrames, limpiando columnas y eliminando duplicados y nulos.
 
         Args:
             data (dict): Diccionario con los DataFrames cargados.
+            sampler (StratifiedSampler, opcional): Si se indica, las filas procesadas pasan por el muestreador
+                (bloque a bloque en la carga por bloques) y se devuelve solo la muestra.
 
         Returns:
             Tuple[pd.DataFrame, pd.DataFrame]: DataFrame combinado y limpio, y DataFrame con registros no coincidentes.
         """
         try:
+            text_writer = self._create_text_store() if self.lazy_text else None
+
             # Reducir columnas antes del merge
             print("Filtrando columnas necesarias en DataFrames originales...")
-            data["books_data"] = data["books_data"][["Title", "authors", "categories", "ratingsCount"]]
-            data["books_rating"] = data["books_rating"][["Title", "review/score", "review/text"]]
-
-            # Identificar registros no coincidentes
-            print("Identificando registros no coincidentes...")
-            unmatched_ratings = data["books_rating"][~data["books_rating"]["Title"].isin(data["books_data"]["Title"])]
-
-            # Unir ambos DataFrames por la columna "Title"
-            print("Uniendo DataFrames por la columna 'Title'...")
-            merged_df = pd.merge(
-                data["books_data"],
-                data["books_rating"],
-                on="Title",
-                how="inner"
-            )
+            data["books_data"] = data["books_data"][self.BOOKS_DATA_COLUMNS].copy()
 
-            # Limpiar columnas específicas con la función optimizada
+            # Limpiar columnas específicas antes del merge, una vez por valor distinto
             print("Limpiando columnas 'authors' y 'categories'...")
-            merged_df["authors"] = merged_df["authors"].apply(self.clean_column)
-            merged_df["categories"] = merged_df["categories"].apply(self.clean_column)
+            data["books_data"]["authors"] = self.clean_series(data["books_data"]["authors"])
+            data["books_data"]["categories"] = self.clean_series(data["books_data"]["categories"])
 
-            # Eliminar registros con "review/text" vacío o NaN
-            print("Eliminando registros con 'review/text' vacío o NaN...")
-            merged_df = merged_df[~merged_df["review/text"].isnull() & (merged_df["review/text"] != "")]
+            if self.categorical:
+                print("Codificando 'Title', 'authors' y 'categories' como categóricas...")
+                data["books_data"] = self.encode_columns(data["books_data"])
 
-            # Eliminar duplicados
-            print("Eliminando duplicados...")
-            merged_df = merged_df.drop_duplicates()
+            self.title_resolver = None
+            if self.title_matching != "exact":
+                # Los títulos de las reseñas se resuelven antes de la unión, bloque a bloque en la carga por bloques
+                print("Preparando la resolución de títulos sin coincidencia exacta...")
+                self.title_resolver = TitleResolver(
+                    data["books_data"]["Title"], fuzzy=self.title_matching == "fuzzy", threshold=self.title_match_threshold
+                )
+                data["books_rating"] = self.title_resolver.resolve_ratings(data["books_rating"])
 
-            print("Procesamiento completado.")
+            if self.join_partitions > 0:
+                merged_df, unmatched_ratings = self._process_partitioned(
+                    data["books_data"], data["books_rating"], text_writer, sampler
+                )
+                sampler = None  # Con muestreador, la muestra ya se obtuvo partición a partición
+            elif not isinstance(data["books_rating"], pd.DataFrame):
+                merged_df, unmatched_ratings = self._process_chunks(
+                    data["books_data"], data["books_rating"], text_writer, sampler
+                )
+                sampler = None  # La muestra ya se obtuvo bloque a bloque
+            else:
+                data["books_rating"] = data["books_rating"][self.BOOKS_RATING_COLUMNS]
+                merged_df, unmatched_ratings = self._merge_and_clean(data["books_data"], data["books_rating"], text_writer)
+
+                # Eliminar duplicados
+                print("Eliminando duplicados...")
+                deduplicator = RowDeduplicator(persistent=False)
+                merged_df = deduplicator.deduplicate(merged_df)
+                self._report_duplicates(deduplicator)
+                metrics.count("rows_after_dedup", len(merged_df))
+                print("Procesamiento completado.")
+
+            if sampler is not None and not merged_df.empty:
+                sampler.add(merged_df)
+                merged_df = sampler.sample()
+            if self.title_resolver is not None:
+                self.title_resolver.report()
+            if text_writer is not None:
+                self.text_store = text_writer.finish()
             return merged_df, unmatched_ratings
         except Exception as e:
             print(f"Error al procesar los datos: {e}")
             return pd.DataFrame(), pd.DataFrame()
 
+    def _create_text_store(self) -> TextStore:
+        """
+        Crea el almacén de textos del modo diferido: junto a la entrada de la caché, o en una carpeta
+        temporal si los datos no se guardan en caché.
+
+        Returns:
+            TextStore: Almacén en modo escritura.
+        """
+        if self._text_store_path:
+            return TextStore.create(self._text_store_path)
+        if self.spill_path:
+            os.makedirs(self.spill_path, exist_ok=True)
+        text_dir = tempfile.mkdtemp(prefix="texts_", dir=self.spill_path or None)
+        return TextStore.create(os.path.join(text_dir, "texts"), temporary=True)
+
+    def _process_chunks(
+        self,
+        books_data: pd.DataFrame,
+        rating_chunks,
+        text_store: Optional[TextStore] = None,
+        sampler: Optional[StratifiedSampler] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Procesa 'books_rating' bloque a bloque: cada bloque se filtra, se une con 'books_data',
+        se limpia y se deduplica, de modo que la memoria máxima depende del tamaño del bloque y no
+        del tamaño del archivo. Los duplicados se buscan por huella contra todos los bloques
+        anteriores, sin volver a comparar el resultado unido. Al final, las filas se reordenan por
+        la posición de su libro, como en la unión de los datos completos.
+
+        Args:
+            books_data (pd.DataFrame): DataFrame de libros con las columnas necesarias.
+            rating_chunks (Iterable[pd.DataFrame]): Bloques de 'books_rating'.
+            text_store (TextStore, opcional): Almacén donde se guardan los textos en modo diferido.
+            sampler (StratifiedSampler, opcional): Si se indica, cada bloque deduplicado pasa por el muestreador
+                en lugar de conservarse, y se devuelve la muestra.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: DataFrame combinado y limpio, y DataFrame con registros no coincidentes.
+        """
+        merged_parts, unmatched_parts = [], []
+        deduplicator = None
+        rows_read = 0
+        for i, chunk in enumerate(rating_chunks, start=1):
+            print(f"Procesando bloque {i} ({len(chunk)} filas)...")
+            # Cada fila unida lleva la posición de su libro para recuperar el orden de la unión completa
+            merged_chunk, unmatched_chunk = self._merge_and_clean(
+                books_data, chunk[self.BOOKS_RATING_COLUMNS], text_store, keep_book=True
+            )
+            if deduplicator is None:
+                deduplicator = RowDeduplicator([column for column in merged_chunk.columns if column != PartitionedJoin.BOOK])
+            merged_chunk = deduplicator.deduplicate(merged_chunk)
+            if sampler is not None:
+                sampler.add(merged_chunk.drop(columns=[PartitionedJoin.BOOK]))
+            else:
+                merged_parts.append(merged_chunk)
+            unmatched_parts.append(unmatched_chunk)
+            metrics.count("rows_after_chunk_dedup", len(merged_chunk))
+            rows_read += len(chunk)
+            metrics.progress(rows_read)
+
+        if not unmatched_parts:
+            return pd.DataFrame(), pd.DataFrame()
+
+        if sampler is not None:
+            merged_df = sampler.sample()
+        else:
+            # Cada bloque sale ordenado por libro y, dentro de cada libro, por reseña; una ordenación
+            # estable por libro da el orden de la unión completa (y de sus desempates posteriores)
+            merged_df = pd.concat(merged_parts, ignore_index=True)
+            order = np.argsort(merged_df[PartitionedJoin.BOOK].to_numpy(), kind="stable")
+            merged_df = merged_df.iloc[order].drop(columns=[PartitionedJoin.BOOK]).reset_index(drop=True)
+        unmatched_ratings = pd.concat(unmatched_parts)
+        self._report_duplicates(deduplicator)
+        metrics.count("rows_after_dedup", sampler.rows_seen if sampler is not None else len(merged_df))
+
+        print("Procesamiento completado.")
+        return merged_df, unmatched_ratings
+
+    @staticmethod
+    def _report_duplicates(deduplicator: RowDeduplicator):
+        """
+        Informa de cuántas filas duplicadas se eliminaron.
+        """
+        print(f"Duplicados eliminados: {deduplicator.removed} filas.")
+        metrics.count("duplicates_removed", deduplicator.removed)
+
+    def _process_partitioned(
+        self,
+        books_data: pd.DataFrame,
+        books_rating,
+        text_store: Optional[TextStore] = None,
+        sampler: Optional[StratifiedSampler] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Procesa los datos con la unión por particiones: ambos archivos se reparten por título en
+        particiones en disco y cada partición se une, se limpia y se deduplica por separado. El
+        resultado tiene las mismas filas y en el mismo orden que el procesamiento en memoria, y se
+        reúne completo en memoria (salvo con `sampler`).
+
+        Args:
+            books_data (pd.DataFrame): DataFrame de libros con las columnas necesarias.
+            books_rating (pd.DataFrame o Iterable[pd.DataFrame]): 'books_rating' completo o por bloques.
+            text_store (TextStore, opcional): Almacén donde se guardan los textos en modo diferido.
+            sampler (StratifiedSampler, opcional): Si se indica, cada partición pasa por el muestreador en
+                cuanto se une, sin reunir el resultado completo en memoria, y se devuelve la muestra.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: DataFrame combinado y limpio, y DataFrame con registros no coincidentes.
+        """
+        rating_chunks = [books_rating] if isinstance(books_rating, pd.DataFrame) else books_rating
+        rating_chunks = (chunk[self.BOOKS_RATING_COLUMNS] for chunk in rating_chunks)
+        print(f"Repartiendo los datos en {self.join_partitions} particiones en disco...")
+        join = PartitionedJoin(books_data, self.join_partitions, self.join_workers, self.spill_path, text_store)
+        if sampler is None:
+            merged_df, unmatched_ratings = join.join(rating_chunks)
+        else:
+            unmatched_parts = []
+            for merged_part, unmatched_part in join.partitions(rating_chunks):
+                if len(merged_part):
+                    sampler.add(merged_part.drop(columns=[PartitionedJoin.BOOK, PartitionedJoin.ROW]))
+                unmatched_parts.append(unmatched_part)
+            merged_df, unmatched_ratings = sampler.sample(), PartitionedJoin.combine_unmatched(unmatched_parts)
+
+        print("Procesamiento completado.")
+        return merged_df, unmatched_ratings
+
+    def _merge_and_clean(
+        self,
+        books_data: pd.DataFrame,
+        books_rating: pd.DataFrame,
+        text_store: Optional[TextStore] = None,
+        keep_book: bool = False
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Une las reseñas con los libros ya limpios y elimina reseñas vacías. Las filas unidas quedan
+        ordenadas por libro y, dentro de cada libro, por reseña.
+
+        Args:
+            books_data (pd.DataFrame): DataFrame de libros con las columnas necesarias.
+            books_rating (pd.DataFrame): DataFrame (o bloque) de reseñas con las columnas necesarias.
+            text_store (TextStore, opcional): Si se indica, los textos se guardan en el almacén y se
+                sustituyen por sus identificadores. Los textos iguales comparten identificador, por lo
+                que la eliminación de duplicados posterior da el mismo resultado.
+            keep_book (bool): Si es True, las filas unidas conservan la posición de su libro en la
+                columna PartitionedJoin.BOOK.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: DataFrame combinado sin deduplicar, y DataFrame con registros no coincidentes.
+        """
+        metrics.count("rating_rows", len(books_rating))
+        book, row = PartitionedJoin.BOOK, PartitionedJoin.ROW
+
+        # Identificar registros no coincidentes
+        print("Identificando registros no coincidentes...")
+        title_dtype = books_data["Title"].dtype
+        if isinstance(title_dtype, pd.CategoricalDtype):
+            # Los títulos se traducen a los códigos de 'books_data' y la unión se hace por esos enteros;
+            # los nulos reciben un código propio para coincidir, como en la unión por texto, con los
+            # libros sin título
+            null_code = len(title_dtype.categories)
+            book_codes = books_data["Title"].cat.codes.to_numpy(dtype=np.int64)
+            book_codes[book_codes < 0] = null_code
+            codes = title_dtype.categories.get_indexer(books_rating["Title"]).astype(np.int64)
+            codes[books_rating["Title"].isna().to_numpy()] = null_code
+            matched = np.isin(codes, book_codes)
+            books, ratings, key = books_data.assign(_title=book_codes), books_rating.drop(columns=["Title"]), "_title"
+            ratings = ratings.assign(_title=codes)
+        else:
+            matched = books_rating["Title"].isin(books_data["Title"]).to_numpy()
+            books, ratings, key = books_data, books_rating, "Title"
+        unmatched_ratings = books_rating[~matched]
+
+        # Unir ambos DataFrames por la columna "Title"
+        print("Uniendo DataFrames por la columna 'Title'...")
+        merged_df = pd.merge(
+            books.assign(**{book: np.arange(len(books), dtype=np.int64)}),
+            ratings.assign(**{row: np.arange(len(ratings), dtype=np.int64)})[matched],
+            on=key,
+            how="inner"
+        )
+        # pandas entrega la unión por libro y por reseña salvo cuando tiene tantas filas como 'books_data':
+        # entonces puede desordenarla, así que el orden se comprueba y, si hace falta, se restablece
+        position = merged_df[book].to_numpy() * max(len(ratings), 1) + merged_df[row].to_numpy()
+        if len(position) and (np.diff(position) < 0).any():
+            merged_df = merged_df.iloc[np.argsort(position, kind="stable")]
+        merged_df = merged_df.drop(columns=[row] + ([] if keep_book else [book]))
+        if key == "_title":
+            merged_df = merged_df.drop(columns=["_title"])
+
+        metrics.count("unmatched_rows", len(unmatched_ratings))
+        metrics.count("rows_after_merge", len(merged_df))
+
+        # Eliminar registros con "review/text" vacío o NaN
+        print("Eliminando registros con 'review/text' vacío o NaN...")
+        merged_df = merged_df[~merged_df["review/text"].isnull() & (merged_df["review/text"] != "")]
+        metrics.count("rows_after_null_filter", len(merged_df))
+
+        if text_store is not None:
+            merged_df = text_store.replace_text(merged_df)
+        return merged_df, unmatched_ratings
+
 
 if __name__ == "__main__":
     # Inicializar el cargador de datos
@@ -0,0 +1,157 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from src import config
+from src.key_index import KeyIndex
+
+
+class RowDeduplicator:
+    """
+    Clase para eliminar filas duplicadas comparando huellas de ancho fijo en lugar de las filas completas.
+
+    Cada fila se reduce una sola vez a una huella de 64 o 128 bits calculada sobre sus columnas
+    identificativas (en 128 bits, dos hashes de 64 bits con claves independientes). Los duplicados se
+    buscan sobre esas huellas, sin volver a comparar textos largos como 'review/text'. Las huellas ya
+    vistas se guardan en un conjunto persistente, de modo que la misma instancia deduplica también
+    entre bloques sucesivos: se conserva la primera aparición de cada fila, igual que
+    `drop_duplicates` sobre todos los bloques unidos.
+
+    Con 64 bits (por defecto) la probabilidad de que dos filas distintas compartan huella es del orden
+    de n² / 2^65 para n filas: despreciable con unos pocos millones, pero no con cientos de millones,
+    donde conviene usar 128 bits a cambio de calcular dos hashes por fila.
+    """
+
+    # Claves de 16 caracteres de hash_pandas_object: la primera es la de pandas por defecto
+    HASH_KEYS = ("0123456789123456", "9a3f5c7e1b2d4f60")
+    DEFAULT_BITS = 64
+    NULL_HASH = np.uint64(np.iinfo(np.uint64).max)
+    # Filas por bloque al calcular el hash de las columnas de texto
+    TEXT_BLOCK_SIZE = 100_000
+
+    def __init__(self, columns: Optional[List[str]] = None, bits: Optional[int] = None, persistent: bool = True):
+        """
+        Inicializa el deduplicador y carga la configuración desde el archivo .env.
+
+        Args:
+            columns (List[str], opcional): Columnas que identifican una fila. Por defecto, todas.
+            bits (int, opcional): Tamaño de la huella, 64 o 128. Si no se indica, se usa
+                DEDUP_FINGERPRINT_BITS del archivo .env (64 por defecto).
+            persistent (bool): Si es True, las huellas vistas se conservan entre llamadas para deduplicar
+                también entre bloques. Con False solo se deduplica dentro de cada DataFrame.
+        """
+        config.load()
+        self.bits = bits or int(os.getenv("DEDUP_FINGERPRINT_BITS", self.DEFAULT_BITS))
+        if self.bits not in (64, 128):
+            raise ValueError("El tamaño de la huella (DEDUP_FINGERPRINT_BITS) debe ser 64 o 128.")
+        self.columns = columns
+        self.persistent = persistent
+        self.removed = 0
+        # Huellas vistas, indexadas por su primera mitad: un tramo ordenado por bloque, fusionados de vez en
+        # cuando, para no reordenar todo el conjunto en cada bloque
+        self._seen = KeyIndex()
+
+    def __len__(self) -> int:
+        """
+        Número de huellas vistas (filas distintas) en modo persistente.
+        """
+        return len(self._seen)
+
+    def fingerprints(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Calcula la huella de cada fila a partir de sus columnas identificativas.
+
+        Args:
+            data (pd.DataFrame): Filas a procesar.
+
+        Returns:
+            np.ndarray: Arreglo uint64 de forma (filas, bits / 64).
+        """
+        rows = data[self.columns] if self.columns else data
+        return np.column_stack([self._row_hashes(rows, key) for key in self.HASH_KEYS[:self.bits // 64]])
+
+    @classmethod
+    def _row_hashes(cls, rows: pd.DataFrame, hash_key: str) -> np.ndarray:
+        """
+        Combina los hashes de 64 bits de cada columna en uno por fila, como hash_pandas_object.
+        """
+        hashes = np.full(len(rows), 0x345678, dtype=np.uint64)
+        multiplier = np.uint64(1000003)
+        for position in range(rows.shape[1]):
+            hashes ^= cls._column_hashes(rows.iloc[:, position], hash_key)
+            hashes *= multiplier
+            multiplier += np.uint64(82520 + 2 * (rows.shape[1] - position))
+        return hashes + np.uint64(97531)
+
+    @classmethod
+    def _column_hashes(cls, column: pd.Series, hash_key: str) -> np.ndarray:
+        """
+        Calcula el hash de 64 bits de cada valor de una columna. Los nulos comparten un mismo hash,
+        distinto del de cualquier texto, y -0.0 cuenta como 0.0, igual que en drop_duplicates.
+        """
+        if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype.kind not in "fiubO":
+            return pd.util.hash_pandas_object(column, index=False, hash_key=hash_key).to_numpy()
+
+        nulls = column.isna().to_numpy()
+        if column.dtype.kind == "f":
+            values = np.where(nulls, 0.0, column.to_numpy(dtype=np.float64) + 0.0)
+            hashes = pd.util.hash_array(values, hash_key=hash_key, categorize=False)
+        elif column.dtype.kind in "iub":
+            hashes = pd.util.hash_array(column.to_numpy(), hash_key=hash_key, categorize=False)
+        else:
+            # Las cadenas se pasan a objetos de Python por bloques: el hash de pandas es más rápido así
+            # que sobre las columnas de texto de Arrow, y la copia temporal queda acotada
+            hashes = np.empty(len(column), dtype=np.uint64)
+            for start in range(0, len(column), cls.TEXT_BLOCK_SIZE):
+                block = column.iloc[start:start + cls.TEXT_BLOCK_SIZE].to_numpy(dtype=object, na_value="")
+                hashes[start:start + len(block)] = pd.util.hash_array(block, hash_key=hash_key, categorize=False)
+        hashes[nulls] = cls.NULL_HASH
+        return hashes
+
+    def deduplicate(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve las filas de `data` que no se habían visto antes, en esta llamada o en las anteriores,
+        y las añade al conjunto de huellas vistas.
+
+        Args:
+            data (pd.DataFrame): Filas a deduplicar.
+
+        Returns:
+            pd.DataFrame: Primera aparición de cada fila, en el orden original.
+        """
+        keep = self.new_rows(data)
+        removed = len(data) - int(keep.sum())
+        self.removed += removed
+        return data[keep] if removed else data
+
+    def new_rows(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Marca las filas que aparecen por primera vez y añade sus huellas al conjunto de huellas vistas.
+
+        Args:
+            data (pd.DataFrame): Filas a procesar.
+
+        Returns:
+            np.ndarray: Máscara booleana, True para la primera aparición de cada fila.
+        """
+        fingerprints = self.fingerprints(data)
+        high = fingerprints[:, 0]
+        low = fingerprints[:, 1] if self.bits == 128 else np.zeros(len(data), dtype=np.uint64)
+
+        if self.bits == 128:
+            keep = ~pd.DataFrame({"high": high, "low": low}).duplicated().to_numpy()
+        else:
+            keep = ~pd.Series(high).duplicated().to_numpy()
+        if not self.persistent:
+            return keep
+
+        found, seen_low = self._seen.find(high)
+        same_high = found & (seen_low != low)
+        found &= seen_low == low
+        # Varias huellas con la misma primera mitad: solo ocurre tras una colisión de 64 bits
+        for row in np.flatnonzero(same_high):
+            found[row] = bool((self._seen.find_all(high[row]) == low[row]).any())
+
+        keep &= ~found
+        self._seen.add(high[keep], low[keep])
+        return keep
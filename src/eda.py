@@ -1,10 +1,11 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import Counter
+from typing import Optional
+from src.incidence_index import CATEGORY_PATTERN, IncidenceIndexes
+from src.book_stats import BookStats
+from src.topk import top_k
+from src.text_store import TextStore
+from src import metrics
 
 
 class EDA:
@@ -12,15 +13,33 @@ class EDA:
     Clase para realizar el análisis exploratorio de datos (EDA) en el DataFrame procesado.
     """
 
-    def __init__(self, data: pd.DataFrame):
+    # Patrón para separar categorías sin partir las que contienen comas seguidas de minúscula
+    CATEGORY_PATTERN = CATEGORY_PATTERN
+
+    # Intervalos del histograma de calificaciones promedio: de 1.0 a 5.0 en incrementos de 0.2
+    RATING_BINS = [1 + i * 0.2 for i in range(21)]
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        indexes: Optional[IncidenceIndexes] = None,
+        book_stats: Optional[BookStats] = None
+    ):
         """
         Inicializa la clase EDA con el DataFrame procesado.
 
         Args:
             data (pd.DataFrame): DataFrame procesado que contiene los datos combinados.
+            indexes (IncidenceIndexes, opcional): Índices de autores y categorías compartidos
+                con otros análisis sobre el mismo DataFrame. Si no se indica, se crean al usarse.
+            book_stats (BookStats, opcional): Estadísticas por libro compartidas con otros análisis.
+                Si no se indican, se calculan a partir de `data` la primera vez que se usan.
         """
         self.data = data
+        self.indexes = indexes or IncidenceIndexes(data)
+        self.book_stats = book_stats or BookStats(data)
 
+    @metrics.track()
     def average_rating_per_book(self) -> pd.DataFrame:
         """
         Calcula las valoraciones promedio por libro y genera una visualización de la distribución de calificaciones promedio por libro único.
@@ -29,15 +48,12 @@ class EDA:
             pd.DataFrame: DataFrame con las columnas 'Title' y 'Average Rating'.
         """
         print("Calculando valoraciones promedio por libro...")
-        avg_rating = self.data.groupby("Title")["review/score"].mean().reset_index()
-        avg_rating.rename(columns={"review/score": "Average Rating"}, inplace=True)
-
-        # Filtrar valores fuera del rango 1-5
-        avg_rating = avg_rating[(avg_rating["Average Rating"] >= 1) & (avg_rating["Average Rating"] <= 5)]
+        avg_rating = self._average_ratings()
 
         # Visualización: Histograma de distribución de calificaciones promedio
+        plt, sns = self._plotting()
         plt.figure(figsize=(12, 6))
-        bins = [1 + i * 0.2 for i in range(21)]  # Generar bins de 1.0 a 5.0 en incrementos de 0.2
+        bins = self.RATING_BINS
         sns.histplot(avg_rating["Average Rating"], bins=bins, kde=False)
         plt.title("Distribución de Calificaciones Promedio por Libro", fontsize=14)
         plt.xlabel("Calificación Promedio (Intervalos de 0.2)")
@@ -55,6 +71,7 @@ class EDA:
         return merged_data
 
 
+    @metrics.track()
     def total_reviews_and_ratings(self) -> dict:
         """
         Determina el número total de reseñas y el número total de valoraciones e imprime los resultados.
@@ -63,13 +80,14 @@ class EDA:
             dict: Diccionario con las claves 'Total Reviews' y 'Total Ratings'.
         """
         print("Calculando el número total de reseñas y valoraciones...")
-        total_reviews = self.data["review/text"].notna().sum()  # Cuenta reseñas no nulas
+        total_reviews = TextStore.text_present(self.data).sum()  # Cuenta reseñas no nulas
         total_ratings = self.data["review/score"].notna().sum()  # Cuenta valoraciones no nulas
         results = {"Total Reviews": total_reviews, "Total Ratings": total_ratings}
         print(f"Total de reseñas: {results['Total Reviews']}")
         print(f"Total de calificaciones: {results['Total Ratings']}")
         return results
 
+    @metrics.track()
     def most_popular_authors(self, top_n: int = 10) -> pd.DataFrame:
         """
         Identifica los autores más populares en función de la cantidad de reseñas y genera una visualización.
@@ -81,14 +99,10 @@ class EDA:
             pd.DataFrame: DataFrame con los autores más populares y el conteo de reseñas.
         """
         print(f"Identificando los {top_n} autores más populares...")
-        authors_split = self.data["authors"].str.split(", ")
-        authors_exploded = authors_split.explode()  # Separar cada autor en filas
-        popular_authors = (
-            authors_exploded.value_counts().head(top_n).reset_index()
-        )
-        popular_authors.columns = ["Author", "Review Count"]
+        popular_authors = self._popular_authors(top_n)
 
         # Visualización de los autores más populares
+        plt, sns = self._plotting()
         plt.figure(figsize=(12, 6))
         sns.barplot(x="Review Count", y="Author", data=popular_authors)
         plt.title(f"Top {top_n} Autores Más Populares", fontsize=14)
@@ -99,6 +113,7 @@ class EDA:
         print(f"Autores más populares identificados.")
         return popular_authors
 
+    @metrics.track()
     def most_popular_categories(self, top_n: int = 10) -> pd.DataFrame:
         """
         Identifica las categorías más reseñadas y genera una visualización.
@@ -110,14 +125,10 @@ class EDA:
             pd.DataFrame: DataFrame con las categorías más reseñadas y el conteo de reseñas.
         """
         print(f"Identificando las {top_n} categorías más populares...")
-        categories_split = self.data["categories"].str.split(r",\s+(?![a-z])", regex=True)
-        categories_exploded = categories_split.explode()  # Separar cada categoría en filas
-        popular_categories = (
-            categories_exploded.value_counts().head(top_n).reset_index()
-        )
-        popular_categories.columns = ["Category", "Review Count"]
+        popular_categories = self._popular_categories(top_n)
 
         # Visualización de las categorías más populares
+        plt, sns = self._plotting()
         plt.figure(figsize=(12, 6))
         sns.barplot(x="Review Count", y="Category", data=popular_categories)
         plt.title(f"Top {top_n} Categorías Más Populares", fontsize=14)
@@ -129,14 +140,14 @@ class EDA:
         return popular_categories
 
 
+    @metrics.track()
     def visualize_top_books_by_reviews(self):
         """
         Visualiza el top 10 de libros con más reseñas.
         """
-        review_counts = self.data.groupby("Title")["review/text"].count().reset_index()
-        review_counts.rename(columns={"review/text": "Review Count"}, inplace=True)
-        top_books = review_counts.sort_values("Review Count", ascending=False).head(10)
+        top_books = self._top_books_by_reviews()
 
+        plt, sns = self._plotting()
         plt.figure(figsize=(12, 8))
         sns.barplot(x="Review Count", y="Title", data=top_books)
         plt.title("Top 10 Libros con Más Reseñas", fontsize=14)
@@ -144,15 +155,14 @@ class EDA:
         plt.ylabel("Libro")
         plt.show()
 
+    @metrics.track()
     def visualize_top_books_by_ratings(self):
         """
         Visualiza el top 10 de libros mejor calificados con más de 3000 reseñas.
         """
-        filtered_data = self.data.groupby("Title").filter(lambda x: len(x) > 3000)
-        avg_ratings = filtered_data.groupby("Title")["review/score"].mean().reset_index()
-        avg_ratings.rename(columns={"review/score": "Average Rating"}, inplace=True)
-        top_books = avg_ratings.sort_values("Average Rating", ascending=False).head(10)
+        top_books = self._top_books_by_ratings()
 
+        plt, sns = self._plotting()
         plt.figure(figsize=(12, 6))
         sns.barplot(x="Average Rating", y="Title", data=top_books)
         plt.title("Top de Libros Mejor Calificados con Más de 3000 Reseñas", fontsize=14)
@@ -161,6 +171,7 @@ class EDA:
         plt.show()
 
 
+    @metrics.track()
     def visualize_top_authors_by_ratings(self, rating: int, top_n: int = 5):
         """
         Visualiza el top de autores con más calificaciones de 5 o 1.
@@ -169,15 +180,130 @@ class EDA:
             rating (int): Calificación (por ejemplo, 5 o 1).
             top_n (int): Número de autores a mostrar.
         """
-        filtered_data = self.data[self.data["review/score"] == rating]
-        authors_split = filtered_data["authors"].str.split(", ")
-        authors_exploded = authors_split.explode()
-        top_authors = authors_exploded.value_counts().head(top_n).reset_index()
-        top_authors.columns = ["Author", "Count"]
+        top_authors = self._top_authors_by_rating(rating, top_n)
 
+        plt, sns = self._plotting()
         plt.figure(figsize=(12, 6))
         sns.barplot(x="Count", y="Author", data=top_authors)
         plt.title(f"Top {top_n} Autores con Calificación {rating}", fontsize=14)
         plt.xlabel("Cantidad de Calificaciones")
         plt.ylabel("Autor")
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+    @staticmethod
+    def _plotting() -> tuple:
+        """
+        Importa matplotlib y seaborn al dibujar el primer gráfico, para que las etapas que no dibujan (y el
+        modo sin interfaz gráfica, que dibuja con ChartRenderer) no paguen su importación.
+
+        Returns:
+            tuple: Módulos `matplotlib.pyplot` y `seaborn`.
+        """
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        return plt, sns
+
+    @metrics.track()
+    def chart_specs(self, top_n: int = 10) -> list:
+        """
+        Construye las especificaciones de los gráficos del EDA para el modo sin interfaz gráfica.
+        Cada gráfico lleva solo los datos ya agregados: conteos del histograma y tablas top-N.
+
+        Args:
+            top_n (int): Número de autores y categorías más populares a incluir.
+
+        Returns:
+            list: Especificaciones para ChartRenderer, en el mismo orden que las visualizaciones interactivas.
+        """
+        print("Preparando los datos agregados de los gráficos del EDA...")
+        counts, edges = np.histogram(self._average_ratings()["Average Rating"], bins=self.RATING_BINS)
+        specs = [{
+            "name": "eda_calificaciones_promedio",
+            "kind": "hist",
+            "title": "Distribución de Calificaciones Promedio por Libro",
+            "xlabel": "Calificación Promedio (Intervalos de 0.2)",
+            "ylabel": "Cantidad de Libros",
+            "figsize": (12, 6),
+            "series": [{"edges": edges.tolist(), "counts": counts.tolist(), "edgecolor": "white"}],
+            "xticks": self.RATING_BINS,
+            "grid": "y",
+        }]
+
+        tables = [
+            ("eda_autores_populares", f"Top {top_n} Autores Más Populares", "Cantidad de Reseñas", "Autor",
+             self._popular_authors(top_n), "Author", "Review Count"),
+            ("eda_categorias_populares", f"Top {top_n} Categorías Más Populares", "Cantidad de Reseñas", "Categoría",
+             self._popular_categories(top_n), "Category", "Review Count"),
+            ("eda_libros_mas_resenas", "Top 10 Libros con Más Reseñas", "Cantidad de Reseñas", "Libro",
+             self._top_books_by_reviews(), "Title", "Review Count"),
+            ("eda_libros_mejor_calificados", "Top de Libros Mejor Calificados con Más de 3000 Reseñas",
+             "Calificación Promedio", "Libro", self._top_books_by_ratings(), "Title", "Average Rating"),
+        ]
+        for rating in [5, 1]:
+            tables.append((
+                f"eda_autores_calificacion_{rating}", f"Top 5 Autores con Calificación {rating}",
+                "Cantidad de Calificaciones", "Autor", self._top_authors_by_rating(rating), "Author", "Count",
+            ))
+
+        for name, title, xlabel, ylabel, table, label_column, value_column in tables:
+            specs.append({
+                "name": name,
+                "kind": "barh",
+                "title": title,
+                "xlabel": xlabel,
+                "ylabel": ylabel,
+                "labels": table[label_column].astype(str).tolist(),
+                "values": table[value_column].tolist(),
+            })
+        return specs
+
+    def _average_ratings(self) -> pd.DataFrame:
+        """
+        Devuelve la calificación promedio por título, sin los valores fuera del rango 1-5.
+        """
+        avg_rating = self.book_stats.by_title()[["Title", "Average Rating"]]
+        return avg_rating[(avg_rating["Average Rating"] >= 1) & (avg_rating["Average Rating"] <= 5)]
+
+    def _popular_authors(self, top_n: int) -> pd.DataFrame:
+        """
+        Devuelve los autores con más reseñas (columnas 'Author' y 'Review Count').
+        """
+        author_counts = self.indexes.get("authors").value_counts(top_n=top_n)  # Reseñas por autor sin replicar filas
+        popular_authors = author_counts.reset_index()
+        popular_authors.columns = ["Author", "Review Count"]
+        return popular_authors
+
+    def _popular_categories(self, top_n: int) -> pd.DataFrame:
+        """
+        Devuelve las categorías con más reseñas (columnas 'Category' y 'Review Count').
+        """
+        category_counts = self.indexes.categories().value_counts(top_n=top_n)
+        popular_categories = category_counts.reset_index()
+        popular_categories.columns = ["Category", "Review Count"]
+        return popular_categories
+
+    def _top_books_by_reviews(self, top_n: int = 10) -> pd.DataFrame:
+        """
+        Devuelve los títulos con más reseñas (columnas 'Title' y 'Review Count').
+        """
+        review_counts = self.book_stats.by_title()[["Title", "Review Count"]]
+        top_books = top_k(review_counts, top_n, by="Review Count")
+        return top_books.astype({"Title": str})  # Decodificar solo las filas graficadas
+
+    def _top_books_by_ratings(self, top_n: int = 10, min_reviews: int = 3000) -> pd.DataFrame:
+        """
+        Devuelve los títulos mejor calificados con más de `min_reviews` reseñas (columnas 'Title' y 'Average Rating').
+        """
+        titles = self.book_stats.by_title()
+        avg_ratings = titles.loc[titles["Row Count"] > min_reviews, ["Title", "Average Rating"]]
+        top_books = top_k(avg_ratings, top_n, by="Average Rating")
+        return top_books.astype({"Title": str})  # Decodificar solo las filas graficadas
+
+    def _top_authors_by_rating(self, rating: int, top_n: int = 5) -> pd.DataFrame:
+        """
+        Devuelve los autores con más calificaciones iguales a `rating` (columnas 'Author' y 'Count').
+        """
+        rating_mask = (self.data["review/score"] == rating).to_numpy()
+        top_authors = self.indexes.get("authors").value_counts(rating_mask, top_n=top_n).reset_index()
+        top_authors.columns = ["Author", "Count"]
+        return top_authors
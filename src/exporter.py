@@ -0,0 +1,195 @@
+import os
+import threading
+import pandas as pd
+import pyarrow as pa
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from src import config, metrics
+
+
+class RankingExporter:
+    """
+    Clase para exportar varias tablas (por ejemplo, los rankings de BestBooks) en una sola pasada y en
+    varios formatos.
+
+    Formatos disponibles:
+        - 'xlsx': un archivo Excel por tabla, escrito en modo de solo escritura (por filas, sin
+          mantener el libro en memoria).
+        - 'workbook': un único archivo Excel con una hoja por tabla, también en modo de solo escritura.
+        - 'csv': un archivo CSV por tabla.
+        - 'parquet': un archivo Parquet por tabla, para sistemas que leen formatos columnares.
+
+    Con la escritura en segundo plano, `export` devuelve de inmediato y los archivos se escriben en un
+    hilo propio, en el orden en que se pidieron; `close` espera a que terminen.
+    """
+
+    FORMATS = ("xlsx", "workbook", "csv", "parquet")
+    DEFAULT_FORMATS = "xlsx"
+    DEFAULT_WORKBOOK = "top_libros"
+    # Hoja de los archivos con una sola tabla (como en to_excel) y longitud máxima del nombre de una hoja
+    SINGLE_SHEET_NAME = "Sheet1"
+    MAX_SHEET_NAME = 31
+
+    # Estilo de la fila de encabezados (el mismo que usa pandas en to_excel), creado al escribir el primer libro
+    _header_style = None
+
+    def __init__(
+        self,
+        output_path: Optional[str] = None,
+        formats: Optional[List[str]] = None,
+        background: Optional[bool] = None,
+        workbook_name: Optional[str] = None
+    ):
+        """
+        Inicializa el exportador y carga la configuración desde el archivo .env.
+
+        Args:
+            output_path (str, opcional): Carpeta de salida. Por defecto, OUTPUT_PATH del archivo .env.
+            formats (List[str], opcional): Formatos a escribir. Por defecto, EXPORT_FORMATS del archivo
+                .env, separados por comas ('xlsx' si no se define).
+            background (bool, opcional): Si es True, los archivos se escriben en un hilo en segundo plano.
+                Por defecto, EXPORT_BACKGROUND del archivo .env (0).
+            workbook_name (str, opcional): Nombre, sin extensión, del libro con una hoja por tabla.
+                Por defecto, 'top_libros'.
+        """
+        config.load()
+        self.output_path = output_path or os.getenv("OUTPUT_PATH")
+        if not self.output_path:
+            raise ValueError("La ruta de salida (OUTPUT_PATH) no está definida en el archivo .env.")
+        if formats is None:
+            formats = [item.strip() for item in os.getenv("EXPORT_FORMATS", self.DEFAULT_FORMATS).split(",") if item.strip()]
+        unknown = [item for item in formats if item not in self.FORMATS]
+        if unknown or not formats:
+            raise ValueError(f"Formatos de exportación (EXPORT_FORMATS) no válidos: {unknown}. Use algunos de {list(self.FORMATS)}.")
+        self.formats = list(formats)
+        self.background = background if background is not None else os.getenv("EXPORT_BACKGROUND", "0") == "1"
+        self.workbook_name = workbook_name or self.DEFAULT_WORKBOOK
+        self._executor = None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def export(self, tables: Dict[str, pd.DataFrame], combined: bool = True) -> Optional[Future]:
+        """
+        Exporta las tablas en todos los formatos configurados.
+
+        Args:
+            tables (Dict[str, pd.DataFrame]): Tablas por nombre de archivo, sin extensión.
+            combined (bool): Si es False, se omite el libro con una hoja por tabla (por ejemplo, al
+                exportar un único ranking, para no reemplazar el libro completo).
+
+        Returns:
+            Future o None: En segundo plano, la escritura pendiente (su resultado es la lista de
+            archivos escritos); en otro caso, None.
+        """
+        if not self.background:
+            self._write(tables, combined)
+            return None
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+            future = self._executor.submit(self._write, tables, combined)
+            self._pending.append(future)
+        print(f"Exportación en segundo plano: {', '.join(tables)}")
+        return future
+
+    def close(self):
+        """
+        Espera a que terminen las escrituras en segundo plano y propaga el primer error.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            executor, self._executor = self._executor, None
+        errors = [future.exception() for future in pending]
+        if executor is not None:
+            executor.shutdown()
+        errors = [error for error in errors if error is not None]
+        if errors:
+            raise errors[0]
+
+    def __enter__(self) -> "RankingExporter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @metrics.track("RankingExporter.write")
+    def _write(self, tables: Dict[str, pd.DataFrame], combined: bool = True) -> List[str]:
+        """
+        Escribe las tablas en cada formato configurado.
+
+        Returns:
+            List[str]: Archivos escritos.
+        """
+        os.makedirs(self.output_path, exist_ok=True)
+        written = []
+        for export_format in self.formats:
+            if export_format == "workbook":
+                if combined:
+                    written.append(self._write_workbook(
+                        os.path.join(self.output_path, f"{self.workbook_name}.xlsx"),
+                        {self._sheet_name(name): table for name, table in tables.items()},
+                    ))
+                continue
+            for name, table in tables.items():
+                path = os.path.join(self.output_path, f"{name}.{export_format}")
+                if export_format == "xlsx":
+                    self._write_workbook(path, {self.SINGLE_SHEET_NAME: table})
+                elif export_format == "csv":
+                    table.to_csv(path, index=False)
+                else:
+                    import pyarrow.parquet as pq
+                    pq.write_table(pa.Table.from_pandas(table, preserve_index=False), path)
+                written.append(path)
+
+        for path in written:
+            print(f"Archivo exportado: {path}")
+        return written
+
+    def _sheet_name(self, name: str) -> str:
+        """
+        Nombre de la hoja de una tabla en el libro combinado: el nombre del archivo sin el prefijo del libro.
+        """
+        prefix = f"{self.workbook_name}_"
+        return (name[len(prefix):] if name.startswith(prefix) else name)[:self.MAX_SHEET_NAME]
+
+    @classmethod
+    def _write_workbook(cls, path: str, sheets: Dict[str, pd.DataFrame]) -> str:
+        """
+        Escribe un libro de Excel en modo de solo escritura, fila a fila, con una hoja por tabla.
+
+        Returns:
+            str: Ruta del archivo escrito.
+        """
+        # openpyxl solo se importa si se exporta a Excel
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        for title, table in sheets.items():
+            sheet = workbook.create_sheet(title)
+            sheet.append([cls._header_cell(sheet, column) for column in table.columns])
+            # Las columnas se pasan a objetos de Python una sola vez; los nulos quedan como celdas vacías
+            columns = [
+                table[column].astype(object).where(table[column].notna(), None).tolist()
+                for column in table.columns
+            ]
+            for row in zip(*columns):
+                sheet.append(row)
+        workbook.save(path)
+        return path
+
+    @classmethod
+    def _header_cell(cls, sheet, value):
+        """
+        Celda de encabezado con el estilo de pandas.
+        """
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        if cls._header_style is None:
+            cls._header_style = (
+                Font(bold=True), Border(*(Side(style="thin"),) * 4), Alignment(horizontal="center", vertical="top")
+            )
+        cell = WriteOnlyCell(sheet, value=str(value))
+        cell.font, cell.border, cell.alignment = cls._header_style
+        return cell
@@ -0,0 +1,83 @@
+import sys
+import time
+import builtins
+import threading
+from typing import Dict
+
+
+class ImportTimer:
+    """
+    Clase para medir cuánto tiempo se dedica a importar cada paquete durante una ejecución.
+
+    Mientras está activa, envuelve `builtins.__import__` y acumula el tiempo propio de cada importación
+    (sin el de las importaciones que hace a su vez) en el paquete de primer nivel importado, por ejemplo
+    'pandas' o 'matplotlib'. Las importaciones de los procesos hijos no se miden.
+    """
+
+    # Paquetes que solo algunos subcomandos necesitan y que el informe destaca si se cargaron
+    HEAVY_PACKAGES = ("pandas", "numpy", "pyarrow", "matplotlib", "seaborn", "vaderSentiment", "openpyxl")
+
+    def __init__(self):
+        """
+        Inicializa el medidor, sin activarlo.
+        """
+        self.times: Dict[str, float] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._original_import = None
+
+    def start(self):
+        """
+        Empieza a medir las importaciones.
+        """
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def stop(self):
+        """
+        Deja de medir las importaciones.
+        """
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """
+        Importación con medición del tiempo propio; las ya cargadas solo cuestan la búsqueda en sys.modules.
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        package = name if level == 0 else (globals or {}).get("__package__") or ""
+        stack.append(0.0)  # Tiempo de las importaciones anidadas
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                top_level = package.partition(".")[0]
+                self.times[top_level] = self.times.get(top_level, 0.0) + elapsed - nested
+
+    def report(self, top_n: int = 15) -> dict:
+        """
+        Muestra los paquetes que más tiempo tardaron en importarse y el tiempo total de importación.
+
+        Args:
+            top_n (int): Número de paquetes que se muestran.
+
+        Returns:
+            dict: Segundos de importación por paquete, el total y los paquetes pesados cargados.
+        """
+        packages = dict(sorted(self.times.items(), key=lambda item: item[1], reverse=True))
+        total = sum(packages.values())
+        loaded = [package for package in self.HEAVY_PACKAGES if package in sys.modules]
+        print("\nInforme de importaciones:")
+        for package, seconds in list(packages.items())[:top_n]:
+            print(f"  {package:<24} {seconds:8.3f} s")
+        print(f"  {'Total':<24} {total:8.3f} s")
+        print(f"Paquetes pesados cargados: {', '.join(loaded) or 'ninguno'}")
+        return {"packages": packages, "total": total, "loaded": loaded}
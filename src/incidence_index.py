@@ -0,0 +1,195 @@
+import re
+import threading
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.topk import top_k_positions
+
+# Patrón que separa las categorías de un libro sin partir las que contienen comas seguidas de minúscula
+# (por ejemplo 'Arts, crafts, and hobbies'). Lo comparten EDA, las consultas de sentimiento y el estado incremental.
+CATEGORY_PATTERN = r",\s+(?![a-z])"
+
+
+class IncidenceIndex:
+    """
+    Índice disperso que relaciona cada fila del DataFrame con los elementos (autores o categorías)
+    de una columna multivaluada, sin replicar las filas como hace `str.split(...).explode()`.
+
+    Cada valor distinto de la columna se separa una sola vez y se guarda como una fila de una
+    matriz de incidencia en formato CSR (valor -> elementos). Los conteos y promedios por
+    elemento se obtienen con `np.bincount` sobre los códigos de fila y sobre esa matriz.
+    """
+
+    def __init__(self, column: pd.Series, separator: Optional[str] = ", ", regex: bool = False):
+        """
+        Construye el índice para una columna.
+
+        Args:
+            column (pd.Series): Columna con los elementos unidos en una cadena (por ejemplo 'authors').
+            separator (str, opcional): Separador (o patrón) entre elementos. Con None cada valor es un
+                único elemento, lo que sirve para columnas de un solo valor como 'Title'.
+            regex (bool): Si es True, el separador se interpreta como expresión regular.
+        """
+        self.name = column.name
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            self.row_codes = column.cat.codes.to_numpy(dtype=np.int64)
+            values = column.cat.categories
+        else:
+            self.row_codes, values = pd.factorize(column)
+            self.row_codes = self.row_codes.astype(np.int64)
+
+        pattern = re.compile(separator) if regex else None
+        item_ids = {}
+        pair_items, offsets = [], [0]
+        for value in values:
+            if separator is None:
+                items = [value]
+            else:
+                items = pattern.split(value) if pattern else value.split(separator)
+            for item in items:
+                pair_items.append(item_ids.setdefault(item, len(item_ids)))
+            offsets.append(len(pair_items))
+
+        # Matriz de incidencia valor -> elemento en formato CSR
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.pair_items = np.asarray(pair_items, dtype=np.int64)
+        self.pair_values = np.repeat(np.arange(len(values), dtype=np.int64), np.diff(self.offsets))
+        self.items = np.asarray(list(item_ids), dtype=object)
+
+    def value_counts(self, mask: Optional[np.ndarray] = None, top_n: Optional[int] = None) -> pd.Series:
+        """
+        Cuenta las filas por elemento, equivalente a `str.split(...).explode().value_counts()`.
+
+        Los elementos se ordenan por conteo descendente; los empates conservan el orden de primera
+        aparición en las filas, igual que value_counts.
+
+        Args:
+            mask (np.ndarray, opcional): Máscara booleana de las filas a considerar.
+            top_n (int, opcional): Si se indica, solo se devuelven los `top_n` primeros elementos,
+                elegidos con selección parcial en lugar de ordenar todos los conteos.
+
+        Returns:
+            pd.Series: Conteo de filas por elemento.
+        """
+        rows = self.row_codes if mask is None else self.row_codes[np.asarray(mask, dtype=bool)]
+        rows = rows[rows >= 0]
+        value_counts = np.bincount(rows, minlength=len(self.offsets) - 1)
+        item_counts = np.bincount(
+            self.pair_items, weights=value_counts[self.pair_values], minlength=len(self.items)
+        ).astype(np.int64)
+
+        order = self._appearance_order(rows)
+        if top_n is not None:
+            order = order[top_k_positions(item_counts[order], top_n)]
+        counts = pd.Series(
+            item_counts[order], index=pd.Index(self.items[order], name=self.name), name="count"
+        )
+        return counts if top_n is not None else counts.sort_values(ascending=False, kind="stable")
+
+    def totals(self, values: pd.Series) -> pd.DataFrame:
+        """
+        Calcula por elemento el número de filas, el número de valores no nulos y la suma de una columna
+        numérica. Al ser sumas, los totales de distintos lotes de filas se pueden combinar.
+
+        Args:
+            values (pd.Series): Columna numérica alineada con las filas del índice.
+
+        Returns:
+            pd.DataFrame: Columnas 'n_rows', 'n_values' y 'sum' por elemento presente, en el orden del índice.
+        """
+        numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        n_values, n_items = len(self.offsets) - 1, len(self.items)
+        rows = self.row_codes >= 0
+        valid = rows & ~np.isnan(numbers)
+
+        # Sumas y conteos por valor distinto, trasladados a cada elemento con la matriz de incidencia
+        value_rows = np.bincount(self.row_codes[rows], minlength=n_values)
+        value_sums = np.bincount(self.row_codes[valid], weights=numbers[valid], minlength=n_values)
+        value_counts = np.bincount(self.row_codes[valid], minlength=n_values)
+        item_rows = np.bincount(self.pair_items, weights=value_rows[self.pair_values], minlength=n_items)
+        item_sums = np.bincount(self.pair_items, weights=value_sums[self.pair_values], minlength=n_items)
+        item_counts = np.bincount(self.pair_items, weights=value_counts[self.pair_values], minlength=n_items)
+
+        # Solo los elementos presentes en alguna fila, como en groupby
+        present = item_rows > 0
+        return pd.DataFrame(
+            {
+                "n_rows": item_rows[present].astype(np.int64),
+                "n_values": item_counts[present].astype(np.int64),
+                "sum": item_sums[present],
+            },
+            index=pd.Index(self.items[present], name=self.name),
+        )
+
+    def mean(self, values: pd.Series) -> pd.Series:
+        """
+        Calcula el promedio de una columna numérica por elemento, equivalente a
+        `explode(...).groupby(columna)[values].mean()`. Los valores nulos se ignoran.
+
+        Args:
+            values (pd.Series): Columna numérica alineada con las filas del índice.
+
+        Returns:
+            pd.Series: Promedio por elemento, ordenado alfabéticamente por elemento.
+        """
+        totals = self.totals(values)
+        # Sin valores válidos el promedio es NaN, como en groupby
+        result = totals["sum"] / totals["n_values"].where(totals["n_values"] > 0)
+        return result.rename(values.name).sort_index()
+
+    def _appearance_order(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Devuelve los elementos presentes en `rows` en orden de primera aparición, recorriendo las
+        filas en orden y los elementos de cada fila en el orden de la lista.
+        """
+        first_values = pd.unique(rows)
+        starts, ends = self.offsets[first_values], self.offsets[first_values + 1]
+        lengths = ends - starts
+        pair_positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return pd.unique(self.pair_items[pair_positions])
+
+
+class IncidenceIndexes:
+    """
+    Registro de índices de incidencia de un DataFrame: cada combinación de columna y separador
+    se construye una sola vez y se comparte entre EDA y SentimentAnalysis.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Inicializa el registro para un DataFrame.
+
+        Args:
+            data (pd.DataFrame): DataFrame procesado.
+        """
+        self.data = data
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, column: str, separator: Optional[str] = ", ", regex: bool = False) -> IncidenceIndex:
+        """
+        Devuelve el índice de una columna, construyéndolo la primera vez que se solicita.
+
+        Args:
+            column (str): Nombre de la columna.
+            separator (str, opcional): Separador (o patrón) entre elementos; None si la columna es de un solo valor.
+            regex (bool): Si es True, el separador se interpreta como expresión regular.
+
+        Returns:
+            IncidenceIndex: Índice de incidencia de la columna.
+        """
+        key = (column, separator, regex)
+        with self._lock:  # Las etapas del flujo pueden pedir el mismo índice a la vez
+            if key not in self._indexes:
+                print(f"Construyendo índice de incidencia para '{column}'...")
+                self._indexes[key] = IncidenceIndex(self.data[column], separator, regex)
+            return self._indexes[key]
+
+    def categories(self) -> IncidenceIndex:
+        """
+        Devuelve el índice de la columna 'categories', separada con CATEGORY_PATTERN.
+
+        Returns:
+            IncidenceIndex: Índice de incidencia de las categorías.
+        """
+        return self.get("categories", CATEGORY_PATTERN, regex=True)
@@ -0,0 +1,315 @@
+import os
+import sys
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.data_loader import DataLoader
+from src.sentiment_analysis import SentimentAnalysis
+from src.sentiment_cache import SentimentScoreCache
+from src.incidence_index import CATEGORY_PATTERN, IncidenceIndex, IncidenceIndexes
+from src.book_stats import BookStats
+from src.best_books import BestBooks
+from src.exporter import RankingExporter
+from src.text_store import TextStore
+from src.sentiment_query import SentimentQueryIndex
+from src import config, metrics
+
+
+class IncrementalUpdater:
+    """
+    Clase para incorporar lotes diarios de reseñas a los resultados existentes sin reprocesar el historial.
+
+    El estado guardado en STATE_PATH contiene las estadísticas suficientes por libro, por autor y por
+    categoría, las huellas de las filas ya incorporadas (para eliminar duplicados contra el historial)
+    y el registro de lotes aplicados. Cada lote nuevo solo pasa por la limpieza, la unión, la
+    deduplicación y el cálculo de sentimiento; sus totales se suman al estado y se regeneran las
+    exportaciones de BestBooks.
+    """
+
+    SENTIMENTS = ["positivo", "neutral", "negativo"]
+
+    def __init__(self, state_path: Optional[str] = None):
+        """
+        Inicializa el actualizador y carga la configuración desde el archivo .env.
+
+        Args:
+            state_path (str, opcional): Carpeta del estado incremental. Por defecto se usa STATE_PATH del archivo .env.
+        """
+        config.load()
+        self.state_path = state_path or os.getenv("STATE_PATH")
+        if not self.state_path:
+            raise ValueError("La ruta del estado incremental (STATE_PATH) no está definida en el archivo .env.")
+        os.makedirs(self.state_path, exist_ok=True)
+
+    def has_state(self) -> bool:
+        """
+        Indica si ya existe un estado base sobre el que aplicar lotes.
+        """
+        return os.path.exists(self._path("manifest.json"))
+
+    @metrics.track()
+    def save_baseline(
+        self, data: pd.DataFrame, indexes: Optional[IncidenceIndexes] = None, text_store: Optional[TextStore] = None
+    ):
+        """
+        Guarda como estado base los totales de un procesamiento completo con sentimiento calculado.
+
+        Args:
+            data (pd.DataFrame): DataFrame procesado con las columnas 'compound' y 'Sentiment'.
+            indexes (IncidenceIndexes, opcional): Índices de autores y categorías ya construidos sobre `data`.
+            text_store (TextStore, opcional): Almacén de textos, si `data` lleva 'text_id' en lugar de
+                'review/text'; las huellas de fila se calculan con los textos.
+        """
+        print(f"Guardando estado incremental base en: {self.state_path}")
+        indexes = indexes or IncidenceIndexes(data)
+        generation = self._read_json("manifest.json")["generation"] + 1 if self.has_state() else 0
+        self._write_state(
+            book_table=BookStats(data).table,
+            author_table=self._item_stats(indexes.get("authors"), data),
+            category_table=self._item_stats(indexes.categories(), data),
+            seen=np.unique(DataLoader.row_fingerprints(data[self._row_columns(data)], text_store)),
+            manifest={"generation": generation, "rows": int(len(data)), "category_pattern": CATEGORY_PATTERN, "deltas": []},
+        )
+        print("Estado incremental guardado.")
+
+    @metrics.track()
+    def apply_delta(self, delta_path: str, export: bool = True) -> pd.DataFrame:
+        """
+        Procesa un archivo de reseñas nuevas y suma su contribución al estado guardado.
+
+        Args:
+            delta_path (str): Ruta del archivo CSV con las reseñas nuevas (formato de 'books_rating').
+            export (bool): Si es True, regenera las exportaciones de BestBooks con el estado actualizado.
+
+        Returns:
+            pd.DataFrame: Filas nuevas incorporadas, ya procesadas y con sentimiento.
+        """
+        if not self.has_state():
+            raise FileNotFoundError(
+                f"No existe un estado base en {self.state_path}. Ejecute primero el procesamiento completo."
+            )
+        manifest = self._read_json("manifest.json")
+        if manifest.get("category_pattern") != CATEGORY_PATTERN:
+            raise ValueError(
+                f"El estado de {self.state_path} separa las categorías de otra forma. "
+                "Ejecute de nuevo el procesamiento completo para regenerarlo."
+            )
+        delta_hash = self._file_hash(delta_path)
+        if delta_hash in {delta["hash"] for delta in manifest["deltas"]}:
+            print(f"El lote {delta_path} ya fue incorporado; no se aplica de nuevo.")
+            return pd.DataFrame()
+
+        # Limpieza, unión y deduplicación solo sobre el lote (con los textos en memoria: el lote es pequeño)
+        loader = DataLoader(lazy_text=False)
+        data = loader.load_delta(delta_path)
+        if not data:
+            return pd.DataFrame()
+        delta, unmatched = loader.process_data(data)
+        print(f"Reseñas nuevas: {len(delta)}, no coincidentes: {len(unmatched)}")
+
+        # Deduplicación contra el historial mediante las huellas de fila
+        seen = self._read_seen(manifest)
+        fingerprints = DataLoader.row_fingerprints(delta[self._row_columns(delta)])
+        is_new = ~np.isin(fingerprints, seen)
+        delta = delta[is_new]
+        print(f"Reseñas ya presentes en el historial descartadas: {int((~is_new).sum())}")
+
+        book_table = self._read_table("book_stats", manifest)
+        author_table = self._read_table("author_stats", manifest)
+        category_table = self._read_table("category_stats", manifest)
+        if not delta.empty:
+            score_cache = SentimentScoreCache()
+            sentiment_analyzer = SentimentAnalysis(delta, score_cache=score_cache)
+            sentiment_analyzer.preprocess_text()
+            delta = sentiment_analyzer.calculate_sentiment_scores()
+            score_cache.close()
+
+            # Suma de las contribuciones del lote a los totales guardados
+            print("Combinando totales del lote con el estado guardado...")
+            indexes = IncidenceIndexes(delta)
+            book_table = BookStats.combine(BookStats(table=book_table), BookStats(delta)).table
+            author_table = self._combine_items(author_table, self._item_stats(indexes.get("authors"), delta))
+            category_table = self._combine_items(category_table, self._item_stats(indexes.categories(), delta))
+
+        self._write_state(
+            book_table=book_table,
+            author_table=author_table,
+            category_table=category_table,
+            seen=np.union1d(seen, fingerprints[is_new]),
+            manifest={
+                "generation": manifest["generation"] + 1,
+                "rows": manifest["rows"] + int(len(delta)),
+                "category_pattern": CATEGORY_PATTERN,
+                "deltas": manifest["deltas"] + [
+                    {"file": os.path.abspath(delta_path), "hash": delta_hash, "rows": int(len(delta))}
+                ],
+            },
+        )
+        print(f"Lote incorporado: {len(delta)} reseñas nuevas.")
+        book_stats = BookStats(table=book_table)
+
+        if export:
+            with RankingExporter() as exporter:
+                BestBooks(None, book_stats=book_stats, exporter=exporter).export_rankings()
+        return delta
+
+    def book_stats(self) -> BookStats:
+        """
+        Devuelve las estadísticas por libro acumuladas en el estado.
+        """
+        return BookStats(table=self._read_table("book_stats", self._read_json("manifest.json")))
+
+    def author_stats(self) -> pd.DataFrame:
+        """
+        Devuelve los totales por autor acumulados en el estado.
+        """
+        return self._read_table("author_stats", self._read_json("manifest.json")).set_index("item")
+
+    def category_stats(self) -> pd.DataFrame:
+        """
+        Devuelve los totales por categoría acumulados en el estado.
+        """
+        return self._read_table("category_stats", self._read_json("manifest.json")).set_index("item")
+
+    def query_totals(self) -> tuple:
+        """
+        Devuelve los totales de sentimiento por título y por categoría del estado, para el índice de consultas.
+
+        Returns:
+            tuple: DataFrames de totales por título y por categoría, con las columnas 'n_compound' y 'sum_compound'.
+        """
+        manifest = self._read_json("manifest.json")
+        return self._query_totals(self._read_table("book_stats", manifest), self._read_table("category_stats", manifest))
+
+    @staticmethod
+    def _query_totals(book_table: pd.DataFrame, category_table: pd.DataFrame) -> tuple:
+        """
+        Suma los totales de sentimiento de los libros con el mismo título y toma los de cada categoría.
+        """
+        columns = ["n_compound", "sum_compound"]
+        books = book_table.groupby("Title", observed=True, sort=True)[columns].sum()
+        return books, category_table.set_index("item")[columns]
+
+    @classmethod
+    def _item_stats(cls, index: IncidenceIndex, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula los totales combinables por autor o categoría: reseñas, sumas de calificación y de
+        sentimiento, conteo por calificación y conteo por tipo de sentimiento.
+
+        Args:
+            index (IncidenceIndex): Índice de incidencia de la columna sobre `data`.
+            data (pd.DataFrame): DataFrame procesado con sentimiento.
+
+        Returns:
+            pd.DataFrame: Totales por elemento, con el elemento en la columna 'item'.
+        """
+        score = index.totals(data["review/score"])
+        compound = index.totals(data["compound"])
+        stats = pd.DataFrame({
+            "n_rows": score["n_rows"],
+            "n_score": score["n_values"],
+            "sum_score": score["sum"],
+            "n_compound": compound["n_values"],
+            "sum_compound": compound["sum"],
+        })
+        for rating in BookStats.RATINGS:
+            stats[f"rating_{rating}"] = index.value_counts((data["review/score"] == rating).to_numpy())
+        for sentiment in cls.SENTIMENTS:
+            stats[f"sentiment_{sentiment}"] = index.value_counts((data["Sentiment"] == sentiment).to_numpy())
+        count_columns = [column for column in stats.columns if not column.startswith("sum_")]
+        stats[count_columns] = stats[count_columns].fillna(0).astype(np.int64)
+        return stats.rename_axis("item").sort_index().reset_index()
+
+    @staticmethod
+    def _combine_items(*tables: pd.DataFrame) -> pd.DataFrame:
+        """
+        Suma los totales por elemento de varias tablas.
+        """
+        return pd.concat(tables, ignore_index=True).groupby("item", sort=True).sum().reset_index()
+
+    @staticmethod
+    def _row_columns(data: pd.DataFrame) -> list:
+        """
+        Columnas de una fila procesada que definen un duplicado (las de process_data, sin las de sentimiento).
+        En modo diferido, 'text_id' ocupa el lugar de 'review/text'.
+        """
+        columns = DataLoader.BOOKS_DATA_COLUMNS + DataLoader.BOOKS_RATING_COLUMNS[1:] + [TextStore.ID_COLUMN]
+        return [column for column in columns if column in data.columns]
+
+    def _write_state(self, book_table, author_table, category_table, seen, manifest):
+        """
+        Escribe una nueva generación del estado. Los archivos llevan el número de generación y el
+        registro de lotes, que apunta a la generación vigente, se reemplaza al final de forma atómica:
+        si el proceso falla a mitad de camino, el estado anterior sigue siendo el válido.
+        """
+        generation = manifest["generation"]
+        self._write_table(book_table.astype({key: object for key in BookStats.KEYS}), "book_stats", generation)
+        self._write_table(author_table, "author_stats", generation)
+        self._write_table(category_table, "category_stats", generation)
+        np.save(self._path(f"seen_rows.{generation}.npy"), seen)
+        # Totales en JSON para que las consultas de sentimiento no necesiten pandas
+        SentimentQueryIndex.write_totals(self.state_path, generation, *self._query_totals(book_table, category_table))
+
+        with open(self._path("manifest.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(self._path("manifest.json.tmp"), self._path("manifest.json"))
+
+        # Eliminar las generaciones anteriores
+        current = f".{generation}."
+        for file_name in os.listdir(self.state_path):
+            if file_name.endswith((".arrow", ".npy", ".json")) and current not in file_name and file_name != "manifest.json":
+                os.remove(self._path(file_name))
+
+    def _write_table(self, table: pd.DataFrame, name: str, generation: int):
+        """
+        Guarda una tabla del estado en formato Arrow (Feather).
+        """
+        table.reset_index(drop=True).to_feather(self._path(f"{name}.{generation}.arrow"))
+
+    def _read_table(self, name: str, manifest: dict) -> pd.DataFrame:
+        """
+        Lee una tabla de la generación vigente del estado.
+        """
+        return pd.read_feather(self._path(f"{name}.{manifest['generation']}.arrow"))
+
+    def _read_seen(self, manifest: dict) -> np.ndarray:
+        """
+        Lee las huellas de las filas ya incorporadas en la generación vigente del estado.
+        """
+        return np.load(self._path(f"seen_rows.{manifest['generation']}.npy"))
+
+    def _read_json(self, file_name: str) -> dict:
+        """
+        Lee un archivo JSON del estado.
+        """
+        with open(self._path(file_name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _path(self, file_name: str) -> str:
+        """
+        Devuelve la ruta de un archivo del estado.
+        """
+        return os.path.join(self.state_path, file_name)
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        """
+        Calcula el hash del contenido de un archivo de lote.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(8 * 1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Uso: python -m src.incremental <archivo_de_reseñas_nuevas.csv>")
+        sys.exit(1)
+
+    updater = IncrementalUpdater()
+    new_rows = updater.apply_delta(sys.argv[1])
+    print(f"Número de reseñas incorporadas: {len(new_rows)}")
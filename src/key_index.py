@@ -0,0 +1,111 @@
+import numpy as np
+from typing import Tuple
+
+
+class KeyIndex:
+    """
+    Índice de claves de 64 bits, cada una con un valor entero de 64 bits, guardado en arreglos de NumPy.
+
+    Las claves se añaden por lotes y cada lote se guarda como un tramo ordenado. Cuando el último tramo
+    alcanza el tamaño del anterior, ambos se fusionan en uno (como los acarreos de un contador binario),
+    de modo que siempre hay O(log n) tramos y añadir n claves cuesta O(n log n) en total, en lugar de
+    reconstruir un único arreglo ordenado en cada lote. Cada búsqueda recorre los tramos con una
+    búsqueda binaria. Ocupa 16 bytes por clave, frente a más de 100 en un diccionario de Python.
+
+    Una misma clave puede guardarse varias veces con valores distintos (por ejemplo, tras una
+    colisión de hash); `find` devuelve uno de ellos y `find_all`, todos.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un índice vacío.
+        """
+        self._runs = []  # Tramos (claves ordenadas, valores), del más grande al más pequeño
+
+    def __len__(self) -> int:
+        """
+        Número de claves guardadas.
+        """
+        return sum(len(keys) for keys, _ in self._runs)
+
+    def add(self, keys: np.ndarray, values: np.ndarray):
+        """
+        Añade un lote de claves con sus valores.
+
+        Args:
+            keys (np.ndarray): Claves uint64.
+            values (np.ndarray): Valores int64 o uint64, uno por clave.
+        """
+        if not len(keys):
+            return
+        keys = np.asarray(keys, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        self._runs.append((keys[order], np.asarray(values)[order]))
+        while len(self._runs) > 1 and len(self._runs[-1][0]) >= len(self._runs[-2][0]):
+            newer = self._runs.pop()
+            self._runs[-1] = self._merge(self._runs[-1], newer)
+
+    def find(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca un lote de claves.
+
+        Args:
+            keys (np.ndarray): Claves uint64.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Máscara de las claves encontradas y, para cada una, uno de sus
+            valores (0 si no se encontró).
+        """
+        # Las claves se buscan ordenadas: la búsqueda binaria recorre cada tramo en un solo sentido
+        order = np.argsort(keys, kind="stable")
+        keys = np.asarray(keys, dtype=np.uint64)[order]
+        found = np.zeros(len(keys), dtype=bool)
+        values = None
+        for run_keys, run_values in self._runs:
+            if values is None:
+                values = np.zeros(len(keys), dtype=run_values.dtype)
+            positions = np.minimum(np.searchsorted(run_keys, keys), len(run_keys) - 1)
+            hits = ~found & (run_keys[positions] == keys)
+            values[hits] = run_values[positions[hits]]
+            found |= hits
+        if values is None:
+            return found, np.zeros(len(keys), dtype=np.int64)
+
+        unsorted_found, unsorted_values = np.empty_like(found), np.empty_like(values)
+        unsorted_found[order], unsorted_values[order] = found, values
+        return unsorted_found, unsorted_values
+
+    def find_all(self, key: int) -> np.ndarray:
+        """
+        Devuelve todos los valores guardados con una clave.
+
+        Args:
+            key (int): Clave.
+
+        Returns:
+            np.ndarray: Valores de la clave, en ningún orden en particular.
+        """
+        key = np.uint64(key)
+        matches = [
+            run_values[np.searchsorted(run_keys, key, side="left"):np.searchsorted(run_keys, key, side="right")]
+            for run_keys, run_values in self._runs
+        ]
+        return np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def _merge(older: tuple, newer: tuple) -> tuple:
+        """
+        Fusiona dos tramos ordenados en uno, en tiempo lineal.
+        """
+        older_keys, older_values = older
+        newer_keys, newer_values = newer
+        # Posición final de cada clave del tramo nuevo: detrás de las claves iguales del tramo anterior
+        positions = np.searchsorted(older_keys, newer_keys, side="right") + np.arange(len(newer_keys))
+        from_newer = np.zeros(len(older_keys) + len(newer_keys), dtype=bool)
+        from_newer[positions] = True
+
+        keys = np.empty(len(from_newer), dtype=np.uint64)
+        values = np.empty(len(from_newer), dtype=np.result_type(older_values, newer_values))
+        keys[positions], values[positions] = newer_keys, newer_values
+        keys[~from_newer], values[~from_newer] = older_keys, older_values
+        return keys, values
@@ -0,0 +1,455 @@
+import os
+import sys
+import json
+import time
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Optional
+from src import config
+
+
+class StageMetrics:
+    """
+    Métricas de una etapa en curso o terminada: tiempos, memoria máxima, filas y contadores.
+
+    La memoria residente máxima de la etapa solo se mide donde se puede leer la memoria actual del
+    proceso (Linux); en otros sistemas queda en None.
+    """
+
+    def __init__(self, name: str, parent: Optional["StageMetrics"], rows_in: Optional[int], recorder: "MetricsRecorder"):
+        """
+        Inicializa las métricas de una etapa que empieza.
+
+        Args:
+            name (str): Nombre de la etapa.
+            parent (StageMetrics, opcional): Etapa que la contiene.
+            rows_in (int, opcional): Filas de entrada.
+            recorder (MetricsRecorder): Registro al que pertenece la etapa.
+        """
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.counters = {}
+        self.recorder = recorder
+        self.started_at = time.time()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = self._cpu_time()
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss = None
+        self.peak_traced = None
+        self.done = 0
+        self.total = None
+        self._last_progress = 0.0
+
+    def count(self, name: str, value: int):
+        """
+        Suma un valor a un contador de la etapa (por ejemplo, filas tras la unión o tras quitar
+        duplicados). Las etapas por bloques acumulan el contador de cada bloque.
+        """
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def progress(self, done: int, total: Optional[int] = None):
+        """
+        Actualiza el avance de la etapa; con la salida en vivo activa, muestra el ritmo y el tiempo restante.
+
+        Args:
+            done (int): Elementos procesados hasta ahora.
+            total (int, opcional): Elementos totales de la etapa.
+        """
+        self.done = int(done)
+        if total is not None:
+            self.total = int(total)
+        if not self.recorder.live:
+            return
+        now = time.perf_counter()
+        finished = self.total is not None and self.done >= self.total
+        if now - self._last_progress < self.recorder.PROGRESS_INTERVAL and not finished:
+            return
+        self._last_progress = now
+        elapsed = now - self.start_wall
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        message = f"  {self.name}: {self.done}"
+        if self.total:
+            eta = (self.total - self.done) / rate if rate > 0 else float("nan")
+            message += f"/{self.total} ({self.done / self.total:.0%}), {rate:,.0f} filas/s, restante {eta:,.0f} s"
+        else:
+            message += f", {rate:,.0f} filas/s"
+        print(message, file=sys.stderr, flush=True)
+
+    def finish(self, rows_out: Optional[int]):
+        """
+        Cierra la etapa y calcula sus tiempos.
+        """
+        self.wall_seconds = time.perf_counter() - self.start_wall
+        self.cpu_seconds = self._cpu_time() - self.start_cpu
+        if rows_out is not None:
+            self.rows_out = rows_out
+        self.peak_rss = _max(self.peak_rss, self.recorder.rss())
+
+    def to_dict(self) -> dict:
+        """
+        Devuelve las métricas de la etapa como diccionario serializable en JSON.
+        """
+        rows = self.rows_in if self.rows_in is not None else (self.done or None)
+        return {
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "depth": self.depth,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 2) if self.peak_rss is not None else None,
+            "traced_peak_mb": round(self.peak_traced / 2**20, 2) if self.peak_traced is not None else None,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rows_per_second": round(rows / self.wall_seconds, 1) if rows and self.wall_seconds > 0 else None,
+            "counters": self.counters,
+        }
+
+    @staticmethod
+    def _cpu_time() -> float:
+        """
+        Tiempo de CPU del proceso y de los procesos hijos ya terminados (por ejemplo, los pools).
+        """
+        times = os.times()
+        return times.user + times.system + times.children_user + times.children_system
+
+
+class MetricsRecorder:
+    """
+    Clase para registrar métricas por etapa: tiempo de reloj, tiempo de CPU, memoria residente
+    máxima (y, opcionalmente, memoria de Python según tracemalloc), filas de entrada y de salida,
+    ritmo de proceso y contadores propios de cada etapa.
+
+    Las etapas se pueden anidar (un método público que llama a otro). Un hilo muestrea la memoria
+    mientras haya etapas abiertas y actualiza el máximo de todas ellas. Al final se genera un
+    informe en JSON.
+    """
+
+    SAMPLE_INTERVAL = 0.02
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, enabled: Optional[bool] = None, live: Optional[bool] = None, trace_memory: Optional[bool] = None):
+        """
+        Inicializa el registro y carga la configuración desde el archivo .env.
+
+        Args:
+            enabled (bool, opcional): Si es False no se registra nada. Por defecto se usa METRICS_ENABLED (1).
+            live (bool, opcional): Si es True se muestra el avance de las etapas mientras se ejecutan.
+                Por defecto se usa METRICS_LIVE (0).
+            trace_memory (bool, opcional): Si es True se mide también la memoria de Python con tracemalloc,
+                lo que ralentiza el código Python. Por defecto se usa METRICS_TRACEMALLOC (0).
+        """
+        config.load()
+        self.enabled = enabled if enabled is not None else os.getenv("METRICS_ENABLED", "1") == "1"
+        self.live = live if live is not None else os.getenv("METRICS_LIVE", "0") == "1"
+        self.trace_memory = trace_memory if trace_memory is not None else os.getenv("METRICS_TRACEMALLOC", "0") == "1"
+        self.stages = []
+        self.started_at = time.time()
+        self._local = threading.local()
+        self._open = []
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop_sampler = threading.Event()
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None):
+        """
+        Mide una etapa.
+
+        Args:
+            name (str): Nombre de la etapa.
+            rows_in (int, opcional): Filas de entrada.
+
+        Yields:
+            StageMetrics: Métricas de la etapa, para registrar filas de salida, contadores o avance.
+        """
+        if not self.enabled:
+            yield _NULL_STAGE
+            return
+
+        stack = self._stack()
+        stage = StageMetrics(name, stack[-1] if stack else None, rows_in, self)
+        stage.peak_rss = self.rss()
+        stack.append(stage)
+        self._start_sampling(stage)
+        if self.live:
+            print(f"{'  ' * stage.depth}> {name}", file=sys.stderr, flush=True)
+        try:
+            yield stage
+        finally:
+            stack.pop()
+            self._stop_sampling(stage)
+            stage.finish(None)
+            self.stages.append(stage)
+            if self.live:
+                print(f"{'  ' * stage.depth}< {name}: {self._summary(stage)}", file=sys.stderr, flush=True)
+
+    def current(self) -> Optional[StageMetrics]:
+        """
+        Devuelve la etapa abierta más interna del hilo actual, o None.
+        """
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def report(self) -> dict:
+        """
+        Devuelve el informe de la ejecución.
+
+        Returns:
+            dict: Diccionario con las claves 'started_at', 'wall_seconds', 'peak_rss_mb' (máximo de las
+            etapas), 'process_peak_rss_mb' (máximo histórico del proceso) y 'stages' (en orden de inicio).
+        """
+        stages = sorted(self.stages, key=lambda stage: stage.start_wall)
+        peak_rss = max([stage.peak_rss for stage in stages if stage.peak_rss is not None] or [self.rss() or 0]) or None
+        process_peak = self.process_peak_rss()
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "wall_seconds": round(time.time() - self.started_at, 4),
+            "peak_rss_mb": round(peak_rss / 2**20, 2) if peak_rss is not None else None,
+            # Máximo de todo el proceso desde su inicio, también antes de la primera etapa
+            "process_peak_rss_mb": round(process_peak / 2**20, 2) if process_peak is not None else None,
+            "stages": [stage.to_dict() for stage in stages],
+        }
+
+    def write_report(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Escribe el informe de la ejecución en JSON.
+
+        Args:
+            path (str, opcional): Ruta del informe. Por defecto se usa METRICS_REPORT del archivo .env o
+                'run_report.json' dentro de OUTPUT_PATH.
+
+        Returns:
+            str o None: Ruta del informe, o None si el registro está desactivado.
+        """
+        if not self.enabled:
+            return None
+        path = path or os.getenv("METRICS_REPORT") or os.path.join(os.getenv("OUTPUT_PATH", "."), "run_report.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        print(f"Informe de métricas guardado en: {path}")
+        return path
+
+    def reset(self):
+        """
+        Descarta las etapas registradas.
+        """
+        self.stages = []
+        self.started_at = time.time()
+
+    @staticmethod
+    def rss() -> Optional[int]:
+        """
+        Devuelve la memoria residente actual del proceso en bytes, desde /proc (Linux), o None en otros
+        sistemas: allí solo se conoce el máximo histórico del proceso (`process_peak_rss`), que no sirve
+        como máximo de una etapa porque arrastra el de las etapas anteriores.
+        """
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    @staticmethod
+    def process_peak_rss() -> Optional[int]:
+        """
+        Devuelve la memoria residente máxima del proceso desde su inicio, en bytes, según getrusage, o
+        None donde el módulo `resource` no existe (Windows).
+        """
+        try:
+            import resource
+        except ImportError:
+            return None
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def _stack(self) -> list:
+        """
+        Devuelve la pila de etapas abiertas del hilo actual.
+        """
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _start_sampling(self, stage: StageMetrics):
+        """
+        Registra una etapa abierta e inicia el hilo de muestreo si no está en marcha.
+        """
+        with self._lock:
+            self._open.append(stage)
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if self.trace_memory:
+                # El pico de tracemalloc se reinicia al abrir cada etapa: antes se pasa a las etapas abiertas,
+                # que guardan su propio máximo acumulado
+                current, peak = tracemalloc.get_traced_memory()
+                for open_stage in self._open:
+                    if open_stage.peak_traced is not None:
+                        open_stage.peak_traced = max(open_stage.peak_traced, peak)
+                tracemalloc.reset_peak()
+                stage.peak_traced = current
+            if self._sampler is None:
+                self._stop_sampler.clear()
+                self._sampler = threading.Thread(target=self._sample, daemon=True)
+                self._sampler.start()
+
+    def _stop_sampling(self, stage: StageMetrics):
+        """
+        Quita una etapa de las abiertas y detiene el muestreo cuando no queda ninguna.
+        """
+        self._update_peaks([stage])
+        with self._lock:
+            self._open.remove(stage)
+            sampler = self._sampler if not self._open else None
+            if sampler is not None:
+                self._sampler = None
+                self._stop_sampler.set()
+                if self.trace_memory:
+                    tracemalloc.stop()
+        if sampler is not None:
+            sampler.join()
+
+    def _sample(self):
+        """
+        Bucle del hilo de muestreo de memoria.
+        """
+        while not self._stop_sampler.wait(self.SAMPLE_INTERVAL):
+            with self._lock:
+                stages = list(self._open)
+            self._update_peaks(stages)
+
+    def _update_peaks(self, stages: list):
+        """
+        Actualiza la memoria máxima de las etapas indicadas con la medición actual. El pico de tracemalloc
+        cubre todas las reservas desde su último reinicio, también las que ocurren entre dos muestras.
+        """
+        rss = self.rss()
+        with self._lock:
+            traced = tracemalloc.get_traced_memory()[1] if self.trace_memory and tracemalloc.is_tracing() else None
+            for stage in stages:
+                stage.peak_rss = _max(stage.peak_rss, rss)
+                if traced is not None and stage.peak_traced is not None:
+                    stage.peak_traced = max(stage.peak_traced, traced)
+
+    @staticmethod
+    def _summary(stage: StageMetrics) -> str:
+        """
+        Resume una etapa terminada en una línea.
+        """
+        summary = f"{stage.wall_seconds:.2f} s, CPU {stage.cpu_seconds:.2f} s"
+        if stage.peak_rss is not None:
+            summary += f", RSS máx. {stage.peak_rss / 2**20:,.0f} MB"
+        if stage.rows_in is not None or stage.rows_out is not None:
+            summary += f", filas {stage.rows_in} -> {stage.rows_out}"
+        return summary
+
+
+class _NullStage:
+    """
+    Etapa sin efecto, usada cuando el registro de métricas está desactivado.
+    """
+
+    rows_out = None
+
+    def count(self, name: str, value: int):
+        pass
+
+    def progress(self, done: int, total: Optional[int] = None):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _max(current: Optional[int], value: Optional[int]) -> Optional[int]:
+    """
+    Máximo de dos mediciones de memoria, ignorando las que no están disponibles (None).
+    """
+    if value is None:
+        return current
+    return value if current is None else max(current, value)
+
+# Registro compartido por todos los módulos del proyecto
+recorder = MetricsRecorder()
+
+
+def _frame_types(series: bool = False) -> tuple:
+    """
+    Devuelve los tipos DataFrame (y Series) de pandas sin importarlo: si ningún módulo ha importado
+    pandas, ningún valor puede ser un DataFrame, y las etapas ligeras no pagan su importación.
+    """
+    pandas = sys.modules.get("pandas")
+    if pandas is None:
+        return ()
+    return (pandas.DataFrame, pandas.Series) if series else (pandas.DataFrame,)
+
+
+def _count_rows(value) -> Optional[int]:
+    """
+    Devuelve el número de filas de un DataFrame o Series (o del primero de una tupla), o None.
+    """
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, _frame_types(series=True)):
+        return len(value)
+    return None
+
+
+def track(name: Optional[str] = None) -> Callable:
+    """
+    Decorador que mide cada llamada a un método o función como una etapa del registro compartido.
+
+    Las filas de entrada se toman del primer DataFrame de los argumentos o, en su defecto, del
+    atributo `data` del objeto; las de salida, del DataFrame devuelto.
+
+    Args:
+        name (str, opcional): Nombre de la etapa. Por defecto, el nombre calificado de la función.
+
+    Returns:
+        Callable: Decorador.
+    """
+    def decorator(function: Callable) -> Callable:
+        stage_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return function(*args, **kwargs)
+            frame_types = _frame_types()
+            rows_in = next((len(arg) for arg in list(args) + list(kwargs.values()) if isinstance(arg, frame_types)), None)
+            if rows_in is None and args and isinstance(getattr(args[0], "data", None), frame_types):
+                rows_in = len(args[0].data)
+            with recorder.stage(stage_name, rows_in) as stage:
+                result = function(*args, **kwargs)
+                if stage.rows_out is None:
+                    stage.rows_out = _count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, value: int):
+    """
+    Suma un valor a un contador de la etapa abierta más interna, si la hay.
+    """
+    stage = recorder.current()
+    if stage is not None:
+        stage.count(name, value)
+
+
+def progress(done: int, total: Optional[int] = None):
+    """
+    Actualiza el avance de la etapa abierta más interna, si la hay.
+    """
+    stage = recorder.current()
+    if stage is not None:
+        stage.progress(done, total)
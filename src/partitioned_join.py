@@ -0,0 +1,291 @@
+import os
+import shutil
+import itertools
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+from src.text_store import TextStore
+from src.dedup import RowDeduplicator
+from src import metrics
+
+
+class PartitionedJoin:
+    """
+    Clase para unir 'books_data' con 'books_rating' por 'Title' con particiones en disco.
+
+    Ambas entradas se reparten por un hash del título en particiones guardadas en disco (archivos
+    Arrow IPC). Como todas las filas de un mismo título caen en la misma partición, cada partición
+    se une, se limpia y se deduplica de forma independiente (en paralelo, en un pool de hilos), y
+    los registros no coincidentes salen de la misma pasada.
+
+    `partitions` entrega las particiones unidas una a una, de modo que un consumidor que no necesita
+    el resultado completo (por ejemplo, el muestreador de la vista previa) trabaja con una memoria
+    máxima que depende del tamaño de una partición y no del tamaño del archivo de reseñas. `join`
+    reúne todas las particiones en un DataFrame, porque el resto del flujo trabaja sobre los datos
+    completos: en ese caso el resultado debe caber en memoria, y al reunirlo y ordenarlo se necesita
+    aproximadamente el doble de su tamaño.
+
+    Cada fila guarda la posición del libro y la posición de la reseña, de modo que el resultado de
+    `join` tiene las mismas filas y en el mismo orden que la unión en memoria de los datos completos.
+    """
+
+    # Columnas auxiliares de orden: posición del libro y posición de la reseña
+    BOOK, ROW = "_book", "_row"
+    # Columnas que se escriben como texto aunque un bloque solo tenga valores nulos
+    TEXT_COLUMNS = {"Title", "authors", "categories", "review/text"}
+    COUNTERS = ["unmatched_rows", "rows_after_merge", "rows_after_null_filter", "duplicates_removed", "rows_after_dedup"]
+
+    def __init__(
+        self,
+        books_data: pd.DataFrame,
+        n_partitions: int,
+        n_workers: int = 1,
+        spill_path: Optional[str] = None,
+        text_store: Optional[TextStore] = None
+    ):
+        """
+        Inicializa la unión y reparte 'books_data' en particiones.
+
+        Args:
+            books_data (pd.DataFrame): DataFrame de libros ya limpio (y, si procede, codificado).
+            n_partitions (int): Número de particiones.
+            n_workers (int): Número de hilos que unen particiones a la vez.
+            spill_path (str, opcional): Carpeta donde se crean los archivos temporales. Por defecto,
+                la carpeta temporal del sistema.
+            text_store (TextStore, opcional): Si se indica, los textos de las filas unidas se guardan en
+                el almacén y se sustituyen por sus identificadores.
+        """
+        if n_partitions <= 0:
+            raise ValueError("El número de particiones debe ser un entero positivo.")
+        self.n_partitions = n_partitions
+        self.n_workers = max(n_workers, 1)
+        if spill_path:
+            os.makedirs(spill_path, exist_ok=True)
+        self.spill_dir = tempfile.mkdtemp(prefix="join_", dir=spill_path or None)
+        self.text_store = text_store
+        self._dtypes = {column: books_data[column].dtype for column in books_data.columns}
+
+        books = self._decode(books_data).assign(**{self.BOOK: np.arange(len(books_data), dtype=np.int64)})
+        with self._writers("books", self._schema(books)) as writers:
+            self._write_partitions(books, writers)
+
+    def partitions(self, rating_chunks: Iterable[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Reparte las reseñas en particiones y entrega, una a una y por número de partición, cada
+        partición unida, limpia y deduplicada junto con sus registros no coincidentes. Mientras el
+        consumidor procesa una partición, el pool une como mucho `n_workers` de las siguientes.
+
+        Args:
+            rating_chunks (Iterable[pd.DataFrame]): Bloques de 'books_rating' con las columnas necesarias.
+
+        Yields:
+            Tuple[pd.DataFrame, pd.DataFrame]: Filas unidas de la partición, con las columnas auxiliares
+            BOOK y ROW para recuperar el orden de la unión en memoria, y registros no coincidentes,
+            indexados por su posición en 'books_rating'.
+        """
+        counters = dict.fromkeys(self.COUNTERS, 0)
+        try:
+            self._partition_ratings(rating_chunks)
+            print(f"Uniendo {self.n_partitions} particiones en {self.n_workers} hilos...")
+            with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+                running, next_partition = deque(), 0
+                while running or next_partition < self.n_partitions:
+                    while next_partition < self.n_partitions and len(running) < self.n_workers:
+                        running.append(executor.submit(self._join_partition, next_partition))
+                        next_partition += 1
+                    part = running.popleft().result()
+                    if part is None:
+                        continue
+                    merged, unmatched, part_counters = part
+                    for counter in self.COUNTERS:
+                        counters[counter] += part_counters[counter]
+                    unmatched = unmatched.set_index(self.ROW)
+                    unmatched.index.name = None
+                    yield merged, unmatched
+        finally:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+        for counter in self.COUNTERS:
+            metrics.count(counter, counters[counter])
+        print(f"Duplicados eliminados: {counters['duplicates_removed']} filas.")
+
+    def join(self, rating_chunks: Iterable[pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Une todas las particiones y reúne el resultado en memoria, en el orden de la unión en memoria.
+
+        Args:
+            rating_chunks (Iterable[pd.DataFrame]): Bloques de 'books_rating' con las columnas necesarias.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: DataFrame combinado, limpio y sin duplicados, y
+            DataFrame con registros no coincidentes.
+        """
+        merged_parts, unmatched_parts = [], []
+        for merged, unmatched in self.partitions(rating_chunks):
+            if len(merged):
+                merged_parts.append(merged)
+            if len(unmatched):
+                unmatched_parts.append(unmatched)
+        unmatched = self.combine_unmatched(unmatched_parts)
+        if not merged_parts:
+            return pd.DataFrame(), unmatched
+
+        # Orden de la unión en memoria: por libro y, dentro de cada libro, por reseña
+        merged = pd.concat(merged_parts, ignore_index=True)
+        del merged_parts
+        order = np.lexsort((merged[self.ROW].to_numpy(), merged[self.BOOK].to_numpy()))
+        merged = merged.iloc[order].drop(columns=[self.BOOK, self.ROW]).reset_index(drop=True)
+        return merged, unmatched
+
+    @staticmethod
+    def combine_unmatched(parts: list) -> pd.DataFrame:
+        """
+        Reúne los registros no coincidentes de varias particiones en el orden de 'books_rating'.
+        """
+        return pd.concat(parts).sort_index(kind="stable") if parts else pd.DataFrame()
+
+    def _partition_ratings(self, rating_chunks: Iterable[pd.DataFrame]):
+        """
+        Escribe cada bloque de reseñas en las particiones de sus títulos.
+        """
+        chunks = iter(rating_chunks)
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+
+        rows_read = 0
+        with self._writers("ratings", self._schema(self._prepare_chunk(chunk, 0))) as writers:
+            for chunk_index, chunk in enumerate(itertools.chain([chunk], chunks)):
+                print(f"Repartiendo bloque {chunk_index + 1} ({len(chunk)} filas) en particiones...")
+                self._write_partitions(self._prepare_chunk(chunk, rows_read), writers)
+                rows_read += len(chunk)
+                metrics.count("rating_rows", len(chunk))
+                metrics.progress(rows_read)
+
+    def _prepare_chunk(self, chunk: pd.DataFrame, first_row: int) -> pd.DataFrame:
+        """
+        Añade a un bloque de reseñas la posición de cada fila.
+        """
+        return self._decode(chunk).assign(**{self.ROW: np.arange(first_row, first_row + len(chunk), dtype=np.int64)})
+
+    def _join_partition(self, partition: int) -> Tuple[pd.DataFrame, pd.DataFrame, dict]:
+        """
+        Une, limpia y deduplica una partición.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame, dict] o None: Filas unidas, registros no coincidentes y
+            contadores, o None si la partición no tiene reseñas.
+        """
+        ratings = self._read_partition("ratings", partition)
+        if ratings is None:
+            return None
+        books = self._read_partition("books", partition)
+        if books is None:
+            return ratings.iloc[:0], ratings, {**dict.fromkeys(self.COUNTERS, 0), "unmatched_rows": len(ratings)}
+
+        matched = ratings["Title"].isin(books["Title"])
+        unmatched = ratings[~matched]
+        merged = pd.merge(books, ratings[matched], on="Title", how="inner")
+        counters = {"unmatched_rows": len(unmatched), "rows_after_merge": len(merged)}
+
+        merged = merged[~merged["review/text"].isnull() & (merged["review/text"] != "")]
+        counters["rows_after_null_filter"] = len(merged)
+        if self.text_store is not None:
+            merged = self.text_store.replace_text(merged)
+
+        # Los duplicados comparten título, así que están en esta partición; se conserva la primera
+        # aparición según el orden de la unión en memoria
+        merged = merged.sort_values([self.BOOK, self.ROW], kind="stable")
+        data_columns = [column for column in merged.columns if column not in (self.BOOK, self.ROW)]
+        deduplicator = RowDeduplicator(data_columns, persistent=False)
+        merged = deduplicator.deduplicate(merged)
+        counters["duplicates_removed"] = deduplicator.removed
+        counters["rows_after_dedup"] = len(merged)
+
+        # Se vuelven a aplicar los tipos de 'books_data' (por ejemplo, las categóricas) en la partición
+        for column, dtype in self._dtypes.items():
+            merged[column] = merged[column].astype(dtype)
+        return merged, unmatched, counters
+
+    def _write_partitions(self, data: pd.DataFrame, writers: dict):
+        """
+        Reparte las filas de un DataFrame entre las particiones según el hash del título.
+        """
+        partition_ids = pd.util.hash_array(data["Title"].to_numpy(dtype=object)) % np.uint64(self.n_partitions)
+        order = np.argsort(partition_ids, kind="stable")
+        bounds = np.searchsorted(partition_ids[order], np.arange(self.n_partitions + 1, dtype=np.uint64))
+        for partition in range(self.n_partitions):
+            rows = order[bounds[partition]:bounds[partition + 1]]
+            if len(rows):
+                part = data.iloc[rows]
+                writers[partition].write_table(pa.Table.from_pandas(part, schema=writers.schema, preserve_index=False))
+
+    def _writers(self, name: str, schema: pa.Schema) -> "_PartitionWriters":
+        """
+        Abre un escritor Arrow IPC por partición.
+        """
+        return _PartitionWriters(
+            [os.path.join(self.spill_dir, f"{name}_{partition}.arrow") for partition in range(self.n_partitions)], schema
+        )
+
+    def _read_partition(self, name: str, partition: int) -> Optional[pd.DataFrame]:
+        """
+        Lee una partición, o devuelve None si no tiene filas.
+        """
+        path = os.path.join(self.spill_dir, f"{name}_{partition}.arrow")
+        if not os.path.exists(path):
+            return None
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    @staticmethod
+    def _decode(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convierte las columnas categóricas a sus valores, para escribirlas en las particiones.
+        """
+        categorical = [column for column in data.columns if isinstance(data[column].dtype, pd.CategoricalDtype)]
+        return data.astype({column: object for column in categorical}) if categorical else data
+
+    @staticmethod
+    def _schema(data: pd.DataFrame) -> pa.Schema:
+        """
+        Construye el esquema de las particiones: las columnas de texto como cadenas, aunque el
+        primer bloque solo tenga valores nulos.
+        """
+        fields = []
+        for column in data.columns:
+            dtype = data[column].dtype
+            if column not in PartitionedJoin.TEXT_COLUMNS and pd.api.types.is_numeric_dtype(dtype):
+                fields.append(pa.field(column, pa.from_numpy_dtype(dtype)))
+            else:
+                fields.append(pa.field(column, pa.string()))
+        return pa.schema(fields)
+
+
+class _PartitionWriters:
+    """
+    Escritores Arrow IPC de las particiones; los archivos se crean al recibir su primera fila.
+    """
+
+    def __init__(self, paths: list, schema: pa.Schema):
+        self.paths = paths
+        self.schema = schema
+        self._sinks, self._writers = {}, {}
+
+    def __enter__(self) -> "_PartitionWriters":
+        return self
+
+    def __getitem__(self, partition: int):
+        if partition not in self._writers:
+            self._sinks[partition] = pa.OSFile(self.paths[partition], "wb")
+            self._writers[partition] = pa.ipc.new_file(self._sinks[partition], self.schema)
+        return self._writers[partition]
+
+    def __exit__(self, *exc_info):
+        for partition, writer in self._writers.items():
+            writer.close()
+            self._sinks[partition].close()
@@ -0,0 +1,335 @@
+import os
+import json
+import pickle
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Union
+from src import config, metrics
+
+
+class Stage:
+    """
+    Etapa del flujo: una función con nombre que recibe los resultados de las etapas de las que depende.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: Union[Callable, str],
+        requires: Optional[List[str]] = None,
+        checkpoint: bool = False,
+        main_thread: bool = False,
+        message: Optional[str] = None
+    ):
+        """
+        Inicializa la etapa.
+
+        Args:
+            name (str): Nombre único de la etapa.
+            function (Callable o str): Función de la etapa; recibe como argumentos con nombre los resultados
+                de las etapas indicadas en `requires` y devuelve su propio resultado (o None). También puede
+                indicarse como 'módulo:atributo' (por ejemplo, 'src.eda:EDA'): el módulo solo se importa si
+                la etapa llega a ejecutarse.
+            requires (List[str], opcional): Etapas de las que depende.
+            checkpoint (bool): Si es True, el resultado se guarda en disco al terminar y la etapa no se
+                repite al reanudar una ejecución interrumpida.
+            main_thread (bool): Si es True, la etapa se ejecuta en el hilo principal y en el orden en
+                que se declaró (por ejemplo, las ventanas de gráficos o las preguntas al usuario).
+            message (str, opcional): Mensaje que se muestra al iniciar la etapa.
+        """
+        self.name = name
+        self.function = function
+        self.requires = requires or []
+        self.checkpoint = checkpoint
+        self.main_thread = main_thread
+        self.message = message
+
+    def resolve(self) -> Callable:
+        """
+        Devuelve la función de la etapa, importando su módulo si se declaró como 'módulo:atributo'.
+        """
+        if isinstance(self.function, str):
+            module, _, attribute = self.function.partition(":")
+            self.function = getattr(importlib.import_module(module), attribute)
+        return self.function
+
+
+class PipelineError(RuntimeError):
+    """
+    Error de una etapa del flujo.
+    """
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Error en la etapa '{stage}': {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Pipeline:
+    """
+    Clase para ejecutar un grafo de etapas con dependencias declaradas.
+
+    Las etapas independientes se ejecutan a la vez en un pool de hilos (las de `main_thread`, en el
+    hilo principal). Al terminar, el resultado de cada etapa con `checkpoint` se guarda en disco; si
+    la ejecución falla, la siguiente retoma desde esos puntos de control sin repetir las etapas ya
+    completadas. Se puede pedir un subconjunto de etapas: solo se ejecutan ellas y sus dependencias.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        checkpoint_path: Optional[str] = None,
+        n_workers: Optional[int] = None,
+        run_key: Union[str, Callable[[], str]] = ""
+    ):
+        """
+        Inicializa el flujo y carga la configuración desde el archivo .env.
+
+        Args:
+            stages (List[Stage]): Etapas del flujo.
+            checkpoint_path (str, opcional): Carpeta de los puntos de control. Por defecto se usa
+                CHECKPOINT_PATH del archivo .env.
+            n_workers (int, opcional): Número de hilos para las etapas independientes. Por defecto se usa
+                PIPELINE_WORKERS del archivo .env (0 usa todos los núcleos).
+            run_key (str o Callable): Identificador de los datos de entrada. Los puntos de control guardados
+                con otra clave no se reutilizan. Si es una función, se calcula al ejecutar el flujo, de modo
+                que declarar el flujo (por ejemplo, para listar sus etapas) no lee los datos de entrada.
+        """
+        config.load()
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Etapa duplicada: {stage.name}")
+            self.stages[stage.name] = stage
+        for stage in stages:
+            unknown = [name for name in stage.requires if name not in self.stages]
+            if unknown:
+                raise ValueError(f"La etapa '{stage.name}' depende de etapas desconocidas: {unknown}")
+
+        self.checkpoint_path = checkpoint_path or os.getenv("CHECKPOINT_PATH", "data/checkpoints/")
+        self.n_workers = n_workers if n_workers is not None else int(os.getenv("PIPELINE_WORKERS", 0))
+        self.run_key = run_key
+        self._manifest_lock = threading.Lock()
+
+    def select(self, targets: Optional[List[str]] = None) -> List[str]:
+        """
+        Devuelve las etapas necesarias para obtener las indicadas, en orden de declaración.
+
+        Args:
+            targets (List[str], opcional): Etapas pedidas. Por defecto, todas.
+
+        Returns:
+            List[str]: Etapas pedidas y todas sus dependencias.
+        """
+        if not targets:
+            return list(self.stages)
+        unknown = [name for name in targets if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Etapas desconocidas: {unknown}. Use algunas de {list(self.stages)}.")
+
+        selected, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.stages[name].requires)
+        return [name for name in self.stages if name in selected]
+
+    def run(self, targets: Optional[List[str]] = None, resume: bool = True) -> Dict[str, Any]:
+        """
+        Ejecuta las etapas pedidas y sus dependencias.
+
+        Args:
+            targets (List[str], opcional): Etapas pedidas. Por defecto, todas.
+            resume (bool): Si es True, las etapas con un punto de control válido no se repiten. Si es
+                False, se descartan los puntos de control anteriores.
+
+        Returns:
+            Dict[str, Any]: Resultado de cada etapa ejecutada o recuperada.
+
+        Raises:
+            PipelineError: Si alguna etapa falla. Los puntos de control de las etapas completadas se
+                conservan para reanudar.
+        """
+        selected = self.select(targets)
+        if callable(self.run_key):
+            self.run_key = self.run_key()
+        manifest = self._load_manifest() if resume else {}
+        if not resume:
+            self.clear_checkpoints()
+
+        completed = {name for name in selected if self._is_completed(name, manifest)}
+        to_run = self._stages_to_run(targets or self._final_stages(selected), completed)
+        if completed:
+            print(f"Reanudando: {len(completed)} etapas recuperadas desde los puntos de control.")
+
+        results = {}
+        for name in self._needed_checkpoints(to_run, completed):
+            results[name] = self._load_checkpoint(name, manifest)
+
+        self._execute(to_run, results, manifest)
+        # Ejecución terminada: los puntos de control solo sirven para reanudar tras un fallo
+        self.clear_checkpoints()
+        return results
+
+    def clear_checkpoints(self):
+        """
+        Elimina los puntos de control guardados.
+        """
+        if not os.path.isdir(self.checkpoint_path):
+            return
+        for file_name in os.listdir(self.checkpoint_path):
+            if file_name.endswith((".pkl", ".tmp")) or file_name == self.MANIFEST_FILE:
+                os.remove(os.path.join(self.checkpoint_path, file_name))
+
+    def _final_stages(self, selected: List[str]) -> List[str]:
+        """
+        Devuelve las etapas seleccionadas de las que no depende ninguna otra.
+        """
+        required = {name for stage in selected for name in self.stages[stage].requires}
+        return [name for name in selected if name not in required]
+
+    def _stages_to_run(self, targets: List[str], completed: set) -> List[str]:
+        """
+        Devuelve las etapas que hay que ejecutar para obtener las indicadas: las que no están
+        completadas y las dependencias no completadas de estas. Las dependencias completadas
+        se recuperan de su punto de control.
+        """
+        to_run, pending = set(), [name for name in targets if name not in completed]
+        while pending:
+            name = pending.pop()
+            if name not in to_run:
+                to_run.add(name)
+                pending.extend(required for required in self.stages[name].requires if required not in completed)
+        return [name for name in self.stages if name in to_run]
+
+    def _needed_checkpoints(self, to_run: List[str], completed: set) -> List[str]:
+        """
+        Devuelve las etapas completadas cuyo resultado necesita alguna etapa que se va a ejecutar.
+        """
+        needed = {name for stage in to_run for name in self.stages[stage].requires if name in completed}
+        return [name for name in self.stages if name in needed]
+
+    def _execute(self, to_run: List[str], results: Dict[str, Any], manifest: dict):
+        """
+        Ejecuta las etapas respetando sus dependencias: las del hilo principal en orden de declaración
+        y las demás en el pool de hilos en cuanto sus dependencias terminan.
+        """
+        pending_pool = [name for name in to_run if not self.stages[name].main_thread]
+        pending_main = [name for name in to_run if self.stages[name].main_thread]
+        n_workers = self.n_workers or os.cpu_count() or 1
+        running, failure = {}, None
+
+        def ready(name):
+            return all(required in results for required in self.stages[name].requires)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            while pending_pool or pending_main or running:
+                if failure is None:
+                    for name in [name for name in pending_pool if ready(name)]:
+                        pending_pool.remove(name)
+                        running[executor.submit(self._run_stage, name, results)] = name
+
+                main_stage = pending_main[0] if failure is None and pending_main and ready(pending_main[0]) else None
+                if main_stage is not None:
+                    pending_main.pop(0)
+                    try:
+                        results[main_stage] = self._run_stage(main_stage, results)
+                        self._save_checkpoint(main_stage, results[main_stage], manifest)
+                    except Exception as e:
+                        failure = failure or PipelineError(main_stage, e)
+
+                if not running:
+                    if main_stage is None and failure is None and (pending_pool or pending_main):
+                        # Ninguna etapa puede avanzar: las pendientes dependen de etapas no seleccionadas
+                        failure = PipelineError(", ".join(pending_pool + pending_main), RuntimeError("dependencias sin resolver"))
+                    if failure is not None:
+                        break
+                    continue
+
+                done, _ = wait(running, timeout=0 if main_stage is not None else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        self._save_checkpoint(name, results[name], manifest)
+                    except Exception as e:
+                        failure = failure or PipelineError(name, e)
+
+        if failure is not None:
+            print(f"{failure}. Las etapas completadas quedan guardadas para reanudar la ejecución.")
+            raise failure
+
+    def _run_stage(self, name: str, results: Dict[str, Any]) -> Any:
+        """
+        Ejecuta una etapa con los resultados de sus dependencias y registra sus métricas.
+        """
+        stage = self.stages[name]
+        if stage.message:
+            print(f"\n{stage.message}")
+        with metrics.recorder.stage(f"pipeline.{name}"):
+            return stage.resolve()(**{required: results[required] for required in stage.requires})
+
+    def _is_completed(self, name: str, manifest: dict) -> bool:
+        """
+        Indica si una etapa tiene un punto de control válido para los datos de entrada actuales.
+        """
+        entry = manifest.get(name)
+        if not self.stages[name].checkpoint or entry is None or entry.get("run_key") != self.run_key:
+            return False
+        return not entry.get("has_value") or os.path.exists(self._checkpoint_file(name))
+
+    def _save_checkpoint(self, name: str, value: Any, manifest: dict):
+        """
+        Guarda el resultado de una etapa y la registra como completada.
+        """
+        if not self.stages[name].checkpoint:
+            return
+        try:
+            os.makedirs(self.checkpoint_path, exist_ok=True)
+            if value is not None:
+                temporary_file = self._checkpoint_file(name) + ".tmp"
+                with open(temporary_file, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary_file, self._checkpoint_file(name))
+            with self._manifest_lock:
+                manifest[name] = {"run_key": self.run_key, "has_value": value is not None}
+                temporary_file = os.path.join(self.checkpoint_path, self.MANIFEST_FILE + ".tmp")
+                with open(temporary_file, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, indent=2)
+                os.replace(temporary_file, os.path.join(self.checkpoint_path, self.MANIFEST_FILE))
+        except (OSError, pickle.PicklingError, TypeError) as e:
+            print(f"No se pudo guardar el punto de control de '{name}': {e}")
+
+    def _load_checkpoint(self, name: str, manifest: dict) -> Any:
+        """
+        Recupera el resultado guardado de una etapa.
+        """
+        if not manifest[name].get("has_value"):
+            return None
+        print(f"Recuperando la etapa '{name}' desde su punto de control...")
+        with open(self._checkpoint_file(name), "rb") as f:
+            return pickle.load(f)
+
+    def _load_manifest(self) -> dict:
+        """
+        Lee el registro de etapas completadas.
+        """
+        manifest_file = os.path.join(self.checkpoint_path, self.MANIFEST_FILE)
+        if not os.path.exists(manifest_file):
+            return {}
+        try:
+            with open(manifest_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer el registro de puntos de control, se ejecutará todo: {e}")
+            return {}
+
+    def _checkpoint_file(self, name: str) -> str:
+        """
+        Devuelve la ruta del archivo de resultado de una etapa.
+        """
+        return os.path.join(self.checkpoint_path, f"{name}.pkl")
@@ -0,0 +1,352 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Optional
+from src.dedup import RowDeduplicator
+from src import config, metrics
+
+
+class StratifiedSampler:
+    """
+    Clase para obtener, mientras se cargan los datos, una muestra estratificada y reproducible de las
+    reseñas procesadas.
+
+    Los estratos son niveles de popularidad del título según 'ratingsCount' (sin dato o menos de 1,
+    de 1 a 9, de 10 a 99, de 100 a 999 y 1000 o más), con la misma capacidad para cada uno, de modo
+    que los libros más populares y los menos conocidos quedan representados aunque sean pocos.
+
+    Dentro de cada estrato se usa muestreo de reservorio con prioridades: cada fila recibe una clave
+    pseudoaleatoria derivada de su contenido y de la semilla, y el reservorio conserva las filas con
+    las claves más pequeñas. El resultado es una muestra aleatoria simple del estrato que no depende
+    del tamaño de bloque ni del orden de carga, solo de la semilla y de los datos.
+    """
+
+    POPULARITY_EDGES = [1, 10, 100, 1000]
+    STRATUM_LABELS = ["sin datos o < 1", "1-9", "10-99", "100-999", ">= 1000"]
+    DEFAULT_SIZE = 100_000
+    # Constantes de splitmix64, para mezclar la huella de cada fila con la semilla
+    GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+    MIX_MULTIPLIERS = (0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+
+    def __init__(self, size: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Inicializa el muestreador y carga la configuración desde el archivo .env.
+
+        Args:
+            size (int, opcional): Tamaño máximo de la muestra, repartido por igual entre los estratos.
+                Por defecto, PREVIEW_SIZE del archivo .env (100000).
+            seed (int, opcional): Semilla de la muestra. Por defecto, PREVIEW_SEED del archivo .env (0).
+        """
+        config.load()
+        self.size = size or int(os.getenv("PREVIEW_SIZE", self.DEFAULT_SIZE))
+        if self.size <= 0:
+            raise ValueError("El tamaño de la muestra (PREVIEW_SIZE) debe ser un entero positivo.")
+        self.seed = seed if seed is not None else int(os.getenv("PREVIEW_SEED", 0))
+        n_strata = len(self.STRATUM_LABELS)
+        self.capacity = -(-self.size // n_strata)
+        self.population = np.zeros(n_strata, dtype=np.int64)
+        self.rows_seen = 0
+        # Reservorio de cada estrato: filas, claves y posición de cada fila en la carga
+        self._reservoirs = [None] * n_strata
+        self._deduplicator = RowDeduplicator(bits=64, persistent=False)
+        self._seed_mask = np.uint64((self.seed * self.GOLDEN_GAMMA) & 0xFFFFFFFFFFFFFFFF)
+        self._sample = None
+        self._codes = None
+
+    @classmethod
+    def stratum_codes(cls, ratings_count: pd.Series) -> np.ndarray:
+        """
+        Asigna cada fila a su nivel de popularidad.
+
+        Args:
+            ratings_count (pd.Series): Columna 'ratingsCount'.
+
+        Returns:
+            np.ndarray: Código del estrato de cada fila (0 para los títulos sin dato).
+        """
+        values = ratings_count.to_numpy(dtype=np.float64, na_value=np.nan)
+        codes = np.searchsorted(cls.POPULARITY_EDGES, values, side="right")
+        codes[np.isnan(values)] = 0
+        return codes
+
+    def add(self, chunk: pd.DataFrame):
+        """
+        Incorpora un bloque de filas procesadas (ya deduplicadas) a los reservorios.
+
+        Args:
+            chunk (pd.DataFrame): Bloque de filas procesadas con la columna 'ratingsCount'.
+        """
+        codes = self.stratum_codes(chunk["ratingsCount"])
+        keys = self._priority_keys(chunk)
+        positions = np.arange(self.rows_seen, self.rows_seen + len(chunk))
+        self.rows_seen += len(chunk)
+        self.population += np.bincount(codes, minlength=len(self.population))
+        self._sample = None
+
+        for code in np.unique(codes):
+            mask = codes == code
+            rows, row_keys, row_positions = chunk[mask], keys[mask], positions[mask]
+            if self._reservoirs[code] is not None:
+                reservoir = self._reservoirs[code]
+                rows = pd.concat([reservoir[0], rows])
+                row_keys = np.concatenate([reservoir[1], row_keys])
+                row_positions = np.concatenate([reservoir[2], row_positions])
+            if len(rows) > self.capacity:
+                keep = np.sort(np.argpartition(row_keys, self.capacity - 1)[:self.capacity])
+                rows, row_keys, row_positions = rows.iloc[keep], row_keys[keep], row_positions[keep]
+            self._reservoirs[code] = (rows, row_keys, row_positions)
+
+    def _priority_keys(self, chunk: pd.DataFrame) -> np.ndarray:
+        """
+        Calcula la clave pseudoaleatoria de cada fila: su huella mezclada con la semilla.
+        """
+        keys = self._deduplicator.fingerprints(chunk)[:, 0] ^ self._seed_mask
+        for shift, multiplier in zip((30, 27), self.MIX_MULTIPLIERS):
+            keys = (keys ^ (keys >> np.uint64(shift))) * np.uint64(multiplier)
+        return keys ^ (keys >> np.uint64(31))
+
+    def sample(self) -> pd.DataFrame:
+        """
+        Devuelve la muestra, con las filas en el orden en que se cargaron.
+
+        Returns:
+            pd.DataFrame: Filas de la muestra de todos los estratos.
+        """
+        if self._sample is None:
+            parts = [(code, reservoir) for code, reservoir in enumerate(self._reservoirs) if reservoir is not None]
+            if not parts:
+                return pd.DataFrame()
+            order = np.argsort(np.concatenate([reservoir[2] for _, reservoir in parts]), kind="stable")
+            self._sample = pd.concat([reservoir[0] for _, reservoir in parts], ignore_index=True).iloc[order]
+            self._sample = self._sample.reset_index(drop=True)
+            self._codes = np.concatenate([np.full(len(reservoir[0]), code) for code, reservoir in parts])[order]
+        return self._sample
+
+    @property
+    def codes(self) -> np.ndarray:
+        """
+        Estrato de cada fila de la muestra.
+        """
+        self.sample()
+        return self._codes
+
+    def sample_sizes(self) -> np.ndarray:
+        """
+        Número de filas de la muestra en cada estrato.
+        """
+        return np.bincount(self.codes, minlength=len(self.population))
+
+    def weights(self) -> np.ndarray:
+        """
+        Peso de cada fila de la muestra: filas del estrato en los datos completos por cada fila muestreada.
+
+        Returns:
+            np.ndarray: Pesos float64 alineados con la muestra.
+        """
+        sizes = self.sample_sizes()
+        stratum_weights = np.divide(self.population, sizes, out=np.zeros(len(sizes)), where=sizes > 0)
+        return stratum_weights[self.codes]
+
+    def strata(self) -> pd.DataFrame:
+        """
+        Resumen de los estratos: filas en los datos completos, filas muestreadas y peso.
+
+        Returns:
+            pd.DataFrame: Una fila por estrato con las columnas 'stratum', 'population', 'sample' y 'weight'.
+        """
+        sizes = self.sample_sizes()
+        return pd.DataFrame({
+            "stratum": self.STRATUM_LABELS,
+            "population": self.population,
+            "sample": sizes,
+            "weight": np.divide(self.population, sizes, out=np.zeros(len(sizes)), where=sizes > 0),
+        })
+
+
+class PreviewEstimator:
+    """
+    Clase para estimar totales y promedios de los datos completos a partir de una muestra
+    estratificada, con intervalos de confianza.
+
+    Los totales usan el estimador estratificado (suma por estrato de N_h por el promedio muestral) y su
+    varianza incluye la corrección por población finita; los promedios se estiman como cociente de
+    dos totales, con la varianza linealizada. Los intervalos usan la aproximación normal.
+    """
+
+    DEFAULT_CONFIDENCE = 0.95
+
+    def __init__(self, sampler: StratifiedSampler, confidence: Optional[float] = None):
+        """
+        Inicializa el estimador y carga la configuración desde el archivo .env.
+
+        Args:
+            sampler (StratifiedSampler): Muestreador con la muestra ya obtenida.
+            confidence (float, opcional): Nivel de confianza de los intervalos. Por defecto,
+                PREVIEW_CONFIDENCE del archivo .env (0.95).
+        """
+        config.load()
+        self.sampler = sampler
+        self.confidence = confidence or float(os.getenv("PREVIEW_CONFIDENCE", self.DEFAULT_CONFIDENCE))
+        if not 0 < self.confidence < 1:
+            raise ValueError("El nivel de confianza (PREVIEW_CONFIDENCE) debe estar entre 0 y 1.")
+        self.z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        self.codes = sampler.codes
+        self.population = sampler.population.astype(np.float64)
+        self.sizes = sampler.sample_sizes().astype(np.float64)
+
+    def _total_and_variance(self, values: np.ndarray) -> tuple:
+        """
+        Estima el total de una variable en los datos completos y la varianza del estimador.
+        """
+        n_strata = len(self.population)
+        sums = np.bincount(self.codes, weights=values, minlength=n_strata)
+        squares = np.bincount(self.codes, weights=values * values, minlength=n_strata)
+        sampled = self.sizes > 0
+        means = np.divide(sums, self.sizes, out=np.zeros(n_strata), where=sampled)
+        variances = np.divide(squares - self.sizes * means ** 2, self.sizes - 1, out=np.zeros(n_strata), where=self.sizes > 1)
+        finite_correction = np.divide(self.population - self.sizes, self.population, out=np.zeros(n_strata), where=sampled)
+        total = float((self.population * means).sum())
+        variance = float((self.population ** 2 * finite_correction * np.divide(
+            np.maximum(variances, 0.0), self.sizes, out=np.zeros(n_strata), where=sampled
+        )).sum())
+        return total, variance
+
+    def _interval(self, estimate: float, variance: float, lower_bound: Optional[float] = None) -> dict:
+        """
+        Intervalo de confianza de una estimación.
+        """
+        margin = self.z * np.sqrt(variance)
+        low = estimate - margin if lower_bound is None else max(estimate - margin, lower_bound)
+        return {"estimate": estimate, "low": low, "high": estimate + margin}
+
+    def total(self, values) -> dict:
+        """
+        Estima el total de una variable (por ejemplo, un indicador para contar filas) en los datos completos.
+
+        Args:
+            values (array o pd.Series): Valores de la variable en la muestra; los nulos cuentan como 0.
+
+        Returns:
+            dict: Claves 'estimate', 'low' y 'high'.
+        """
+        numbers = np.nan_to_num(np.asarray(values, dtype=np.float64))
+        total, variance = self._total_and_variance(numbers)
+        return self._interval(total, variance, lower_bound=0.0 if (numbers >= 0).all() else None)
+
+    def mean(self, values) -> dict:
+        """
+        Estima el promedio de una variable en los datos completos, sin contar sus valores nulos.
+
+        Args:
+            values (array o pd.Series): Valores de la variable en la muestra.
+
+        Returns:
+            dict: Claves 'estimate', 'low' y 'high' (None si no hay valores).
+        """
+        numbers = np.asarray(values, dtype=np.float64)
+        present = (~np.isnan(numbers)).astype(np.float64)
+        numbers = np.nan_to_num(numbers)
+        total, _ = self._total_and_variance(numbers)
+        count, _ = self._total_and_variance(present)
+        if count <= 0:
+            return {"estimate": None, "low": None, "high": None}
+        ratio = total / count
+        _, residual_variance = self._total_and_variance(numbers - ratio * present)
+        return self._interval(ratio, residual_variance / count ** 2)
+
+    def group_totals(self, groups: pd.Series) -> pd.DataFrame:
+        """
+        Estima el número de filas de cada grupo (por ejemplo, las reseñas de cada título) en los datos completos.
+
+        Args:
+            groups (pd.Series): Grupo de cada fila de la muestra.
+
+        Returns:
+            pd.DataFrame: Columnas 'estimate', 'low' y 'high', indexadas por grupo.
+        """
+        counts = pd.DataFrame({"group": groups.to_numpy(), "stratum": self.codes}).groupby(
+            ["group", "stratum"], observed=True, sort=False
+        ).size()
+        strata = counts.index.get_level_values("stratum").to_numpy()
+        population, sizes = self.population[strata], self.sizes[strata]
+        shares = counts.to_numpy() / sizes
+        variances = np.divide(sizes * shares * (1 - shares), sizes - 1, out=np.zeros(len(sizes)), where=sizes > 1)
+        parts = pd.DataFrame({
+            "estimate": population * shares,
+            "variance": population ** 2 * (1 - sizes / population) * variances / sizes,
+        }, index=counts.index.get_level_values("group")).groupby(level=0, observed=True, sort=False).sum()
+        margin = self.z * np.sqrt(parts["variance"])
+        return pd.DataFrame({
+            "estimate": parts["estimate"],
+            "low": np.maximum(parts["estimate"] - margin, 0.0),
+            "high": parts["estimate"] + margin,
+        })
+
+    @metrics.track("PreviewEstimator.report")
+    def report(self, data: pd.DataFrame, top_n: int = 10) -> dict:
+        """
+        Calcula las estimaciones principales de los datos completos a partir de la muestra con sentimiento.
+
+        Args:
+            data (pd.DataFrame): Muestra con 'compound' y 'Sentiment', en el mismo orden que la del muestreador.
+            top_n (int): Número de títulos con más reseñas estimadas a incluir.
+
+        Returns:
+            dict: Informe con los estratos, los promedios y los conteos estimados, y los títulos con más reseñas.
+        """
+        print("Estimando totales y promedios de los datos completos a partir de la muestra...")
+        scores = data["review/score"].to_numpy(dtype=np.float64, na_value=np.nan)
+        titles = self.group_totals(data["Title"])
+        top_titles = titles.nlargest(top_n, "estimate", keep="first")
+        report = {
+            "confidence": self.confidence,
+            "population_rows": int(self.population.sum()),
+            "sample_rows": int(self.sizes.sum()),
+            "strata": self.sampler.strata().to_dict(orient="records"),
+            "means": {
+                "review/score": self.mean(scores),
+                "compound": self.mean(data["compound"].to_numpy(dtype=np.float64, na_value=np.nan)),
+            },
+            "counts": {
+                **{f"rating_{rating}": self.total(scores == rating) for rating in range(1, 6)},
+                **{
+                    f"sentiment_{sentiment}": self.total((data["Sentiment"] == sentiment).to_numpy())
+                    for sentiment in ("positivo", "neutral", "negativo")
+                },
+            },
+            "top_titles_by_reviews": [
+                {"Title": str(title), **row} for title, row in top_titles.to_dict(orient="index").items()
+            ],
+        }
+        self._print_report(report)
+        return report
+
+    def _print_report(self, report: dict):
+        """
+        Muestra un resumen del informe.
+        """
+        percent = f"{self.confidence:.0%}"
+        print(f"Vista previa: {report['sample_rows']} filas muestreadas de {report['population_rows']} (intervalos al {percent}).")
+        for name, interval in {**report["means"], **report["counts"]}.items():
+            if interval["estimate"] is not None:
+                print(f"  {name}: {interval['estimate']:.4f} [{interval['low']:.4f}, {interval['high']:.4f}]")
+
+    @staticmethod
+    def write(report: dict, path: str) -> str:
+        """
+        Guarda el informe en formato JSON.
+
+        Args:
+            report (dict): Informe calculado con `report`.
+            path (str): Ruta del archivo.
+
+        Returns:
+            str: Ruta del archivo escrito.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=float)
+        print(f"Informe de la vista previa guardado en: {path}")
+        return path
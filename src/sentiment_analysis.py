@@ -1,6 +1,71 @@
+import os
+import numpy as np
 import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from src.sentiment_cache import SentimentScoreCache
+from src.incidence_index import IncidenceIndexes
+from src.text_store import TextStore
+from src.topk import top_k, bottom_k
+from src.sentiment_labels import SENTIMENT_THRESHOLD, classify_sentiment
+from src import config, metrics
+
+
+# Analizador propio de cada proceso del pool, creado una sola vez por proceso
+_worker_analyzer = None
+
+
+def _create_analyzer(engine: str):
+    """
+    Crea el analizador del motor de puntuación indicado.
+
+    Args:
+        engine (str): 'vader' (analizador de referencia, reseña a reseña) o 'batch' (BatchSentimentScorer).
+    """
+    # Los motores se importan al puntuar, no al importar el módulo: sin textos nuevos no se cargan
+    if engine == "batch":
+        from src.batch_sentiment import BatchSentimentScorer
+        return BatchSentimentScorer()
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+def _score_block(analyzer, reviews: list) -> list:
+    """
+    Calcula las puntuaciones de sentimiento de un bloque de reseñas con cualquiera de los dos motores.
+
+    Args:
+        analyzer: Analizador creado con _create_analyzer.
+        reviews (list): Reseñas preprocesadas.
+
+    Returns:
+        list: Diccionarios de puntuaciones, en el mismo orden que las reseñas.
+    """
+    # Solo BatchSentimentScorer puntúa bloques completos; se distingue sin importar su módulo
+    if hasattr(analyzer, "polarity_scores_batch"):
+        return analyzer.polarity_scores_batch(reviews)
+    return [analyzer.polarity_scores(review) for review in reviews]
+
+
+def _init_worker(engine: str):
+    """
+    Inicializa el analizador de sentimiento de un proceso del pool.
+    """
+    global _worker_analyzer
+    _worker_analyzer = _create_analyzer(engine)
+
+
+def _score_chunk(reviews: list) -> list:
+    """
+    Calcula las puntuaciones de sentimiento de un bloque de reseñas en un proceso del pool.
+
+    Args:
+        reviews (list): Reseñas preprocesadas.
+
+    Returns:
+        list: Diccionarios de puntuaciones, en el mismo orden que las reseñas.
+    """
+    return _score_block(_worker_analyzer, reviews)
 
 
 class SentimentAnalysis:
@@ -8,56 +73,295 @@ class SentimentAnalysis:
     Clase para realizar análisis de sentimientos en reseñas de libros.
     """
 
-    def __init__(self, data: pd.DataFrame):
+    # Tamaño de bloque por defecto para el cálculo en paralelo
+    DEFAULT_CHUNK_SIZE = 10_000
+    ENGINES = ("vader", "batch")
+    SENTIMENTS = ["positivo", "neutral", "negativo"]
+    # Columnas de resultados del formato compacto y filas de muestra para estimar el formato sin compactar
+    COMPACT_COLUMNS = ("neg", "neu", "pos", "compound", "Sentiment", "review/score")
+    MEMORY_SAMPLE_SIZE = 10_000
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        n_jobs: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        score_cache: Optional[SentimentScoreCache] = None,
+        indexes: Optional[IncidenceIndexes] = None,
+        text_store: Optional[TextStore] = None,
+        engine: Optional[str] = None,
+        compact: Optional[bool] = None
+    ):
         """
         Inicializa la clase SentimentAnalysis con el DataFrame procesado.
 
         Args:
             data (pd.DataFrame): DataFrame procesado que contiene las reseñas de libros.
+            n_jobs (int, opcional): Número de procesos para calcular las puntuaciones. Si no se indica,
+                se usa SENTIMENT_WORKERS del archivo .env (1 por defecto; 0 usa todos los núcleos).
+            chunk_size (int, opcional): Reseñas por bloque en el cálculo en paralelo. Si no se indica,
+                se usa SENTIMENT_CHUNK_SIZE del archivo .env o el valor por defecto.
+            score_cache (SentimentScoreCache, opcional): Caché persistente de puntuaciones. Si se indica,
+                solo se calculan las puntuaciones de los textos que no están en la caché.
+            indexes (IncidenceIndexes, opcional): Índices de autores y categorías compartidos
+                con otros análisis sobre el mismo DataFrame. Si no se indica, se crean al usarse.
+            text_store (TextStore, opcional): Almacén de textos, si `data` lleva 'text_id' en lugar de
+                'review/text'. Los textos distintos se leen por lotes de TEXT_BATCH_SIZE del archivo .env.
+            engine (str, opcional): Motor de puntuación: 'vader' (SentimentIntensityAnalyzer, reseña a
+                reseña) o 'batch' (BatchSentimentScorer, por bloques y con los mismos resultados). Si no
+                se indica, se usa SENTIMENT_ENGINE del archivo .env ('vader' por defecto).
+            compact (bool, opcional): Si es True, los resultados se guardan en formato compacto (columnas
+                float32, 'Sentiment' como categoría, sin diccionarios por fila ni copia del texto). Si no
+                se indica, se usa SENTIMENT_COMPACT del archivo .env (0 por defecto).
         """
         self.data = data
-        self.analyzer = SentimentIntensityAnalyzer()
+        self.text_store = text_store
+        self.score_cache = score_cache
+        self.indexes = indexes or IncidenceIndexes(data)
+        self._query_index = None
+        config.load()
+        self.engine = engine or os.getenv("SENTIMENT_ENGINE", "vader")
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Motor de sentimiento desconocido: {self.engine}. Use uno de {list(self.ENGINES)}.")
+        if score_cache is not None and score_cache.engine != self.engine:
+            raise ValueError(
+                f"La caché de puntuaciones es del motor '{score_cache.engine}' y el análisis usa '{self.engine}'."
+            )
+        self._analyzer = None
+        self.n_jobs = n_jobs if n_jobs is not None else int(os.getenv("SENTIMENT_WORKERS", 1))
+        self.chunk_size = chunk_size or int(os.getenv("SENTIMENT_CHUNK_SIZE", self.DEFAULT_CHUNK_SIZE))
+        self.text_batch_size = int(os.getenv("TEXT_BATCH_SIZE", TextStore.DEFAULT_BATCH_SIZE))
+        self.compact = compact if compact is not None else os.getenv("SENTIMENT_COMPACT", "0") == "1"
+
+    @property
+    def analyzer(self):
+        """
+        Analizador del motor de puntuación, creado (e importado) la primera vez que hay reseñas que puntuar.
+        """
+        if self._analyzer is None:
+            self._analyzer = _create_analyzer(self.engine)
+        return self._analyzer
 
+    @metrics.track()
     def preprocess_text(self):
         """
         Limpia y estandariza las reseñas para el análisis de sentimiento.
         """
+        if self._lazy_text():
+            # Los textos se leen y se preprocesan por lotes al calcular las puntuaciones
+            print("Texto diferido: se preprocesará por lotes desde el almacén de textos.")
+            return
+        if self.compact:
+            # Sin copia del texto en el DataFrame: se preprocesa al calcular las puntuaciones
+            print("Formato compacto: el texto se preprocesará al calcular las puntuaciones.")
+            return
         print("Preprocesando texto de las reseñas...")
-        self.data["clean_reviews"] = self.data["review/text"].str.lower().fillna("")
+        self.data["clean_reviews"] = self._clean_reviews(self.data["review/text"])
         print("Texto preprocesado.")
 
+    @metrics.track()
     def calculate_sentiment_scores(self):
         """
         Calcula las puntuaciones de sentimiento (compound) y clasifica el sentimiento.
+
+        Con más de un proceso configurado, las reseñas se reparten en bloques entre un pool
+        de procesos; los resultados se devuelven en el orden original de las filas. Si hay una
+        caché de puntuaciones, cada texto distinto se busca en ella y solo los textos nuevos
+        llegan al analizador.
+
+        En formato compacto no se guarda el diccionario de puntuaciones de cada fila: se añaden
+        'neg', 'neu', 'pos' y 'compound' en float32, 'Sentiment' como categoría y 'review/score'
+        pasa a int8 si todas las calificaciones son enteras.
         """
         print("Calculando puntuaciones de sentimiento...")
-        self.data["score"] = self.data["clean_reviews"].apply(
-            lambda review: self.analyzer.polarity_scores(review)
-        )
-        self.data["compound"] = self.data["score"].apply(lambda x: x["compound"])
-        self.data["Sentiment"] = self.data["compound"].apply(self._classify_sentiment)
+        if self._lazy_text():
+            scores = self._lazy_polarity_scores()
+        else:
+            if "clean_reviews" in self.data.columns:
+                reviews = self.data["clean_reviews"]
+            else:
+                reviews = self._clean_reviews(self.data["review/text"])
+            if self.score_cache is not None:
+                scores = self._cached_polarity_scores(reviews)
+            else:
+                scores = self._polarity_scores(reviews.tolist())
+            del reviews
+
+        if self.compact:
+            self._compact_scores(scores)
+        else:
+            self.data["score"] = pd.Series(scores, index=self.data.index)
+            self.data["compound"] = self.data["score"].apply(lambda x: x["compound"])
+            self.data["Sentiment"] = self.data["compound"].apply(self._classify_sentiment)
         print("Puntuaciones de sentimiento calculadas.")
 
         # Retornar el DataFrame actualizado
         return self.data
 
+    def _compact_scores(self, scores: list):
+        """
+        Añade las puntuaciones en formato compacto e informa de la memoria por fila de los
+        resultados antes y después de compactarlos.
+
+        Args:
+            scores (list): Diccionarios de puntuaciones, en el orden de las filas.
+        """
+        before = self._legacy_bytes_per_row(scores)
+        columns = {
+            key: np.fromiter((score[key] for score in scores), dtype=np.float64, count=len(scores))
+            for key in SentimentScoreCache.SCORE_KEYS
+        }
+        # La clasificación usa 'compound' en float64: en float32, 0.05 queda ligeramente por encima del umbral
+        compound = columns["compound"]
+        codes = np.select([compound > SENTIMENT_THRESHOLD, compound < -SENTIMENT_THRESHOLD], [0, 2], default=1).astype(np.int8)
+        for key, values in columns.items():
+            self.data[key] = values.astype(np.float32)
+        self.data["Sentiment"] = pd.Categorical.from_codes(codes, categories=self.SENTIMENTS)
+
+        ratings = self.data["review/score"].to_numpy(dtype=np.float64, na_value=np.nan)
+        limit = np.iinfo(np.int8).max
+        if (np.abs(ratings) <= limit).all() and (ratings == np.round(ratings)).all():
+            self.data["review/score"] = ratings.astype(np.int8)
+        else:
+            print("'review/score' se mantiene en su tipo: hay calificaciones nulas o no enteras.")
+
+        after = self._bytes_per_row(self.data[list(self.COMPACT_COLUMNS)])
+        print(f"Memoria de los resultados de sentimiento: {before:.1f} bytes por fila antes, {after:.1f} después.")
+        metrics.count("bytes_per_row_before", round(before))
+        metrics.count("bytes_per_row_after", round(after))
+
+    def _legacy_bytes_per_row(self, scores: list) -> float:
+        """
+        Estima los bytes por fila del formato sin compactar (diccionario de puntuaciones, 'compound' en
+        float64, 'Sentiment' como texto, 'review/score' en float64 y copia del texto preprocesado) sobre
+        una muestra de filas, sin construirlo para todo el DataFrame.
+        """
+        sample = self.data.iloc[:self.MEMORY_SAMPLE_SIZE]
+        compound = pd.Series([score["compound"] for score in scores[:len(sample)]], index=sample.index)
+        legacy = pd.DataFrame({
+            "score": pd.Series(scores[:len(sample)], index=sample.index),
+            "compound": compound,
+            "Sentiment": compound.apply(self._classify_sentiment),
+            "review/score": sample["review/score"].astype(np.float64),
+        })
+        if "review/text" in sample.columns:
+            legacy["clean_reviews"] = self._clean_reviews(sample["review/text"])
+        return self._bytes_per_row(legacy)
+
+    @staticmethod
+    def _bytes_per_row(data: pd.DataFrame) -> float:
+        """
+        Bytes por fila de un DataFrame, contando el contenido de las columnas de objetos y de texto.
+        """
+        return data.memory_usage(index=False, deep=True).sum() / len(data) if len(data) else 0.0
+
+    def _lazy_text(self) -> bool:
+        """
+        Indica si los textos están en el almacén de textos en lugar de en el DataFrame.
+        """
+        return self.text_store is not None and TextStore.ID_COLUMN in self.data.columns
+
     @staticmethod
-    def _classify_sentiment(compound: float) -> str:
+    def _clean_reviews(texts: pd.Series) -> pd.Series:
+        """
+        Pasa las reseñas a minúsculas y reemplaza los valores nulos por cadenas vacías.
+        """
+        return texts.str.lower().fillna("")
+
+    def _lazy_polarity_scores(self) -> pd.Series:
+        """
+        Calcula las puntuaciones de sentimiento leyendo los textos distintos del almacén por lotes,
+        de modo que en memoria solo hay un lote de textos a la vez.
+
+        Returns:
+            list: Diccionarios de puntuaciones, en el orden de las filas.
+        """
+        codes, text_ids = pd.factorize(self.data[TextStore.ID_COLUMN])
+        print(f"Leyendo {len(text_ids)} textos distintos del almacén en lotes de {self.text_batch_size}...")
+        scores = []
+        for texts in self.text_store.batches(text_ids, self.text_batch_size):
+            reviews = self._clean_reviews(pd.Series(texts, dtype="str"))
+            if self.score_cache is not None:
+                scores.extend(self._cached_polarity_scores(reviews))
+            else:
+                scores.extend(self._polarity_scores(reviews.tolist()))
+        return [scores[code] for code in codes]
+
+    def _cached_polarity_scores(self, reviews: pd.Series) -> list:
+        """
+        Calcula las puntuaciones de sentimiento consultando primero la caché persistente.
+
+        Args:
+            reviews (pd.Series): Reseñas preprocesadas.
+
+        Returns:
+            list: Diccionarios de puntuaciones, en el mismo orden que las reseñas.
+        """
+        codes, unique_reviews = pd.factorize(reviews)
+        keys = [SentimentScoreCache.text_key(review) for review in unique_reviews]
+        cached = self.score_cache.get_many(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        print(f"Textos distintos: {len(keys)}, encontrados en caché: {len(keys) - len(missing)}")
+        metrics.count("distinct_texts", len(keys))
+        metrics.count("cache_hits", len(keys) - len(missing))
+        if missing:
+            new_scores = self._polarity_scores([unique_reviews[i] for i in missing])
+            new_entries = {keys[i]: score for i, score in zip(missing, new_scores)}
+            self.score_cache.put_many(new_entries)
+            cached.update(new_entries)
+
+        unique_scores = [cached[key] for key in keys]
+        return [unique_scores[code] for code in codes]
+
+    def _polarity_scores(self, reviews: list) -> list:
+        """
+        Calcula las puntuaciones de sentimiento de una lista de reseñas, en serie o en paralelo
+        según el número de procesos configurado.
+
+        Args:
+            reviews (list): Reseñas preprocesadas.
+
+        Returns:
+            list: Diccionarios de puntuaciones, en el mismo orden que las reseñas.
+        """
+        metrics.count("texts_scored", len(reviews))
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        if n_jobs > 1 and len(reviews) > self.chunk_size:
+            return self._parallel_polarity_scores(reviews, n_jobs)
+
+        # Por bloques, para informar del avance en las ejecuciones largas
+        scores = []
+        for start in range(0, len(reviews), self.chunk_size):
+            scores.extend(_score_block(self.analyzer, reviews[start:start + self.chunk_size]))
+            metrics.progress(len(scores), len(reviews))
+        return scores
+
+    def _parallel_polarity_scores(self, reviews: list, n_jobs: int) -> list:
         """
-        Clasifica el sentimiento basado en la puntuación compuesta.
+        Calcula las puntuaciones de sentimiento en paralelo, con un analizador por proceso.
 
         Args:
-            compound (float): Puntuación compuesta.
+            reviews (list): Reseñas preprocesadas.
+            n_jobs (int): Número de procesos del pool.
 
         Returns:
-            str: Clasificación del sentimiento ('positivo', 'neutral', 'negativo').
+            list: Diccionarios de puntuaciones, en el mismo orden que las reseñas.
         """
-        if compound > 0.05:
-            return "positivo"
-        elif compound < -0.05:
-            return "negativo"
-        return "neutral"
+        chunks = [reviews[i:i + self.chunk_size] for i in range(0, len(reviews), self.chunk_size)]
+        print(f"Calculando en paralelo: {len(chunks)} bloques en {n_jobs} procesos...")
 
+        scores = []
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(self.engine,)) as executor:
+            for chunk_scores in executor.map(_score_chunk, chunks):
+                scores.extend(chunk_scores)
+                metrics.progress(len(scores), len(reviews))
+        return scores
+
+    # Clasificación del sentimiento según la puntuación compuesta ('positivo', 'neutral', 'negativo')
+    _classify_sentiment = staticmethod(classify_sentiment)
+
+    @metrics.track()
     def visualize_sentiment_distribution(self):
         """
         Genera visualizaciones para la distribución de sentimientos.
@@ -71,9 +375,11 @@ class SentimentAnalysis:
         """
         Genera un gráfico de pastel para la distribución de sentimientos.
         """
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(6, 6))
         labels = ["Positivo", "Negativo", "Neutral"]
-        sizes = self.data["Sentiment"].value_counts()
+        sizes = self._sentiment_counts()
         colors = ["green", "red", "blue"]
         explode = (0.1, 0.1, 0.1)
 
@@ -92,16 +398,12 @@ class SentimentAnalysis:
         """
         Genera un histograma para la distribución de puntuaciones compuestas.
         """
-        plt.figure(figsize=(8, 6))
-        sentiments = {
-            "Positivo": self.data[self.data["compound"] > 0]["compound"],
-            "Negativo": self.data[self.data["compound"] < 0]["compound"],
-            "Neutral": self.data[self.data["compound"] == 0]["compound"],
-        }
-        colors = ["green", "red", "orange"]
+        import matplotlib.pyplot as plt
 
-        for sentiment, color in zip(sentiments, colors):
-            plt.hist(sentiments[sentiment], bins=20, alpha=0.5, label=sentiment, color=color)
+        plt.figure(figsize=(8, 6))
+        for label, counts, edges, color in self._compound_histograms():
+            # Histograma ya agregado: un valor por intervalo, ponderado con su conteo
+            plt.hist(edges[:-1], bins=edges, weights=counts, alpha=0.5, label=label, color=color)
 
         plt.title("Distribución de sentimientos")
         plt.xlabel("Puntuación compuesta")
@@ -113,13 +415,16 @@ class SentimentAnalysis:
         """
         Genera un gráfico de barras para la distribución de sentimientos.
         """
-        self.data["Sentiment"].value_counts().plot(kind="bar", figsize=(8, 5), color=["green", "red", "blue"])
+        import matplotlib.pyplot as plt
+
+        self._sentiment_counts().plot(kind="bar", figsize=(8, 5), color=["green", "red", "blue"])
         plt.title("Distribución de sentimientos", fontsize=15)
         plt.xlabel("Sentimiento")
         plt.ylabel("Cantidad")
         plt.grid(axis="y")
         plt.show()
 
+    @metrics.track()
     def visualize_top_books_by_sentiment(self):
         """
         Genera visualizaciones de los libros con la mayor cantidad de reseñas por tipo de sentimiento.
@@ -144,7 +449,9 @@ class SentimentAnalysis:
             title (str): Título de la visualización.
             color (str): Color del gráfico.
         """
-        sentiment_data = self.data[self.data["Sentiment"] == sentiment]["Title"].value_counts().head(20)
+        import matplotlib.pyplot as plt
+
+        sentiment_data = self._top_books_for_sentiment(sentiment)
         sentiment_data.plot(kind="bar", figsize=(8, 6), color=color)
         plt.title(title, fontsize=14)
         plt.xlabel("Titulo del libro")
@@ -152,6 +459,7 @@ class SentimentAnalysis:
         plt.xticks(rotation=90)
         plt.show()
 
+    @metrics.track()
     def visualize_top_authors_by_sentiment_score(self, top_n=20):
         """
         Muestra los 20 autores con las calificaciones promedio más altas y más bajas.
@@ -159,22 +467,13 @@ class SentimentAnalysis:
         Args:
             top_n (int): Número de autores a mostrar.
         """
-        print("Generando visualización: Autores con calificaciones promedio más altas y bajas...")
+        import matplotlib.pyplot as plt
 
-        # Explota autores para desagregarlos
-        authors_split = self.data["authors"].str.split(", ")
-        exploded_data = self.data.assign(authors=authors_split).explode("authors")
+        print("Generando visualización: Autores con calificaciones promedio más altas y bajas...")
 
-        # Calcula calificación promedio por autor
-        author_sentiment = (
-            exploded_data.groupby("authors")["compound"]
-            .mean()
-            .sort_values(ascending=False)
-            .reset_index()
-        )
+        top_authors, bottom_authors = self._author_sentiment(top_n)
 
         # Autores con calificaciones más altas
-        top_authors = author_sentiment.head(top_n)
         plt.figure(figsize=(10, 6))
         plt.barh(top_authors["authors"], top_authors["compound"], color="green")
         plt.title(f"Top {top_n} Autores con Calificaciones Promedio Más Altas")
@@ -184,7 +483,6 @@ class SentimentAnalysis:
         plt.show()
 
         # Autores con calificaciones más bajas
-        bottom_authors = author_sentiment.tail(top_n)
         plt.figure(figsize=(10, 6))
         plt.barh(bottom_authors["authors"], bottom_authors["compound"], color="red")
         plt.title(f"Top {top_n} Autores con Calificaciones Promedio Más Bajas")
@@ -193,6 +491,7 @@ class SentimentAnalysis:
         plt.gca().invert_yaxis()
         plt.show()
 
+    @metrics.track()
     def visualize_top_authors_by_review_sentiment(self, sentiment: str, top_n=20):
         """
         Muestra los 20 autores con la mayor cantidad de reseñas positivas o negativas.
@@ -201,19 +500,12 @@ class SentimentAnalysis:
             sentiment (str): Tipo de sentimiento ('positivo' o 'negativo').
             top_n (int): Número de autores a mostrar.
         """
-        print(f"Generando visualización: Top {top_n} autores con más reseñas {sentiment}...")
+        import matplotlib.pyplot as plt
 
-        # Filtrar los datos según el sentimiento
-        filtered_data = self.data[self.data["Sentiment"] == sentiment]
+        print(f"Generando visualización: Top {top_n} autores con más reseñas {sentiment}...")
 
-        # Contar la cantidad de reseñas por autor
-        author_counts = (
-            filtered_data["authors"]
-            .str.split(", ")
-            .explode()
-            .value_counts()
-            .head(top_n)
-        )
+        # Contar la cantidad de reseñas por autor con el sentimiento indicado
+        author_counts = self._top_items_by_review_sentiment("authors", sentiment, top_n)
 
         # Verificar si hay datos para graficar
         if author_counts.empty:
@@ -230,35 +522,27 @@ class SentimentAnalysis:
         plt.show()
 
 
-    def visualize_top_categories_by_review_sentiment(data: pd.DataFrame, sentiment: str, top_n=20):
+    @metrics.track()
+    def visualize_top_categories_by_review_sentiment(self, sentiment: str, top_n=20):
         """
         Muestra las categorías con la mayor cantidad de reseñas positivas o negativas.
-    
+
         Args:
-            data (pd.DataFrame): DataFrame con los datos procesados.
             sentiment (str): Tipo de sentimiento ('positivo' o 'negativo').
             top_n (int): Número de categorías a mostrar.
         """
+        import matplotlib.pyplot as plt
+
         print(f"Generando visualización: Top {top_n} categorías con más reseñas {sentiment}...")
-    
-        # Filtrar los datos por el tipo de sentimiento
-        filtered_data = data[data["Sentiment"] == sentiment]
-    
-        # Explotar las categorías y contar reseñas
-        category_counts = (
-            filtered_data["categories"]
-            .str.split(", ")
-            .explode()
-            .value_counts()
-            .head(top_n)
-        )
-    
+
+        # Contar reseñas por categoría con el sentimiento indicado
+        category_counts = self._top_items_by_review_sentiment("categories", sentiment, top_n)
+
         if category_counts.empty:
             print("No se encontraron categorías para el tipo de sentimiento especificado.")
             return
-    
+
         # Generar la visualización
-        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 6))
         category_counts.sort_values().plot(kind="barh", color="blue" if sentiment == "positivo" else "red")
         plt.title(f"Top {top_n} Categorías con Más Reseñas {sentiment.capitalize()}")
@@ -268,41 +552,226 @@ class SentimentAnalysis:
         plt.show()
 
 
-    def average_sentiment_by_book(self) -> tuple:
+    @metrics.track()
+    def chart_specs(self, top_n: int = 20) -> list:
+        """
+        Construye las especificaciones de los gráficos de sentimiento para el modo sin interfaz gráfica.
+        Cada gráfico lleva solo los datos ya agregados: conteos por sentimiento, histogramas de la
+        puntuación compuesta y tablas top-N.
+
+        Args:
+            top_n (int): Número de libros, autores y categorías por gráfico.
+
+        Returns:
+            list: Especificaciones para ChartRenderer, en el mismo orden que las visualizaciones interactivas.
+        """
+        print("Preparando los datos agregados de los gráficos de sentimiento...")
+        colors = {"positivo": "green", "negativo": "red", "neutral": "blue"}
+        sentiment_counts = self._sentiment_counts()
+        specs = [
+            {
+                "name": "sentimiento_distribucion_pastel",
+                "kind": "pie",
+                "title": "Sentiment Distribution",
+                "figsize": (6, 6),
+                "labels": [str(label).capitalize() for label in sentiment_counts.index],
+                "values": sentiment_counts.tolist(),
+                "colors": [colors.get(label, "gray") for label in sentiment_counts.index],
+            },
+            {
+                "name": "sentimiento_histograma",
+                "kind": "hist",
+                "title": "Distribución de sentimientos",
+                "xlabel": "Puntuación compuesta",
+                "ylabel": "Cantidad",
+                "figsize": (8, 6),
+                "series": [
+                    {"label": label, "counts": counts.tolist(), "edges": edges.tolist(), "color": color, "alpha": 0.5}
+                    for label, counts, edges, color in self._compound_histograms()
+                ],
+            },
+            {
+                "name": "sentimiento_distribucion_barras",
+                "kind": "bar",
+                "title": "Distribución de sentimientos",
+                "xlabel": "Sentimiento",
+                "ylabel": "Cantidad",
+                "figsize": (8, 5),
+                "labels": [str(label) for label in sentiment_counts.index],
+                "values": sentiment_counts.tolist(),
+                "color": [colors.get(label, "gray") for label in sentiment_counts.index],
+                "grid": "y",
+            },
+        ]
+
+        for sentiment, label in [("positivo", "positivas"), ("neutral", "neutrales"), ("negativo", "negativas")]:
+            books = self._top_books_for_sentiment(sentiment, top_n)
+            specs.append({
+                "name": f"sentimiento_libros_{sentiment}",
+                "kind": "bar",
+                "title": f"Top {top_n} libros con más reseñas {label}",
+                "xlabel": "Titulo del libro",
+                "ylabel": "Cantidad de reseñas",
+                "figsize": (8, 6),
+                "labels": [str(title) for title in books.index],
+                "values": books.tolist(),
+                "color": colors[sentiment],
+                "rotation": 90,
+            })
+
+        top_authors, bottom_authors = self._author_sentiment(top_n)
+        for name, authors, title, color in [
+            ("sentimiento_autores_mas_altos", top_authors, "Más Altas", "green"),
+            ("sentimiento_autores_mas_bajos", bottom_authors, "Más Bajas", "red"),
+        ]:
+            specs.append({
+                "name": name,
+                "kind": "barh",
+                "title": f"Top {top_n} Autores con Calificaciones Promedio {title}",
+                "xlabel": "Calificación Promedio (Compound)",
+                "ylabel": "Autor",
+                "labels": authors["authors"].astype(str).tolist(),
+                "values": authors["compound"].tolist(),
+                "color": color,
+            })
+
+        for column, name, label, ylabel in [
+            ("authors", "autores", "Autores", "Autor"),
+            ("categories", "categorias", "Categorías", "Categoría"),
+        ]:
+            for sentiment in ["positivo", "negativo"]:
+                counts = self._top_items_by_review_sentiment(column, sentiment, top_n)
+                specs.append({
+                    "name": f"sentimiento_{name}_resenas_{sentiment}",
+                    "kind": "barh",
+                    "title": f"Top {top_n} {label} con Más Reseñas {sentiment.capitalize()}",
+                    "xlabel": "Cantidad de Reseñas",
+                    "ylabel": ylabel,
+                    "labels": [str(item) for item in counts.index],
+                    "values": counts.tolist(),
+                    "color": "blue" if sentiment == "positivo" else "red",
+                })
+        return specs
+
+    def _sentiment_counts(self) -> pd.Series:
+        """
+        Devuelve el número de reseñas por tipo de sentimiento.
+        """
+        counts = self.data["Sentiment"].value_counts()
+        if isinstance(counts.index, pd.CategoricalIndex):
+            # Formato compacto: sin los tipos de sentimiento que no aparecen, como con la columna de texto
+            counts = counts[counts > 0]
+            counts.index = counts.index.astype("str")
+        return counts
+
+    def _compound_histograms(self, bins: int = 20) -> list:
+        """
+        Calcula los histogramas de la puntuación compuesta de las reseñas positivas, negativas y neutras
+        con una sola lectura de la columna, sin filtrar el DataFrame.
+
+        Args:
+            bins (int): Número de intervalos de cada histograma.
+
+        Returns:
+            list: Tuplas (etiqueta, conteos, bordes de los intervalos, color).
+        """
+        compound = self.data["compound"].to_numpy(dtype=np.float64, na_value=np.nan)
+        groups = [
+            ("Positivo", compound > 0, "green"),
+            ("Negativo", compound < 0, "red"),
+            ("Neutral", compound == 0, "orange"),
+        ]
+        histograms = []
+        for label, mask, color in groups:
+            counts, edges = np.histogram(compound[mask], bins=bins)
+            histograms.append((label, counts, edges, color))
+        return histograms
+
+    def _top_books_for_sentiment(self, sentiment: str, top_n: int = 20) -> pd.Series:
+        """
+        Devuelve los títulos con más reseñas de un tipo de sentimiento.
+        """
+        # El índice de títulos cuenta sobre códigos y desempata por orden de aparición, como value_counts
+        sentiment_mask = (self.data["Sentiment"] == sentiment).to_numpy()
+        return self.indexes.get("Title", separator=None).value_counts(sentiment_mask, top_n=top_n)
+
+    def _author_sentiment(self, top_n: int) -> tuple:
+        """
+        Devuelve los `top_n` autores con la puntuación compuesta promedio más alta y los `top_n` con
+        la más baja, ambos de mayor a menor (columnas 'authors' y 'compound').
+        """
+        # Calcula calificación promedio por autor a partir del índice de autores
+        author_sentiment = self.indexes.get("authors").mean(self.data["compound"])
+        return (
+            top_k(author_sentiment, top_n).reset_index(),
+            bottom_k(author_sentiment, top_n).reset_index(),
+        )
+
+    def _top_items_by_review_sentiment(self, column: str, sentiment: str, top_n: int) -> pd.Series:
+        """
+        Devuelve los autores o categorías con más reseñas de un tipo de sentimiento.
+        """
+        sentiment_mask = (self.data["Sentiment"] == sentiment).to_numpy()
+        return self.indexes.get(column).value_counts(sentiment_mask, top_n=top_n)
+
+    @metrics.track()
+    def query_index(self):
+        """
+        Devuelve el índice de consultas de sentimiento por libro y por categoría, construyéndolo la
+        primera vez que se solicita.
+
+        Returns:
+            SentimentQueryIndex: Índice de consultas sobre los datos con sentimiento.
+        """
+        if self._query_index is None:
+            # Importación diferida: sentiment_query depende de este módulo
+            from src.sentiment_query import SentimentQueryIndex
+            self._query_index = SentimentQueryIndex.from_data(self.data, indexes=self.indexes)
+        return self._query_index
+
+    @metrics.track()
+    def average_sentiment_by_book(self, title: Optional[str] = None) -> tuple:
         """
         Calcula el sentimiento promedio para un libro dado.
 
+        Args:
+            title (str, opcional): Título del libro. Si no se indica, se solicita por consola.
+
         Returns:
             tuple: (Promedio de puntuación compuesta, Sentimiento).
         """
-        title = input("Ingrese el título del libro: ")
-        filtered_data = self.data[self.data["Title"] == title]
+        if title is None:
+            title = input("Ingrese el título del libro: ")
+        matches = self.query_index().book_sentiment(title)
 
-        if filtered_data.empty:
+        if not matches or matches[0]["average_compound"] is None:
             print(f"El libro '{title}' no fue encontrado.")
             return None
 
-        avg_compound = filtered_data["compound"].mean()
-        sentiment = self._classify_sentiment(avg_compound)
+        avg_compound, sentiment = matches[0]["average_compound"], matches[0]["sentiment"]
         print(f"Sentimiento promedio del libro '{title}': {sentiment} ({avg_compound:.2f})")
         return avg_compound, sentiment
 
-    def average_sentiment_by_category(self) -> tuple:
+    @metrics.track()
+    def average_sentiment_by_category(self, category: Optional[str] = None) -> tuple:
         """
-        Calcula el sentimiento promedio para una categoría dada.
+        Calcula el sentimiento promedio para una categoría dada. Se consideran todas las reseñas de
+        libros que incluyen la categoría, también cuando el libro tiene varias.
+
+        Args:
+            category (str, opcional): Categoría. Si no se indica, se solicita por consola.
 
         Returns:
             tuple: (Promedio de puntuación compuesta, Sentimiento).
         """
-        category = input("Ingrese la categoría: ")
-        filtered_data = self.data.explode("categories")
-        filtered_data = filtered_data[filtered_data["categories"] == category]
+        if category is None:
+            category = input("Ingrese la categoría: ")
+        matches = self.query_index().category_sentiment(category)
 
-        if filtered_data.empty:
+        if not matches or matches[0]["average_compound"] is None:
             print(f"La categoría '{category}' no fue encontrada.")
             return None
 
-        avg_compound = filtered_data["compound"].mean()
-        sentiment = self._classify_sentiment(avg_compound)
+        avg_compound, sentiment = matches[0]["average_compound"], matches[0]["sentiment"]
         print(f"Sentimiento promedio de la categoría '{category}': {sentiment} ({avg_compound:.2f})")
         return avg_compound, sentiment
@@ -0,0 +1,157 @@
+import os
+import time
+import sqlite3
+import hashlib
+from typing import Dict, Iterable, Optional
+from src import config
+
+
+class SentimentScoreCache:
+    """
+    Clase para guardar las puntuaciones de sentimiento en una base SQLite local, indexadas por
+    un hash del texto normalizado de la reseña, de forma que persistan entre ejecuciones.
+    """
+
+    SCORE_KEYS = ("neg", "neu", "pos", "compound")
+    DEFAULT_MAX_ENTRIES = 5_000_000
+
+    def __init__(self, cache_file: Optional[str] = None, max_entries: Optional[int] = None, engine: Optional[str] = None):
+        """
+        Inicializa la caché y carga la configuración desde el archivo .env.
+
+        Args:
+            cache_file (str, opcional): Archivo SQLite de la caché. Por defecto se usa
+                'sentiment_scores.sqlite' dentro de CACHE_PATH.
+            max_entries (int, opcional): Número máximo de textos guardados. Por defecto se usa
+                SENTIMENT_CACHE_MAX_ENTRIES del archivo .env o el valor por defecto.
+            engine (str, opcional): Motor de puntuación cuyas puntuaciones se guardan. Cada motor tiene su
+                propio archivo por defecto. Si no se indica, se usa SENTIMENT_ENGINE del archivo .env.
+        """
+        config.load()
+        self.engine = engine or os.getenv("SENTIMENT_ENGINE", "vader")
+        if not cache_file:
+            cache_path = os.getenv("CACHE_PATH")
+            if not cache_path:
+                raise ValueError("La ruta de la caché (CACHE_PATH) no está definida en el archivo .env.")
+            os.makedirs(cache_path, exist_ok=True)
+            file_name = "sentiment_scores.sqlite" if self.engine == "vader" else f"sentiment_scores_{self.engine}.sqlite"
+            cache_file = os.path.join(cache_path, file_name)
+        self.cache_file = cache_file
+        self.max_entries = max_entries or int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", self.DEFAULT_MAX_ENTRIES))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.connection = sqlite3.connect(self.cache_file)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scores (
+                key INTEGER PRIMARY KEY,
+                neg REAL, neu REAL, pos REAL, compound REAL,
+                last_used INTEGER
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        self.connection.commit()
+
+    @staticmethod
+    def text_key(text: str) -> int:
+        """
+        Calcula la clave de un texto: hash de 64 bits del texto con los espacios normalizados.
+
+        VADER separa las palabras por espacios en blanco, por lo que dos textos que solo
+        difieren en espacios reciben la misma puntuación y comparten clave.
+
+        Args:
+            text (str): Texto de la reseña.
+
+        Returns:
+            int: Clave entera con signo de 64 bits.
+        """
+        normalized = " ".join(text.split()).encode("utf-8")
+        digest = hashlib.blake2b(normalized, digest_size=8).digest()
+        return int.from_bytes(digest, "little", signed=True)
+
+    def get_many(self, keys: Iterable[int]) -> Dict[int, dict]:
+        """
+        Recupera las puntuaciones guardadas para un conjunto de claves y actualiza los contadores.
+
+        Args:
+            keys (Iterable[int]): Claves de los textos.
+
+        Returns:
+            Dict[int, dict]: Puntuaciones encontradas, indexadas por clave.
+        """
+        keys = list(keys)
+        cursor = self.connection.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (key INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM lookup")
+        cursor.executemany("INSERT OR IGNORE INTO lookup (key) VALUES (?)", ((key,) for key in keys))
+        rows = cursor.execute(
+            "SELECT s.key, s.neg, s.neu, s.pos, s.compound FROM scores s JOIN lookup l ON s.key = l.key"
+        ).fetchall()
+        cursor.execute(
+            "UPDATE scores SET last_used = ? WHERE key IN (SELECT key FROM lookup)",
+            (time.time_ns(),)
+        )
+        self.connection.commit()
+
+        found = {row[0]: dict(zip(self.SCORE_KEYS, row[1:])) for row in rows}
+        # Se cuenta cada clave pedida: textos que solo difieren en espacios comparten clave
+        hits = sum(key in found for key in keys)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, scores: Dict[int, dict]):
+        """
+        Guarda nuevas puntuaciones y aplica el límite de tamaño de la caché.
+
+        Args:
+            scores (Dict[int, dict]): Puntuaciones indexadas por clave.
+        """
+        now = time.time_ns()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO scores (key, neg, neu, pos, compound, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            ((key, *(score[name] for name in self.SCORE_KEYS), now) for key, score in scores.items())
+        )
+        self.connection.commit()
+        self._evict()
+
+    def _evict(self):
+        """
+        Elimina las entradas usadas hace más tiempo cuando la caché supera su tamaño máximo.
+        """
+        excess = self.size() - self.max_entries
+        if excess <= 0:
+            return
+        self.connection.execute(
+            "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self.connection.commit()
+        self.evictions += excess
+
+    def size(self) -> int:
+        """
+        Devuelve el número de textos guardados en la caché.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            dict: Diccionario con las claves 'hits', 'misses', 'evictions' y 'size'.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": self.size()}
+
+    def close(self):
+        """
+        Cierra la conexión con la base de datos.
+        """
+        self.connection.close()
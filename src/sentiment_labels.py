@@ -0,0 +1,19 @@
+# Sin dependencias, para que las consultas de sentimiento no carguen pandas ni NumPy
+SENTIMENT_THRESHOLD = 0.05
+
+
+def classify_sentiment(compound: float) -> str:
+    """
+    Clasifica el sentimiento basado en la puntuación compuesta.
+
+    Args:
+        compound (float): Puntuación compuesta.
+
+    Returns:
+        str: Clasificación del sentimiento ('positivo', 'neutral', 'negativo').
+    """
+    if compound > SENTIMENT_THRESHOLD:
+        return "positivo"
+    elif compound < -SENTIMENT_THRESHOLD:
+        return "negativo"
+    return "neutral"
@@ -0,0 +1,376 @@
+import os
+import sys
+import json
+import bisect
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from typing import List, Optional, Union
+from src.sentiment_labels import classify_sentiment
+from src import config
+
+# Este módulo no importa pandas, NumPy ni PyArrow: desde el estado incremental, el índice se construye con
+# los totales guardados en JSON. Solo `from_data` y los estados antiguos cargan el resto del proyecto.
+
+
+class SentimentQueryIndex:
+    """
+    Clase para consultar el sentimiento promedio por libro y por categoría sin recorrer las reseñas.
+
+    Al construirse guarda, por cada título y cada categoría, el número de puntuaciones y su suma, y
+    prepara dos índices sobre los nombres normalizados (sin distinguir mayúsculas): un diccionario
+    para las búsquedas exactas y una lista ordenada para las búsquedas por prefijo. Los resultados
+    de las consultas se guardan en una caché LRU y cada llamada recibe una copia.
+    """
+
+    MATCH_MODES = ("exact", "ignore_case", "prefix")
+    # Totales por título y por categoría de cada generación del estado incremental
+    TOTALS_FILE = "query_totals.{generation}.json"
+    DEFAULT_CACHE_SIZE = 10_000
+    DEFAULT_LIMIT = 10
+
+    def __init__(self, books: Union["pd.DataFrame", list], categories: Union["pd.DataFrame", list],
+                 cache_size: Optional[int] = None):
+        """
+        Inicializa el índice a partir de los totales de sentimiento ya agregados.
+
+        Args:
+            books (pd.DataFrame o list): Totales por título: DataFrame indexado por título con las columnas
+                'n_compound' y 'sum_compound', o lista de filas [título, n_compound, sum_compound].
+            categories (pd.DataFrame o list): Totales por categoría, en el mismo formato.
+            cache_size (int, opcional): Número máximo de consultas guardadas en la caché. Por defecto
+                se usa QUERY_CACHE_SIZE del archivo .env o el valor por defecto.
+        """
+        config.load()
+        cache_size = cache_size or int(os.getenv("QUERY_CACHE_SIZE", self.DEFAULT_CACHE_SIZE))
+        self._tables = {"book": self._build_table(books), "category": self._build_table(categories)}
+        self._cached_lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @classmethod
+    def from_data(cls, data: "pd.DataFrame", indexes: Optional["IncidenceIndexes"] = None, **kwargs) -> "SentimentQueryIndex":
+        """
+        Construye el índice a partir del DataFrame procesado con la columna 'compound'.
+
+        Args:
+            data (pd.DataFrame): DataFrame procesado con sentimiento.
+            indexes (IncidenceIndexes, opcional): Índices de incidencia ya construidos sobre `data`.
+
+        Returns:
+            SentimentQueryIndex: Índice de consultas.
+        """
+        from src.incidence_index import IncidenceIndexes
+
+        print("Construyendo índice de consultas de sentimiento...")
+        indexes = indexes or IncidenceIndexes(data)
+        tables = []
+        for index in [indexes.get("Title", separator=None), indexes.categories()]:
+            totals = index.totals(data["compound"])
+            tables.append(totals.rename(columns={"n_values": "n_compound", "sum": "sum_compound"}))
+        return cls(*tables, **kwargs)
+
+    @classmethod
+    def from_state(cls, state_path: Union[str, "IncrementalUpdater", None] = None, **kwargs) -> "SentimentQueryIndex":
+        """
+        Construye el índice a partir del estado de la ingesta incremental, sin cargar las reseñas.
+
+        Args:
+            state_path (str o IncrementalUpdater, opcional): Carpeta del estado incremental, o su actualizador.
+                Por defecto se usa STATE_PATH del archivo .env.
+
+        Returns:
+            SentimentQueryIndex: Índice de consultas.
+
+        Raises:
+            FileNotFoundError: Si no existe un estado incremental.
+        """
+        config.load()
+        state_path = getattr(state_path, "state_path", state_path) or os.getenv("STATE_PATH") or ""
+        manifest_path = os.path.join(state_path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(
+                "No existe un estado incremental. Ejecute primero el procesamiento completo (main.py)."
+            )
+        with open(manifest_path, encoding="utf-8") as f:
+            generation = json.load(f)["generation"]
+
+        print("Construyendo índice de consultas de sentimiento desde el estado incremental...")
+        totals_path = os.path.join(state_path, cls.TOTALS_FILE.format(generation=generation))
+        if os.path.exists(totals_path):
+            with open(totals_path, encoding="utf-8") as f:
+                totals = json.load(f)
+            return cls(totals["books"], totals["categories"], **kwargs)
+
+        # Estado guardado sin los totales de consulta: se leen sus tablas
+        from src.incremental import IncrementalUpdater
+
+        return cls(*IncrementalUpdater(state_path).query_totals(), **kwargs)
+
+    @classmethod
+    def write_totals(cls, state_path: str, generation: int, books: "pd.DataFrame", categories: "pd.DataFrame"):
+        """
+        Guarda en JSON los totales de una generación del estado incremental, para construir el índice
+        sin pandas.
+
+        Args:
+            state_path (str): Carpeta del estado incremental.
+            generation (int): Generación del estado.
+            books (pd.DataFrame): Totales por título, con las columnas 'n_compound' y 'sum_compound'.
+            categories (pd.DataFrame): Totales por categoría con las mismas columnas.
+        """
+        totals = {name: cls._rows(table) for name, table in (("books", books), ("categories", categories))}
+        with open(os.path.join(state_path, cls.TOTALS_FILE.format(generation=generation)), "w", encoding="utf-8") as f:
+            json.dump(totals, f, ensure_ascii=False)
+
+    @staticmethod
+    def _rows(totals: Union["pd.DataFrame", list]) -> list:
+        """
+        Convierte una tabla de totales en filas [nombre, n_compound, sum_compound].
+        """
+        if isinstance(totals, list):
+            return totals
+        return [
+            [str(name), int(count), float(total)]
+            for name, count, total in zip(totals.index, totals["n_compound"].tolist(), totals["sum_compound"].tolist())
+        ]
+
+    @classmethod
+    def _build_table(cls, totals: Union["pd.DataFrame", list]) -> dict:
+        """
+        Prepara los arreglos de una tabla de consulta y sus índices exacto y por prefijo.
+        """
+        rows = cls._rows(totals)
+        names = [str(name) for name, _, _ in rows]
+        counts = [int(count) for _, count, _ in rows]
+        sums = [float(total) for _, _, total in rows]
+
+        exact, folded = {}, {}
+        for position, name in enumerate(names):
+            exact[name] = position
+            folded.setdefault(cls._normalize(name), []).append(position)
+        prefix_keys = sorted(folded)
+        return {
+            "names": names,
+            "counts": counts,
+            "sums": sums,
+            "exact": exact,
+            "folded": folded,
+            "prefix_keys": prefix_keys,
+        }
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        """
+        Normaliza un nombre para las búsquedas sin distinción de mayúsculas ni espacios repetidos.
+        """
+        return " ".join(str(name).split()).casefold()
+
+    def book_sentiment(self, title: str, match: str = "exact", limit: Optional[int] = None) -> List[dict]:
+        """
+        Consulta el sentimiento promedio de un libro.
+
+        Args:
+            title (str): Título (o prefijo del título) a buscar.
+            match (str): 'exact', 'ignore_case' o 'prefix'.
+            limit (int, opcional): Número máximo de coincidencias en las búsquedas por prefijo.
+
+        Returns:
+            List[dict]: Coincidencias con las claves 'name', 'reviews', 'average_compound' y 'sentiment'.
+
+        Raises:
+            ValueError: Si el título no es un texto, el modo no existe o el límite no es un entero positivo.
+        """
+        return self._query("book", title, match, limit)
+
+    def category_sentiment(self, category: str, match: str = "exact", limit: Optional[int] = None) -> List[dict]:
+        """
+        Consulta el sentimiento promedio de una categoría.
+
+        Args:
+            category (str): Categoría (o prefijo de la categoría) a buscar.
+            match (str): 'exact', 'ignore_case' o 'prefix'.
+            limit (int, opcional): Número máximo de coincidencias en las búsquedas por prefijo.
+
+        Returns:
+            List[dict]: Coincidencias con las claves 'name', 'reviews', 'average_compound' y 'sentiment'.
+
+        Raises:
+            ValueError: Si la categoría no es un texto, el modo no existe o el límite no es un entero positivo.
+        """
+        return self._query("category", category, match, limit)
+
+    def batch(self, books: Optional[List[str]] = None, categories: Optional[List[str]] = None,
+              match: str = "exact", limit: Optional[int] = None) -> dict:
+        """
+        Resuelve un lote de consultas de libros y categorías.
+
+        Args:
+            books (List[str], opcional): Títulos a buscar.
+            categories (List[str], opcional): Categorías a buscar.
+            match (str): 'exact', 'ignore_case' o 'prefix'.
+            limit (int, opcional): Número máximo de coincidencias por consulta en las búsquedas por prefijo.
+
+        Returns:
+            dict: Diccionario con las claves 'books' y 'categories'; cada una asocia la consulta a sus coincidencias.
+
+        Raises:
+            ValueError: Si `books` o `categories` no son listas, o alguna consulta no es válida.
+        """
+        for name, queries in (("books", books), ("categories", categories)):
+            if queries is not None and not isinstance(queries, list):
+                raise ValueError(f"'{name}' debe ser una lista de textos.")
+        return {
+            "books": {title: self.book_sentiment(title, match, limit) for title in books or []},
+            "categories": {category: self.category_sentiment(category, match, limit) for category in categories or []},
+        }
+
+    def cache_stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché de consultas.
+
+        Returns:
+            dict: Diccionario con las claves 'hits', 'misses' y 'size'.
+        """
+        info = self._cached_lookup.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+    def _query(self, kind: str, query: str, match: str, limit: Optional[int]) -> List[dict]:
+        """
+        Valida una consulta y la resuelve con la caché. Los parámetros se comprueban antes de llegar a la
+        caché (que necesita valores hashables) y se devuelven copias de los resultados guardados.
+        """
+        if not isinstance(query, str):
+            raise ValueError("La consulta debe ser un texto.")
+        if not isinstance(match, str) or match not in self.MATCH_MODES:
+            raise ValueError(f"Modo de búsqueda no soportado: {match}. Use uno de {self.MATCH_MODES}.")
+        if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0):
+            raise ValueError(f"El límite debe ser un entero positivo: {limit}.")
+        return [dict(result) for result in self._cached_lookup(kind, query, match, limit or self.DEFAULT_LIMIT)]
+
+    def _lookup(self, kind: str, query: str, match: str, limit: int) -> tuple:
+        """
+        Resuelve una consulta sobre los índices de títulos o de categorías.
+        """
+        table = self._tables[kind]
+
+        if match == "exact":
+            position = table["exact"].get(query)
+            positions = [] if position is None else [position]
+        elif match == "ignore_case":
+            positions = table["folded"].get(self._normalize(query), [])
+        else:
+            # Las claves que empiezan por el prefijo forman un tramo contiguo de la lista ordenada
+            prefix = self._normalize(query)
+            keys = table["prefix_keys"]
+            positions = []
+            start = bisect.bisect_left(keys, prefix)
+            for key in keys[start:]:
+                if not key.startswith(prefix) or len(positions) >= limit:
+                    break
+                positions.extend(table["folded"][key])
+            positions = positions[:limit]
+
+        return tuple(self._result(table, position) for position in positions)
+
+    @staticmethod
+    def _result(table: dict, position: int) -> dict:
+        """
+        Construye el resultado de una coincidencia.
+        """
+        count = table["counts"][position]
+        average = table["sums"][position] / count if count else None
+        return {
+            "name": table["names"][position],
+            "reviews": count,
+            "average_compound": average,
+            "sentiment": classify_sentiment(average) if average is not None else None,
+        }
+
+    def serve(self, host: Optional[str] = None, port: Optional[int] = None):
+        """
+        Inicia un servidor HTTP local que responde las consultas en JSON.
+
+        Rutas:
+            - GET /book?title=...&match=...&limit=...
+            - GET /category?name=...&match=...&limit=...
+            - POST /batch con un cuerpo JSON {"books": [...], "categories": [...], "match": ..., "limit": ...}
+            - GET /stats: contadores de la caché de consultas.
+
+        Args:
+            host (str, opcional): Dirección del servidor. Por defecto se usa QUERY_HOST del archivo .env o 127.0.0.1.
+            port (int, opcional): Puerto del servidor. Por defecto se usa QUERY_PORT del archivo .env o 8000.
+        """
+        host = host or os.getenv("QUERY_HOST", "127.0.0.1")
+        port = port or int(os.getenv("QUERY_PORT", 8000))
+        server = ThreadingHTTPServer((host, port), self._handler_class())
+        print(f"Servidor de consultas de sentimiento en http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Servidor detenido.")
+        finally:
+            server.server_close()
+
+    def _handler_class(self):
+        """
+        Crea la clase manejadora de peticiones HTTP asociada a este índice.
+        """
+        query_index = self
+
+        class QueryHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._respond(self._get)
+
+            def do_POST(self):
+                self._respond(self._post)
+
+            def _get(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                match, limit = params.get("match", "exact"), int(params["limit"]) if "limit" in params else None
+                if url.path == "/book" and "title" in params:
+                    return 200, query_index.book_sentiment(params["title"], match, limit)
+                if url.path == "/category" and "name" in params:
+                    return 200, query_index.category_sentiment(params["name"], match, limit)
+                if url.path == "/stats":
+                    return 200, query_index.cache_stats()
+                return 404, {"error": "Ruta no encontrada."}
+
+            def _post(self):
+                if urlparse(self.path).path != "/batch":
+                    return 404, {"error": "Ruta no encontrada."}
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("El cuerpo de la petición debe ser un objeto JSON.")
+                return 200, query_index.batch(
+                    request.get("books"), request.get("categories"),
+                    request.get("match", "exact"), request.get("limit"),
+                )
+
+            def _respond(self, route):
+                try:
+                    status, payload = route()
+                except ValueError as e:  # Parámetros o JSON inválidos
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:  # Cualquier otro fallo también recibe una respuesta JSON
+                    status, payload = 500, {"error": f"Error interno: {e}"}
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Sin registro por petición, para no frenar las consultas
+
+        return QueryHandler
+
+
+if __name__ == "__main__":
+    try:
+        index = SentimentQueryIndex.from_state()
+    except FileNotFoundError as e:
+        print(e)
+        sys.exit(1)
+    index.serve()
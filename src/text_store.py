@@ -0,0 +1,249 @@
+import os
+import shutil
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from array import array
+from typing import Iterable, List, Optional
+from src.key_index import KeyIndex
+
+
+class TextStore:
+    """
+    Almacén compacto en disco para los textos de las reseñas.
+
+    Los textos distintos se guardan una sola vez, concatenados en UTF-8 en un archivo '.bin', junto
+    con un arreglo de desplazamientos ('.offsets.npy'). El DataFrame procesado solo guarda un
+    identificador entero por fila ('text_id') y los textos se leen bajo demanda, por lotes, desde
+    el archivo mapeado en memoria. Como los textos iguales comparten identificador, comparar
+    identificadores equivale a comparar textos (por ejemplo, al eliminar duplicados).
+    """
+
+    TEXT_COLUMN = "review/text"
+    ID_COLUMN = "text_id"
+    DEFAULT_BATCH_SIZE = 100_000
+
+    def __init__(self, path: str):
+        """
+        Abre un almacén ya terminado para lectura.
+
+        Args:
+            path (str): Ruta del almacén, sin extensión.
+        """
+        self.path = path
+        self._offsets = np.load(f"{path}.offsets.npy", mmap_mode="r")
+        size = int(self._offsets[-1])
+        self._data = np.memmap(f"{path}.bin", dtype=np.uint8, mode="r") if size else np.empty(0, dtype=np.uint8)
+        self._writer = None
+
+    @classmethod
+    def create(cls, path: str, temporary: bool = False) -> "TextStore":
+        """
+        Crea un almacén vacío para escritura. Al terminar de añadir textos se debe llamar a `finish`.
+
+        Args:
+            path (str): Ruta del almacén, sin extensión.
+            temporary (bool): Si es True, la carpeta del almacén se elimina cuando deja de usarse.
+
+        Returns:
+            TextStore: Almacén en modo escritura.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        store = cls.__new__(cls)
+        store.path = path
+        store._writer = open(f"{path}.bin.tmp", "w+b")
+        store._offsets = array("q", [0])  # 8 bytes por texto, sin objetos de Python
+        store._ids = KeyIndex()  # Hash del texto -> identificador
+        store._temporary = temporary
+        store._lock = threading.Lock()
+        return store
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """
+        Indica si existe un almacén terminado en la ruta indicada.
+        """
+        return os.path.exists(f"{path}.bin") and os.path.exists(f"{path}.offsets.npy")
+
+    @staticmethod
+    def remove(path: str):
+        """
+        Elimina los archivos de un almacén.
+        """
+        for suffix in (".bin", ".offsets.npy", ".bin.tmp"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def add(self, texts: Iterable) -> np.ndarray:
+        """
+        Añade textos al almacén y devuelve sus identificadores. Los textos ya guardados reutilizan
+        su identificador; los valores nulos reciben -1.
+
+        Args:
+            texts (Iterable): Textos a guardar.
+
+        Returns:
+            np.ndarray: Identificadores int64, uno por texto.
+        """
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+        uniques = np.asarray(uniques, dtype=object)
+        hashes = pd.util.hash_array(uniques) if len(uniques) else np.empty(0, dtype=np.uint64)
+
+        unique_ids = np.empty(len(uniques), dtype=np.int64)
+        with self._lock:  # Las particiones de la unión en disco añaden textos desde varios hilos
+            found, candidates = self._ids.find(hashes)
+            new_positions = []
+            for position, (text, key, is_found, candidate) in enumerate(
+                    zip(uniques, hashes.tolist(), found.tolist(), candidates.tolist())):
+                encoded = text.encode("utf-8")
+                text_id = self._match(encoded, key, candidate) if is_found else -1
+                if text_id < 0:
+                    text_id = self._write(encoded)
+                    new_positions.append(position)
+                unique_ids[position] = text_id
+            self._ids.add(hashes[new_positions], unique_ids[new_positions])
+
+        ids = np.full(len(codes), -1, dtype=np.int64)
+        present = codes >= 0
+        ids[present] = unique_ids[codes[present]]
+        return ids
+
+    def _match(self, encoded: bytes, key: int, candidate: int) -> int:
+        """
+        Devuelve el identificador del texto guardado con el mismo hash y los mismos bytes, o -1 si
+        ninguno coincide (una colisión de hash).
+        """
+        if self._read_bytes(candidate) == encoded:
+            return candidate
+        for text_id in self._ids.find_all(key).tolist():
+            if text_id != candidate and self._read_bytes(text_id) == encoded:
+                return text_id
+        return -1
+
+    def _write(self, encoded: bytes) -> int:
+        """
+        Guarda un texto nuevo al final del archivo y devuelve su identificador.
+        """
+        text_id = len(self._offsets) - 1
+        self._writer.write(encoded)
+        self._offsets.append(self._offsets[-1] + len(encoded))
+        return text_id
+
+    def _read_bytes(self, text_id: int) -> bytes:
+        """
+        Lee los bytes de un texto durante la escritura y vuelve al final del archivo.
+        """
+        start, end = self._offsets[text_id], self._offsets[text_id + 1]
+        self._writer.seek(start)
+        encoded = self._writer.read(end - start)
+        self._writer.seek(0, os.SEEK_END)
+        return encoded
+
+    def finish(self) -> "TextStore":
+        """
+        Termina la escritura y abre el almacén para lectura.
+
+        Returns:
+            TextStore: Almacén en modo lectura.
+        """
+        self._writer.close()
+        np.save(f"{self.path}.offsets.npy", np.frombuffer(self._offsets, dtype=np.int64))
+        os.replace(f"{self.path}.bin.tmp", f"{self.path}.bin")
+        print(f"Almacén de textos guardado: {len(self._offsets) - 1} textos distintos, "
+              f"{self._offsets[-1] / 2**20:,.1f} MB en {self.path}.bin")
+        store = TextStore(self.path)
+        if self._temporary:
+            weakref.finalize(store, shutil.rmtree, os.path.dirname(self.path), True)
+        return store
+
+    def get(self, ids: Iterable[int]) -> List[Optional[str]]:
+        """
+        Lee los textos de los identificadores indicados.
+
+        Args:
+            ids (Iterable[int]): Identificadores; -1 devuelve None.
+
+        Returns:
+            List[Optional[str]]: Textos, en el mismo orden que los identificadores.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        present = ids >= 0
+        starts = np.zeros(len(ids), dtype=np.int64)
+        ends = np.zeros(len(ids), dtype=np.int64)
+        starts[present] = self._offsets[ids[present]]
+        ends[present] = self._offsets[ids[present] + 1]
+
+        data = self._data
+        return [
+            data[start:end].tobytes().decode("utf-8") if is_present else None
+            for start, end, is_present in zip(starts.tolist(), ends.tolist(), present.tolist())
+        ]
+
+    def batches(self, ids: Iterable[int], batch_size: Optional[int] = None):
+        """
+        Recorre los textos de los identificadores indicados por lotes, para acotar la memoria.
+
+        Args:
+            ids (Iterable[int]): Identificadores.
+            batch_size (int, opcional): Textos por lote. Por defecto, DEFAULT_BATCH_SIZE.
+
+        Yields:
+            List[Optional[str]]: Textos de cada lote.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        for start in range(0, len(ids), batch_size):
+            yield self.get(ids[start:start + batch_size])
+
+    def replace_text(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Guarda los textos de `data` en el almacén y devuelve una copia con sus identificadores en lugar
+        de la columna de textos, en la misma posición.
+
+        Args:
+            data (pd.DataFrame): Filas con la columna 'review/text'.
+
+        Returns:
+            pd.DataFrame: Filas con la columna 'text_id'.
+        """
+        position = data.columns.get_loc(self.TEXT_COLUMN)
+        ids = self.add(data[self.TEXT_COLUMN])
+        data = data.drop(columns=[self.TEXT_COLUMN])
+        data.insert(position, self.ID_COLUMN, ids)
+        return data
+
+    def with_text(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve una copia de `data` con la columna de textos en lugar de sus identificadores, en la
+        misma posición. Pensado para lotes de filas.
+
+        Args:
+            data (pd.DataFrame): Filas con la columna 'text_id'.
+
+        Returns:
+            pd.DataFrame: Filas con la columna 'review/text'.
+        """
+        position = data.columns.get_loc(self.ID_COLUMN)
+        texts = pd.Series(self.get(data[self.ID_COLUMN].to_numpy()), index=data.index, dtype="str")
+        data = data.drop(columns=[self.ID_COLUMN])
+        data.insert(position, self.TEXT_COLUMN, texts)
+        return data
+
+    @classmethod
+    def text_present(cls, data: pd.DataFrame) -> pd.Series:
+        """
+        Indica qué filas tienen texto de reseña, tanto con la columna de textos como con sus identificadores.
+
+        Args:
+            data (pd.DataFrame): DataFrame procesado.
+
+        Returns:
+            pd.Series: Serie booleana alineada con `data`.
+        """
+        if cls.ID_COLUMN in data.columns:
+            return data[cls.ID_COLUMN] >= 0
+        return data[cls.TEXT_COLUMN].notna()
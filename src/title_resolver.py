@@ -0,0 +1,339 @@
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional, Union
+from src import metrics
+
+
+class TitleResolver:
+    """
+    Clase para recuperar las reseñas cuyo título no coincide exactamente con ninguno de 'books_data'.
+
+    La resolución se hace en dos pasos sobre los títulos distintos que no coinciden:
+        - 'normalized': unión por una clave normalizada del título (sin mayúsculas, acentos, apóstrofos,
+          signos de puntuación ni espacios repetidos).
+        - 'fuzzy': para los que siguen sin coincidir, coincidencia aproximada por trigramas de caracteres
+          de la clave (coeficiente de Dice). Un índice invertido de palabras y trigramas agrupa los libros
+          en bloques: cada título solo se compara con los libros que comparten alguna de sus palabras o
+          trigramas más raros y tienen una longitud compatible con el umbral, nunca con todos los libros.
+
+    Solo se acepta una coincidencia si hay un único mejor candidato; los títulos ambiguos (varios libros
+    con la misma clave o con la misma similitud) quedan sin coincidir. Las decisiones se guardan por
+    título, de modo que en la carga por bloques cada título distinto se resuelve una sola vez.
+    """
+
+    MODES = ("exact", "normalized", "fuzzy")
+    DEFAULT_THRESHOLD = 0.85
+    NGRAM_SIZE = 3
+    # Claves de bloque (palabras o trigramas) más raras de cada título con las que se buscan candidatos
+    BLOCK_KEYS = 3
+    # Títulos distintos resueltos por lote (acota la memoria de los pares candidatos)
+    BATCH_SIZE = 1000
+    APOSTROPHES = re.compile(r"['’`´]")
+    NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+    def __init__(self, book_titles: pd.Series, fuzzy: bool = True, threshold: Optional[float] = None):
+        """
+        Inicializa el resolutor con los títulos de 'books_data'.
+
+        Args:
+            book_titles (pd.Series): Títulos de 'books_data' (texto o categóricos).
+            fuzzy (bool): Si es False, solo se hace la unión por clave normalizada.
+            threshold (float, opcional): Similitud mínima (entre 0 y 1) de una coincidencia aproximada.
+                Por defecto, DEFAULT_THRESHOLD.
+        """
+        self.fuzzy = fuzzy
+        self.threshold = threshold if threshold is not None else self.DEFAULT_THRESHOLD
+        if not 0 < self.threshold <= 1:
+            raise ValueError("El umbral de similitud de títulos (TITLE_MATCH_THRESHOLD) debe estar entre 0 y 1.")
+        self.books = pd.Index(np.asarray(book_titles.dropna().unique(), dtype=object))
+        self.book_keys = self.normalize(pd.Series(self.books, dtype=object))
+
+        duplicated = self.book_keys.duplicated(keep=False).to_numpy()
+        keys = self.book_keys.to_numpy(dtype=object)
+        self._key_books = {key: position for position, key in enumerate(keys) if not duplicated[position] and key}
+        self._ambiguous_keys = set(keys[duplicated])
+        # Decisiones por título sin coincidencia exacta: (libro o None, método, confianza)
+        self._decisions = {}
+        self._rows = {}
+        self._index = None
+
+    @classmethod
+    def normalize_title(cls, title) -> str:
+        """
+        Calcula la clave normalizada de un título.
+
+        Args:
+            title (str): Título.
+
+        Returns:
+            str: Clave en minúsculas, sin acentos, apóstrofos ni signos, con palabras separadas por un
+            espacio ('' para los nulos).
+        """
+        if not isinstance(title, str):
+            return ""
+        decomposed = unicodedata.normalize("NFKD", title)
+        title = "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+        return cls.NON_ALPHANUMERIC.sub(" ", cls.APOSTROPHES.sub("", title)).strip()
+
+    @classmethod
+    def normalize(cls, titles: pd.Series) -> pd.Series:
+        """
+        Calcula la clave normalizada de cada título.
+
+        Args:
+            titles (pd.Series): Títulos.
+
+        Returns:
+            pd.Series: Claves normalizadas, con el mismo índice.
+        """
+        return pd.Series([cls.normalize_title(title) for title in titles.tolist()], index=titles.index, dtype=object)
+
+    def resolve_ratings(
+        self, books_rating: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+    ) -> Union[pd.DataFrame, Iterable[pd.DataFrame]]:
+        """
+        Sustituye los títulos de las reseñas por el título del libro con el que se resuelven.
+
+        Args:
+            books_rating (pd.DataFrame o Iterable[pd.DataFrame]): 'books_rating' completo o por bloques.
+
+        Returns:
+            pd.DataFrame o Iterable[pd.DataFrame]: Las mismas reseñas con los títulos resueltos; los
+            bloques se resuelven a medida que se leen.
+        """
+        if isinstance(books_rating, pd.DataFrame):
+            return books_rating.assign(Title=self.resolve(books_rating["Title"]))
+        return (chunk.assign(Title=self.resolve(chunk["Title"])) for chunk in books_rating)
+
+    def resolve(self, titles: pd.Series) -> pd.Series:
+        """
+        Resuelve una columna de títulos: los que coinciden exactamente o no se pueden resolver se conservan.
+
+        Args:
+            titles (pd.Series): Títulos de las reseñas.
+
+        Returns:
+            pd.Series: Títulos resueltos, con el mismo índice.
+        """
+        codes, uniques = pd.factorize(titles)
+        uniques = np.asarray(uniques, dtype=object)
+        unmatched = uniques[self.books.get_indexer(uniques) < 0]
+        pending = [title for title in unmatched if title not in self._decisions]
+        if pending:
+            self._decide(pending)
+
+        targets = np.full(len(uniques) + 1, None, dtype=object)  # La última posición es la de los nulos
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        positions = {title: position for position, title in enumerate(uniques)}
+        for title in unmatched:
+            book, method, _ = self._decisions[title]
+            if book is not None:
+                targets[positions[title]] = book
+                self._rows[title] = self._rows.get(title, 0) + int(counts[positions[title]])
+
+        row_targets = targets[codes]
+        changed = pd.notna(row_targets)
+        if not changed.any():
+            return titles
+        return titles.mask(changed, pd.Series(row_targets, index=titles.index, dtype=object))
+
+    def _decide(self, titles: list):
+        """
+        Resuelve títulos distintos sin coincidencia exacta, primero por clave normalizada y después,
+        si está activada, por coincidencia aproximada.
+        """
+        keys = [self.normalize_title(title) for title in titles]
+        fuzzy_titles, fuzzy_keys = [], []
+        for title, key in zip(titles, keys):
+            if key in self._key_books:
+                self._decisions[title] = (self.books[self._key_books[key]], "normalized", 1.0)
+            elif self.fuzzy and key and key not in self._ambiguous_keys:
+                fuzzy_titles.append(title)
+                fuzzy_keys.append(key)
+            else:
+                self._decisions[title] = (None, "ambiguous" if key in self._ambiguous_keys else "unmatched", 0.0)
+
+        for start in range(0, len(fuzzy_titles), self.BATCH_SIZE):
+            batch = fuzzy_keys[start:start + self.BATCH_SIZE]
+            for title, (book, confidence) in zip(fuzzy_titles[start:start + self.BATCH_SIZE], self._fuzzy_matches(batch)):
+                if book is None:
+                    self._decisions[title] = (None, "ambiguous" if confidence else "unmatched", confidence)
+                else:
+                    self._decisions[title] = (self.books[book], "fuzzy", confidence)
+
+    @classmethod
+    def _ngrams(cls, key: str) -> set:
+        """
+        Trigramas de caracteres de una clave, con un espacio al principio y al final.
+        """
+        padded = f" {key} "
+        return {padded[i:i + cls.NGRAM_SIZE] for i in range(max(len(padded) - cls.NGRAM_SIZE + 1, 1))}
+
+    @classmethod
+    def _block_keys(cls, key: str, grams: set) -> set:
+        """
+        Claves de bloque de una clave: sus trigramas y sus palabras. Las palabras se guardan con un espacio
+        a cada lado, de modo que nunca coinciden con un trigrama distinto.
+        """
+        return grams | {f" {word} " for word in key.split()}
+
+    def _size_bounds(self, sizes: np.ndarray) -> tuple:
+        """
+        Tamaños de libro (en trigramas) con los que una clave de `sizes` trigramas puede alcanzar el umbral t:
+        2 * comunes / (a + b) >= t con comunes <= min(a, b) implica b / a entre t / (2 - t) y (2 - t) / t.
+        """
+        ratio = self.threshold / (2 - self.threshold)
+        smallest = np.ceil(sizes * ratio - 1e-9).astype(np.int64)
+        largest = np.floor(sizes / ratio + 1e-9).astype(np.int64)
+        return smallest, largest
+
+    def _build_index(self):
+        """
+        Construye el índice invertido de claves de bloque de los libros (una sola vez). Cada lista de
+        libros de una clave está ordenada por tamaño, para recorrer solo los de tamaño compatible.
+        """
+        print(f"Construyendo índice de trigramas y palabras de {len(self.books)} títulos...")
+        vocabulary = {}
+        book_grams, book_blocks = [], []
+        for key in self.book_keys:
+            grams = self._ngrams(key) if key else set()
+            book_grams.append(np.array(sorted(vocabulary.setdefault(gram, len(vocabulary)) for gram in grams), dtype=np.int64))
+            book_blocks.append(np.array([vocabulary.setdefault(block, len(vocabulary)) for block in self._block_keys(key, grams)], dtype=np.int64))
+        sizes = np.array([len(grams) for grams in book_grams], dtype=np.int64)
+        blocks = np.concatenate(book_blocks) if book_blocks else np.empty(0, dtype=np.int64)
+        owners = np.repeat(np.arange(len(book_blocks), dtype=np.int64), [len(keys) for keys in book_blocks])
+
+        span = int(sizes.max(initial=0)) + 2
+        order = np.lexsort((sizes[owners], blocks))
+        self._index = {
+            "vocabulary": vocabulary,
+            "book_offsets": np.concatenate([[0], np.cumsum(sizes)]),
+            "book_grams": np.concatenate(book_grams) if book_grams else np.empty(0, dtype=np.int64),
+            "book_sizes": sizes,
+            "frequencies": np.bincount(blocks, minlength=len(vocabulary)),
+            "span": span,
+            "posting_keys": blocks[order] * span + sizes[owners][order],
+            "posting_books": owners[order],
+        }
+
+    @staticmethod
+    def _expand(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Concatena los rangos [start, start + length) sin recorrerlos en Python.
+        """
+        return np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+
+    def _fuzzy_matches(self, keys: list) -> list:
+        """
+        Busca el libro más parecido a cada clave comparándola solo con los candidatos de sus bloques: los
+        libros de tamaño compatible que comparten alguna de sus BLOCK_KEYS claves de bloque más raras. Con
+        una errata, las palabras intactas del título siguen formando bloques muy selectivos. La similitud
+        de los candidatos se calcula exacta.
+
+        Returns:
+            list: Tuplas (posición del libro o None, similitud). Sin libro y con similitud mayor que 0,
+            el mejor candidato era ambiguo.
+        """
+        if self._index is None:
+            self._build_index()
+        index = self._index
+        vocabulary, frequencies, span = index["vocabulary"], index["frequencies"], index["span"]
+        book_sizes, book_offsets = index["book_sizes"], index["book_offsets"]
+
+        query_sets = [self._ngrams(key) for key in keys]
+        query_sizes = np.array([len(grams) for grams in query_sets], dtype=np.int64)
+        min_size, max_size = self._size_bounds(query_sizes)
+        query_grams = [np.array([vocabulary[gram] for gram in grams if gram in vocabulary], dtype=np.int64) for grams in query_sets]
+        owners = np.repeat(np.arange(len(keys), dtype=np.int64), [len(grams) for grams in query_grams])
+        grams = np.concatenate(query_grams) if query_grams else np.empty(0, dtype=np.int64)
+
+        # Bloques: las claves más raras de cada título (por frecuencia y, a igual frecuencia, por identificador)
+        query_blocks = [
+            np.array([vocabulary[block] for block in self._block_keys(key, query_set) if block in vocabulary], dtype=np.int64)
+            for key, query_set in zip(keys, query_sets)
+        ]
+        block_owners = np.repeat(np.arange(len(keys), dtype=np.int64), [len(blocks) for blocks in query_blocks])
+        blocks = np.concatenate(query_blocks) if query_blocks else np.empty(0, dtype=np.int64)
+        order = np.lexsort((blocks, frequencies[blocks], block_owners))
+        block_owners, blocks = block_owners[order], blocks[order]
+        rarest = np.arange(len(blocks)) - np.searchsorted(block_owners, block_owners) < self.BLOCK_KEYS
+        block_owners, blocks = block_owners[rarest], blocks[rarest]
+
+        # Libros de tamaño compatible de cada bloque y pares (título, libro) distintos
+        posting_keys = index["posting_keys"]
+        starts = np.searchsorted(posting_keys, blocks * span + min_size[block_owners], side="left")
+        ends = np.searchsorted(posting_keys, blocks * span + max_size[block_owners], side="right")
+        lengths = ends - starts
+        n_books = len(self.books)
+        pairs = np.unique(np.repeat(block_owners, lengths) * n_books + index["posting_books"][self._expand(starts, lengths)])
+        pair_queries, pair_books = pairs // n_books, pairs % n_books
+
+        # Trigramas comunes de cada par: los del libro marcados en la tabla de trigramas de su título, con
+        # identificadores locales al lote para que la tabla sea pequeña
+        batch_grams, local_grams = np.unique(grams, return_inverse=True)
+        local = np.full(len(vocabulary) + 1, len(batch_grams), dtype=np.int64)  # La última columna queda vacía
+        local[batch_grams] = np.arange(len(batch_grams))
+        table = np.zeros((len(keys), len(batch_grams) + 1), dtype=bool)
+        table[owners, local_grams] = True
+        sizes = book_sizes[pair_books]
+        elements = local[index["book_grams"][self._expand(book_offsets[pair_books], sizes)]]
+        hits = table[np.repeat(pair_queries, sizes), elements]
+        common = np.bincount(np.repeat(np.arange(len(pairs)), sizes), weights=hits, minlength=len(pairs))
+        similarity = 2 * common / (query_sizes[pair_queries] + sizes)
+
+        # Mejor candidato de cada título; si el segundo tiene la misma similitud, es ambiguo
+        order = np.lexsort((-similarity, pair_queries))
+        pair_queries, pair_books, similarity = pair_queries[order], pair_books[order], similarity[order]
+        first = np.flatnonzero(np.r_[True, pair_queries[1:] != pair_queries[:-1]]) if len(pairs) else np.empty(0, dtype=np.int64)
+        tied = np.zeros(len(first), dtype=bool)
+        has_second = first + 1 < len(pairs)
+        second = first[has_second] + 1
+        tied[has_second] = (pair_queries[second] == pair_queries[first[has_second]]) & (similarity[second] == similarity[first[has_second]])
+
+        best = [(None, 0.0)] * len(keys)
+        for query, book, score, is_tied in zip(
+            pair_queries[first].tolist(), pair_books[first].tolist(), similarity[first].tolist(), tied.tolist()
+        ):
+            if score >= self.threshold:
+                best[query] = (None, score) if is_tied else (book, score)
+        return best
+
+    def matches(self) -> pd.DataFrame:
+        """
+        Devuelve los títulos resueltos sin coincidencia exacta, con el método, la confianza y las filas recuperadas.
+
+        Returns:
+            pd.DataFrame: Columnas 'Title', 'Resolved Title', 'Method', 'Confidence' y 'Rows', de más a menos filas.
+        """
+        rows = [
+            (title, book, method, confidence, self._rows.get(title, 0))
+            for title, (book, method, confidence) in self._decisions.items()
+            if book is not None
+        ]
+        table = pd.DataFrame(rows, columns=["Title", "Resolved Title", "Method", "Confidence", "Rows"])
+        return table.sort_values(["Rows", "Title"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+    def report(self):
+        """
+        Informa de las filas y los títulos recuperados por cada método y de la confianza de las
+        coincidencias aproximadas.
+        """
+        table = self.matches()
+        for method in ("normalized", "fuzzy"):
+            matched = table[table["Method"] == method]
+            metrics.count(f"rows_recovered_{method}", int(matched["Rows"].sum()))
+        normalized = table[table["Method"] == "normalized"]
+        fuzzy = table[table["Method"] == "fuzzy"]
+        ambiguous = sum(method == "ambiguous" for _, method, _ in self._decisions.values())
+        print(
+            f"Títulos recuperados: {int(normalized['Rows'].sum())} filas ({len(normalized)} títulos) por clave "
+            f"normalizada y {int(fuzzy['Rows'].sum())} filas ({len(fuzzy)} títulos) por coincidencia aproximada; "
+            f"{ambiguous} títulos ambiguos sin resolver."
+        )
+        if len(fuzzy):
+            print(
+                f"Confianza de las coincidencias aproximadas: media {fuzzy['Confidence'].mean():.3f}, "
+                f"mínima {fuzzy['Confidence'].min():.3f} (umbral {self.threshold})."
+            )
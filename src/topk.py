@@ -0,0 +1,204 @@
+import heapq
+import numpy as np
+import pandas as pd
+from itertools import islice
+from typing import List, Optional, Union
+
+
+class TopK:
+    """
+    Selección acotada de los k mejores valores, equivalente a tomar las primeras k filas de un
+    ordenamiento estable (`sort_values(kind="stable").head(k)`) sin ordenar todos los candidatos.
+
+    Los empates conservan el orden de las posiciones (primera aparición) y los valores nulos van
+    al final, como en pandas. El acumulador recibe los datos por bloques (`update`) y guarda como
+    máximo k candidatos; los acumuladores de distintas particiones se combinan con `merge`.
+    """
+
+    DEFAULT_CHUNK_SIZE = 1_000_000
+
+    def __init__(self, k: int, ascending: bool = False):
+        """
+        Inicializa un acumulador vacío.
+
+        Args:
+            k (int): Número de valores a conservar.
+            ascending (bool): Si es True se conservan los menores valores; si es False, los mayores.
+        """
+        self.k = max(int(k), 0)
+        self.ascending = ascending
+        self.values = np.empty(0, dtype=np.float64)
+        self.positions = np.empty(0, dtype=np.int64)
+
+    def update(self, values: np.ndarray, positions: Optional[np.ndarray] = None) -> "TopK":
+        """
+        Incorpora un bloque de valores y conserva solo los k mejores vistos hasta ahora.
+
+        Args:
+            values (np.ndarray): Valores del bloque.
+            positions (np.ndarray, opcional): Posiciones globales de los valores, usadas para
+                desempatar. Por defecto se usan 0..n-1, válido solo si hay un único bloque.
+
+        Returns:
+            TopK: El propio acumulador.
+        """
+        values = np.asarray(values)
+        if positions is None:
+            positions = np.arange(len(values), dtype=np.int64)
+        values = np.concatenate([self.values, values.astype(np.float64, copy=False)])
+        positions = np.concatenate([self.positions, np.asarray(positions, dtype=np.int64)])
+        self.values, self.positions = self._select(values, positions, self.k, self.ascending)
+        return self
+
+    @classmethod
+    def merge(cls, parts: List["TopK"]) -> "TopK":
+        """
+        Combina los acumuladores de varias particiones mediante una mezcla de montículos.
+
+        Args:
+            parts (List[TopK]): Acumuladores con el mismo k y el mismo sentido.
+
+        Returns:
+            TopK: Acumulador con los k mejores valores del conjunto.
+        """
+        merged = cls(parts[0].k, parts[0].ascending) if parts else cls(0)
+        sign = 1 if merged.ascending else -1
+
+        def sort_key(item):
+            value, position = item
+            return (np.isnan(value), sign * value if not np.isnan(value) else 0.0, position)
+
+        best = list(islice(
+            heapq.merge(*(zip(part.values, part.positions) for part in parts), key=sort_key), merged.k
+        ))
+        merged.values = np.asarray([value for value, _ in best], dtype=np.float64)
+        merged.positions = np.asarray([position for _, position in best], dtype=np.int64)
+        return merged
+
+    @staticmethod
+    def _select(values: np.ndarray, ties: np.ndarray, k: int, ascending: bool):
+        """
+        Selecciona y ordena los k mejores valores: los valores no nulos con selección parcial y,
+        si no alcanzan, los nulos por orden de desempate.
+
+        Args:
+            values (np.ndarray): Valores en float64.
+            ties (np.ndarray): Claves de desempate (menor primero).
+            k (int): Número de valores a conservar.
+            ascending (bool): Sentido de la selección.
+
+        Returns:
+            tuple: Valores y claves de desempate seleccionados, ya ordenados.
+        """
+        if k <= 0:
+            return values[:0], ties[:0]
+        missing = np.isnan(values)
+        present_values, present_ties = values[~missing], ties[~missing]
+
+        if len(present_values) > k:
+            # Umbral del k-ésimo valor; se conservan todos los empatados con él para desempatar después
+            if ascending:
+                threshold = np.partition(present_values, k - 1)[k - 1]
+                candidates = present_values <= threshold
+            else:
+                kth = len(present_values) - k
+                threshold = np.partition(present_values, kth)[kth]
+                candidates = present_values >= threshold
+            present_values, present_ties = present_values[candidates], present_ties[candidates]
+
+        order = np.lexsort((present_ties, present_values if ascending else -present_values))[:k]
+        selected_values, selected_ties = present_values[order], present_ties[order]
+
+        if len(selected_values) < k and missing.any():
+            missing_ties = np.sort(ties[missing])[:k - len(selected_values)]
+            selected_values = np.concatenate([selected_values, np.full(len(missing_ties), np.nan)])
+            selected_ties = np.concatenate([selected_ties, missing_ties])
+        return selected_values, selected_ties
+
+
+def top_k_positions(values, k: int, ascending: bool = False, chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Devuelve las posiciones de las primeras k filas de un ordenamiento estable de `values`.
+
+    Los arreglos mayores que `chunk_size` se procesan por particiones, cada una con su acumulador
+    acotado, y los resultados se combinan al final.
+
+    Args:
+        values (array-like): Valores numéricos.
+        k (int): Número de posiciones a devolver.
+        ascending (bool): Si es True se eligen los menores valores; si es False, los mayores.
+        chunk_size (int, opcional): Tamaño de partición. Por defecto, TopK.DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        np.ndarray: Posiciones seleccionadas, en el orden del ranking.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    chunk_size = chunk_size or TopK.DEFAULT_CHUNK_SIZE
+    parts = []
+    for start in range(0, max(len(values), 1), chunk_size):
+        chunk = values[start:start + chunk_size]
+        parts.append(TopK(k, ascending).update(chunk, np.arange(start, start + len(chunk), dtype=np.int64)))
+    return parts[0].positions if len(parts) == 1 else TopK.merge(parts).positions
+
+
+def bottom_k_positions(values, k: int, ascending: bool = False) -> np.ndarray:
+    """
+    Devuelve las posiciones de las últimas k filas de un ordenamiento estable de `values`
+    (equivalente a `sort_values(kind="stable").tail(k)`), con los nulos al final.
+
+    Args:
+        values (array-like): Valores numéricos.
+        k (int): Número de posiciones a devolver.
+        ascending (bool): Sentido del ordenamiento del que se toman las últimas filas.
+
+    Returns:
+        np.ndarray: Posiciones seleccionadas, en el orden del ranking.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    positions = np.arange(len(values), dtype=np.int64)
+    missing = np.isnan(values)
+
+    # Los nulos ocupan el final del ordenamiento; el resto se toma del extremo opuesto
+    missing_positions = positions[missing][-k:] if k > 0 else positions[:0]
+    n_present = k - len(missing_positions)
+    present = TopK._select(values[~missing], -positions[~missing], n_present, not ascending)[1]
+    return np.concatenate([-present[::-1], missing_positions])
+
+
+def _sort_values(data: Union[pd.Series, pd.DataFrame], by: Optional[str]) -> pd.Series:
+    """
+    Devuelve la columna (o la serie) por la que se ordena.
+    """
+    return data if isinstance(data, pd.Series) else data[by]
+
+
+def top_k(data: Union[pd.Series, pd.DataFrame], k: int, by: Optional[str] = None, ascending: bool = False):
+    """
+    Equivalente a `data.sort_values(by, ascending=ascending, kind="stable").head(k)` sin ordenar todo.
+
+    Args:
+        data (pd.Series o pd.DataFrame): Datos a clasificar.
+        k (int): Número de filas a devolver.
+        by (str, opcional): Columna por la que se clasifica (solo para DataFrame).
+        ascending (bool): Sentido de la clasificación.
+
+    Returns:
+        pd.Series o pd.DataFrame: Las k primeras filas del ranking.
+    """
+    return data.iloc[top_k_positions(_sort_values(data, by).to_numpy(dtype=np.float64, na_value=np.nan), k, ascending)]
+
+
+def bottom_k(data: Union[pd.Series, pd.DataFrame], k: int, by: Optional[str] = None, ascending: bool = False):
+    """
+    Equivalente a `data.sort_values(by, ascending=ascending, kind="stable").tail(k)` sin ordenar todo.
+
+    Args:
+        data (pd.Series o pd.DataFrame): Datos a clasificar.
+        k (int): Número de filas a devolver.
+        by (str, opcional): Columna por la que se clasifica (solo para DataFrame).
+        ascending (bool): Sentido de la clasificación.
+
+    Returns:
+        pd.Series o pd.DataFrame: Las k últimas filas del ranking.
+    """
+    return data.iloc[bottom_k_positions(_sort_values(data, by).to_numpy(dtype=np.float64, na_value=np.nan), k, ascending)]
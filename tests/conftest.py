@@ -0,0 +1,35 @@
+import pytest
+from tests.helpers import make_data
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """
+    Configura todas las rutas del archivo .env en una carpeta temporal, con un solo proceso y sin
+    informe de métricas.
+    """
+    paths = {
+        "DATA_PATH": "data", "OUTPUT_PATH": "output", "CACHE_PATH": "cache", "STATE_PATH": "state",
+        "CHECKPOINT_PATH": "checkpoints", "SPILL_PATH": "spill", "CHARTS_PATH": "charts",
+    }
+    for name, folder in paths.items():
+        (tmp_path / folder).mkdir()
+        monkeypatch.setenv(name, str(tmp_path / folder))
+    for name, value in {
+        "SENTIMENT_WORKERS": "1", "SENTIMENT_ENGINE": "vader", "METRICS_ENABLED": "0", "EXPORT_FORMATS": "xlsx",
+        "JOIN_PARTITIONS": "0", "TEXT_STORE": "0", "TITLE_MATCHING": "exact", "CSV_ENGINE": "pandas",
+        "DEDUP_FINGERPRINT_BITS": "64", "RENDER_MODE": "headless", "MPLBACKEND": "Agg",
+    }.items():
+        monkeypatch.setenv(name, value)
+    return tmp_path
+
+
+@pytest.fixture
+def data_files(env):
+    """
+    Escribe los archivos de ejemplo en DATA_PATH y devuelve sus DataFrames.
+    """
+    data = make_data()
+    for name, frame in data.items():
+        frame.to_csv(env / "data" / f"{name}.csv", index=False)
+    return data
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from src.data_loader import DataLoader
+
+
+def make_data(n_books: int = 30, n_ratings: int = 400, seed: int = 0) -> dict:
+    """
+    Genera un par de archivos pequeños con los casos límite de los datos de Amazon: títulos nulos en
+    ambos archivos, títulos repetidos en 'books_data', reseñas sin libro, textos vacíos o nulos y
+    reseñas duplicadas en posiciones lejanas (en bloques distintos al leer por bloques).
+    """
+    rng = np.random.default_rng(seed)
+    titles = [f"Book {i}" for i in range(n_books)]
+    books = pd.DataFrame({
+        "Title": titles + [None, "Book 3"],
+        "description": "d",
+        "authors": [f"['Author {i % 7}', 'Author {i % 5 + 7}']" if i % 4 else None for i in range(n_books)]
+                   + ["['Nobody']", "['Other']"],
+        "categories": [f"['Category {i % 3}']" if i % 6 else "[]" for i in range(n_books)] + ["['None']", "['Fiction']"],
+        "ratingsCount": [float(i % 9) if i % 8 else np.nan for i in range(n_books)] + [1.0, 2.0],
+    })
+
+    pool = titles + [None, "Unknown book", "Book 3"]
+    weights = np.linspace(3, 1, len(pool))
+    rows = {
+        "Id": np.arange(n_ratings),
+        "Title": [pool[i] for i in rng.choice(len(pool), n_ratings, p=weights / weights.sum())],
+        "review/score": rng.integers(1, 6, n_ratings).astype(float),
+        "review/text": [
+            ["Great book, loved it!", "Terrible and boring.", "It was ok.", "", None, "Not bad at all :)"][i]
+            for i in rng.integers(0, 6, n_ratings)
+        ],
+    }
+    ratings = pd.DataFrame(rows)
+    # Copias exactas de reseñas anteriores, al final del archivo
+    copies = ratings.sample(n_ratings // 10, random_state=seed).assign(Id=lambda frame: frame["Id"] + n_ratings)
+    return {"books_data": books, "books_rating": pd.concat([ratings, copies], ignore_index=True)}
+
+
+def reference_process(data: dict):
+    """
+    Procesamiento original de DataLoader.process_data sobre los datos completos en memoria: la
+    referencia de orden y contenido de todos los modos de carga.
+    """
+    books_data = data["books_data"][DataLoader.BOOKS_DATA_COLUMNS]
+    books_rating = data["books_rating"][DataLoader.BOOKS_RATING_COLUMNS]
+    unmatched = books_rating[~books_rating["Title"].isin(books_data["Title"])]
+    merged = pd.merge(books_data, books_rating, on="Title", how="inner")
+    merged["authors"] = merged["authors"].apply(DataLoader.clean_column)
+    merged["categories"] = merged["categories"].apply(DataLoader.clean_column)
+    merged = merged[~merged["review/text"].isnull() & (merged["review/text"] != "")]
+    return merged.drop_duplicates(), unmatched
+
+
+def as_plain(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte las columnas categóricas a objetos y renumera las filas, para comparar resultados.
+    """
+    categorical = [column for column in data.columns if isinstance(data[column].dtype, pd.CategoricalDtype)]
+    return data.astype({column: object for column in categorical}).reset_index(drop=True)
+
+
+def assert_same_rows(result, expected):
+    """
+    Comprueba que dos resultados de process_data tienen las mismas filas unidas, en el mismo orden,
+    y los mismos registros no coincidentes.
+    """
+    pd.testing.assert_frame_equal(as_plain(result[0]), as_plain(expected[0]), check_dtype=False)
+    pd.testing.assert_frame_equal(result[1].astype(object), expected[1].astype(object), check_dtype=False,
+                                  check_index_type=False)
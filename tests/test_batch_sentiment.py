@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from src.batch_sentiment import BatchSentimentScorer
+from src.sentiment_analysis import SentimentAnalysis
+
+REVIEWS = [
+    # Negaciones
+    "This book is not good.", "It isn't bad at all", "Never have I been so bored", "not the worst, not the best",
+    "I don't think it was great, nor was it terrible", "without doubt a masterpiece",
+    # 'but' y 'least'
+    "The plot was slow but the ending was amazing!", "Great characters, but a terrible ending.",
+    "at least it was short", "the least interesting book I've read",
+    # Mayúsculas y modificadores
+    "This is GREAT", "THIS IS GREAT", "It was VERY good", "kind of boring", "extremely, incredibly good",
+    "barely readable", "The book was sort of good",
+    # Signos de exclamación e interrogación
+    "Loved it!!!", "Loved it!!!!!!!", "Did I like it? Who knows???", "Why would anyone enjoy this?",
+    "good!?!", "bad?",
+    # Emoji y emoticonos
+    "Fantastic read 😍😍", "Meh 😐", "awful 😡 never again", "nice :) but long :(", "<3 it",
+    # Modismos y expresiones
+    "it was the bomb", "this book is a kiss of death", "cut the mustard it did not", "yeah right, great book",
+    "the shit", "hand to mouth", "no problem at all",
+    # Sin sentimiento, vacíos o solo signos
+    "", " ", "...", "!!!", "the cat sat on the mat", "12345", "ok",
+    # Más largos y mezclados
+    "I really, REALLY wanted to like this book but it just didn't work for me. The writing is clunky!",
+    "Not bad. Not bad at all! Actually kind of wonderful, though the middle drags :/",
+]
+
+
+@pytest.fixture(scope="module")
+def analyzers():
+    reference = SentimentIntensityAnalyzer()
+    return reference, BatchSentimentScorer(reference)
+
+
+def assert_same_scores(batch: list, reference: list, texts: list):
+    for text, batch_score, reference_score in zip(texts, batch, reference):
+        assert batch_score == pytest.approx(reference_score, abs=1e-9), text
+
+
+def test_single_reviews_match_vader(analyzers):
+    reference, scorer = analyzers
+    for text in REVIEWS:
+        assert scorer.polarity_scores(text) == pytest.approx(reference.polarity_scores(text), abs=1e-9), text
+
+
+def test_batches_match_vader(analyzers):
+    reference, scorer = analyzers
+    # Los mismos textos, en minúsculas como los recibe el cálculo de sentimiento, y con nulos
+    texts = SentimentAnalysis._clean_reviews(pd.Series(REVIEWS + [None, np.nan] + [text.lower() for text in REVIEWS],
+                                                       dtype=object)).tolist()
+    assert_same_scores(scorer.polarity_scores_batch(texts), [reference.polarity_scores(text) for text in texts], texts)
+
+
+def test_empty_batch(analyzers):
+    _, scorer = analyzers
+    assert scorer.polarity_scores_batch([]) == []
+    assert scorer.polarity_scores("") == {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+
+
+def test_generated_reviews_match_vader(analyzers):
+    from vaderSentiment import vaderSentiment as vader
+
+    reference, scorer = analyzers
+    rng = np.random.default_rng(0)
+    lexicon = sorted(reference.lexicon)
+    words = (
+        list(rng.choice(lexicon, 200)) + sorted(vader.BOOSTER_DICT) + list(vader.NEGATE) + ["but", "least", "at", "very"]
+        + ["book", "the", "plot", "was", "and", "it", "kind", "of", "sort", "no", "without"]
+    )
+    punctuation = ["", "", "", "!", "!!", "?", "??", ".", ",", " :)", " 😍"]
+    texts = []
+    for _ in range(500):
+        tokens = rng.choice(words, rng.integers(1, 15))
+        tokens = [word.upper() if rng.random() < 0.1 else word for word in tokens]
+        texts.append(" ".join(tokens) + rng.choice(punctuation))
+    assert_same_scores(scorer.polarity_scores_batch(texts), [reference.polarity_scores(text) for text in texts], texts)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.book_stats import BookStats
+
+
+def make_reviews(n_rows: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """
+    Reseñas con claves nulas, puntuaciones, textos y sentimientos nulos, y libros con el mismo título
+    pero distintos autores o categorías.
+    """
+    rng = np.random.default_rng(seed)
+    titles = rng.choice(["Dune", "Emma", "Ulises", "Odisea", None], size=n_rows, p=[0.3, 0.3, 0.2, 0.15, 0.05])
+    authors = rng.choice(["['A']", "['B']", "['A', 'B']", None], size=n_rows, p=[0.4, 0.3, 0.2, 0.1])
+    categories = rng.choice(["['Fiction']", "['History']", None], size=n_rows, p=[0.6, 0.3, 0.1])
+    scores = rng.integers(1, 6, n_rows).astype(np.float64)
+    scores[rng.random(n_rows) < 0.1] = np.nan
+    compound = np.round(rng.uniform(-1, 1, n_rows), 2)
+    compound[rng.random(n_rows) < 0.1] = np.nan
+    texts = np.where(rng.random(n_rows) < 0.1, None, "texto")
+    return pd.DataFrame({
+        "Title": titles, "authors": authors, "categories": categories,
+        "review/score": scores, "review/text": texts, "compound": compound,
+    })
+
+
+def baseline_by_book(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agregación por libro anterior a BookStats.
+    """
+    return (
+        data.groupby(["Title", "authors", "categories"])
+        .agg(
+            **{"Review Count": ("review/text", "count"),
+               "Average Rating": ("review/score", "mean"),
+               "Average Sentiment": ("compound", "mean")}
+        )
+        .reset_index()
+    )
+
+
+def test_by_book_matches_groupby():
+    data = make_reviews()
+    pd.testing.assert_frame_equal(BookStats(data).by_book(), baseline_by_book(data), check_dtype=False)
+
+
+def test_by_title_matches_groupby():
+    data = make_reviews()
+    expected = data.groupby("Title").agg(
+        **{"Row Count": ("review/score", "size"),
+           "Review Count": ("review/text", "count"),
+           "Average Rating": ("review/score", "mean")}
+    ).reset_index()
+    pd.testing.assert_frame_equal(BookStats(data).by_title(), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("n_parts", [2, 7])
+def test_combine_matches_stats_of_all_rows(n_parts):
+    data = make_reviews()
+    parts = np.array_split(np.arange(len(data)), n_parts)
+    combined = BookStats.combine(*[BookStats(data.iloc[rows].reset_index(drop=True)) for rows in parts])
+    whole = BookStats(data)
+
+    expected = whole.table.astype({key: object for key in BookStats.KEYS})
+    pd.testing.assert_frame_equal(combined.table, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(combined.by_book(), baseline_by_book(data), check_dtype=False)
+    pd.testing.assert_frame_equal(combined.by_title(), whole.by_title(), check_dtype=False)
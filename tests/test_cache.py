@@ -0,0 +1,100 @@
+import os
+import pandas as pd
+import pytest
+from src.cache import ProcessedDataCache
+from src.data_loader import DataLoader
+
+
+def touch(path, mtime_ns: int):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def source(env):
+    path = env / "data" / "books_rating.csv"
+    path.write_text("Id,Title\n1,Dune\n")
+    return path
+
+
+def test_key_changes_with_size_mtime_or_content(env, source):
+    cache = ProcessedDataCache()
+    files = {"ratings": str(source)}
+    mtime = os.stat(source).st_mtime_ns
+    key = cache.build_key(files, "1")
+    assert cache.build_key(files, "1") == key
+
+    touch(source, mtime + 10**9)
+    touched = cache.build_key(files, "1")
+    assert touched != key
+
+    source.write_text("Id,Title\n2,Emma\n")  # Mismo tamaño, otro contenido
+    touch(source, mtime + 2 * 10**9)
+    assert cache.build_key(files, "1") not in (key, touched)
+
+    source.write_text("Id,Title\n1,Dune\n1,Dune\n")
+    assert cache.build_key(files, "1") != key
+    assert cache.build_key(files, "2") != cache.build_key(files, "1")
+
+
+def test_content_hash_is_reused_while_size_and_mtime_match(env, source):
+    # Sin cambios de tamaño ni de fecha no se vuelve a leer el archivo: la huella guardada sigue vigente
+    cache = ProcessedDataCache()
+    files = {"ratings": str(source)}
+    mtime = os.stat(source).st_mtime_ns
+    key = cache.build_key(files, "1")
+    source.write_text("Id,Title\n2,Emma\n")
+    touch(source, mtime)
+    assert cache.build_key(files, "1") == key
+
+    os.remove(os.path.join(cache.cache_path, ProcessedDataCache.FINGERPRINTS_FILE))
+    assert cache.build_key(files, "1") != key
+
+
+def test_round_trip_keeps_values_and_types(env):
+    cache = ProcessedDataCache()
+    processed = pd.DataFrame({
+        "Title": ["Dune", None], "review/score": [5.0, float("nan")], "ratingsCount": [3.0, None],
+        "categories": pd.Categorical(["Fiction", "History"]),
+    })
+    unmatched = pd.DataFrame({"Title": ["Otro"]})
+    cache.save("abc", processed, unmatched)
+    loaded, loaded_unmatched = cache.load("abc")
+    pd.testing.assert_frame_equal(loaded, processed)
+    pd.testing.assert_frame_equal(loaded_unmatched, unmatched)
+    assert cache.load("otra") is None
+
+    # Solo se conserva la entrada vigente
+    cache.save("def", processed, unmatched)
+    assert sorted(name for name in os.listdir(cache.cache_path) if name.endswith(".arrow")) == [
+        "processed_def.arrow", "unmatched_def.arrow"
+    ]
+
+
+def load(monkeypatch, reprocess: bool):
+    calls = []
+    process_data = DataLoader.process_data
+
+    def counting(self, *args, **kwargs):
+        calls.append(1)
+        return process_data(self, *args, **kwargs)
+
+    monkeypatch.setattr(DataLoader, "process_data", counting)
+    result = DataLoader(chunksize=53).load_processed_data()
+    assert bool(calls) == reprocess
+    return result
+
+
+def test_loader_hits_cache_and_reprocesses_after_changes(data_files, monkeypatch):
+    first = load(monkeypatch, reprocess=True)
+    second = load(monkeypatch, reprocess=False)
+    pd.testing.assert_frame_equal(second[0], first[0])
+    pd.testing.assert_frame_equal(second[1], first[1].reset_index(drop=True))  # La caché no guarda el índice
+
+    monkeypatch.setattr(DataLoader, "PROCESSING_VERSION", DataLoader.PROCESSING_VERSION + "-next")
+    load(monkeypatch, reprocess=True)
+    load(monkeypatch, reprocess=False)
+
+    ratings = os.path.join(os.environ["DATA_PATH"], "books_rating.csv")
+    with open(ratings, "a", encoding="utf-8") as f:
+        f.write("\n")
+    load(monkeypatch, reprocess=True)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.sentiment_analysis import SentimentAnalysis
+
+# Puntuación compuesta de cada texto preprocesado, con valores justo en el umbral y a su alrededor
+COMPOUND = {
+    "": 0.0, "exactly positive": 0.05, "exactly negative": -0.05, "barely positive": 0.0500001,
+    "barely negative": -0.0500001, "good": 0.5, "great": 0.75, "bad": -0.25, "awful": -0.875,
+    "mixed": 0.125, "flat": 0.0,
+}
+
+
+def make_reviews(n_rows: int = 600, seed: int = 0) -> pd.DataFrame:
+    """
+    Reseñas con textos nulos, autores y categorías multivaluados y muchos empates.
+    """
+    rng = np.random.default_rng(seed)
+    texts = rng.choice([text.upper() for text in COMPOUND if text] + [None], size=n_rows)
+    return pd.DataFrame({
+        "Title": rng.choice(["Dune", "Emma", "Ulises", "Odisea"], size=n_rows),
+        "review/score": rng.integers(1, 6, n_rows).astype(np.float64),
+        "review/text": texts,
+        "authors": rng.choice(["Ana", "Luis", "Ana, Luis", "Marta, Ana"], size=n_rows),
+        "categories": rng.choice(["Fiction", "History", "Fiction, Poetry", "Arts, crafts, and hobbies"], size=n_rows),
+    })
+
+
+def fake_scores(self, reviews: list) -> list:
+    scores = []
+    for review in reviews:
+        compound = COMPOUND[review]
+        scores.append({"neg": max(-compound, 0.0), "neu": 1 - abs(compound), "pos": max(compound, 0.0), "compound": compound})
+    return scores
+
+
+def analyze(data: pd.DataFrame, compact: bool) -> SentimentAnalysis:
+    analyzer = SentimentAnalysis(data.copy(), compact=compact)
+    analyzer.preprocess_text()
+    analyzer.calculate_sentiment_scores()
+    return analyzer
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_compact_layout_matches_score_dicts(env, monkeypatch, seed):
+    monkeypatch.setattr(SentimentAnalysis, "_polarity_scores", fake_scores)
+    data = make_reviews(seed=seed)
+    legacy, compact = analyze(data, compact=False), analyze(data, compact=True)
+
+    # Misma clasificación también en el umbral, aunque 'compound' se guarde en float32
+    assert compact.data["Sentiment"].astype(str).tolist() == legacy.data["Sentiment"].tolist()
+    for key in ("neg", "neu", "pos", "compound"):
+        expected = legacy.data["score"].apply(lambda score: score[key]).to_numpy()
+        assert compact.data[key].dtype == np.float32
+        np.testing.assert_allclose(compact.data[key].to_numpy(dtype=np.float64), expected, rtol=1e-6, atol=1e-7)
+    assert compact.data["review/score"].dtype == np.int8
+    np.testing.assert_array_equal(compact.data["review/score"], legacy.data["review/score"])
+
+    # Los gráficos y las consultas dan los mismos rankings y promedios
+    for legacy_spec, compact_spec in zip(legacy.chart_specs(top_n=5), compact.chart_specs(top_n=5)):
+        assert compact_spec.get("labels") == legacy_spec.get("labels"), legacy_spec["name"]
+        if "values" in legacy_spec:
+            np.testing.assert_allclose(compact_spec["values"], legacy_spec["values"], rtol=1e-6, atol=1e-7)
+        for legacy_series, compact_series in zip(legacy_spec.get("series", []), compact_spec.get("series", [])):
+            assert compact_series["counts"] == legacy_series["counts"]
+    for title in ("Dune", "Emma"):
+        assert compact.average_sentiment_by_book(title) == pytest.approx(legacy.average_sentiment_by_book(title))
+    for category in ("Fiction", "Poetry"):
+        assert compact.average_sentiment_by_category(category) == pytest.approx(legacy.average_sentiment_by_category(category))
+
+
+def test_non_integer_or_missing_ratings_keep_their_type(env, monkeypatch):
+    monkeypatch.setattr(SentimentAnalysis, "_polarity_scores", fake_scores)
+    data = make_reviews(50)
+    data.loc[3, "review/score"] = np.nan
+    compact = analyze(data, compact=True)
+    assert compact.data["review/score"].dtype == np.float64
+    assert np.isnan(compact.data.loc[3, "review/score"])
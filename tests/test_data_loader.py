@@ -0,0 +1,31 @@
+import pytest
+from src.data_loader import DataLoader
+from tests.helpers import assert_same_rows, reference_process
+
+
+@pytest.mark.parametrize("chunksize", [37, 100, 10_000])
+def test_chunked_processing_keeps_full_merge_order(data_files, chunksize):
+    # Las filas de todos los bloques salen en el orden de la unión completa: por libro y por reseña
+    loader = DataLoader(chunksize=chunksize, categorical=False)
+    result = loader.process_data(loader.load_data(streaming=True))
+    assert_same_rows(result, reference_process(data_files))
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize("join_partitions", [0, 4])
+@pytest.mark.parametrize("csv_engine", DataLoader.CSV_ENGINES)
+def test_every_mode_gives_the_same_rows(data_files, categorical, streaming, join_partitions, csv_engine):
+    # Las reseñas con título nulo se unen a los libros sin título en todos los modos, como en la unión original
+    loader = DataLoader(chunksize=53, categorical=categorical, join_partitions=join_partitions, csv_engine=csv_engine)
+    result = loader.process_data(loader.load_data(streaming=streaming))
+    expected = reference_process(data_files)
+    assert expected[0]["Title"].isna().any()
+    assert_same_rows(result, expected)
+
+
+@pytest.mark.parametrize("join_partitions", [0, 4])
+def test_lazy_text_gives_the_same_rows(data_files, join_partitions):
+    loader = DataLoader(chunksize=53, join_partitions=join_partitions, lazy_text=True)
+    merged, unmatched = loader.process_data(loader.load_data(streaming=True))
+    assert_same_rows((loader.text_store.with_text(merged), unmatched), reference_process(data_files))
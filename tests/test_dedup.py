@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.dedup import RowDeduplicator
+
+
+def duplicated_rows(n_rows: int = 3000, seed: int = 0) -> pd.DataFrame:
+    """
+    Filas con muchos duplicados, nulos y -0.0, en columnas de texto, numéricas y categóricas.
+    """
+    rng = np.random.default_rng(seed)
+    texts = np.array(["bueno", "malo", "regular", None, "ñ" * 300], dtype=object)
+    return pd.DataFrame({
+        "Title": pd.Categorical(rng.choice(["A", "B", "C"], n_rows)),
+        "review/text": texts[rng.integers(0, len(texts), n_rows)],
+        "review/score": rng.choice([1.0, 2.0, np.nan, -0.0, 0.0], n_rows),
+        "ratingsCount": rng.integers(0, 4, n_rows),
+    })
+
+
+@pytest.mark.parametrize("bits", [64, 128])
+@pytest.mark.parametrize("chunk_size", [13, 500, 5000])
+def test_matches_drop_duplicates_across_chunks(bits, chunk_size):
+    data = duplicated_rows()
+    deduplicator = RowDeduplicator(bits=bits)
+    kept = pd.concat([deduplicator.deduplicate(data.iloc[start:start + chunk_size])
+                      for start in range(0, len(data), chunk_size)])
+
+    expected = data.drop_duplicates()
+    pd.testing.assert_frame_equal(kept, expected)
+    assert len(deduplicator) == len(expected)
+    assert deduplicator.removed == len(data) - len(expected)
+
+
+def test_only_within_each_frame_when_not_persistent():
+    data = duplicated_rows(200)
+    deduplicator = RowDeduplicator(bits=64, persistent=False)
+    assert deduplicator.deduplicate(data).equals(data.drop_duplicates())
+    assert deduplicator.deduplicate(data).equals(data.drop_duplicates())
+    assert len(deduplicator) == 0
+
+
+def test_fingerprints_sharing_their_first_half(monkeypatch):
+    # Huellas de 128 bits con la misma primera mitad: solo la segunda las distingue
+    deduplicator = RowDeduplicator(bits=128)
+    monkeypatch.setattr(deduplicator, "fingerprints", lambda data: np.column_stack(
+        [np.zeros(len(data), dtype=np.uint64), data["key"].to_numpy(dtype=np.uint64)]))
+
+    chunks = [[1, 2, 1], [3, 2], [4, 1, 3, 5], [5, 6]]
+    kept = [deduplicator.new_rows(pd.DataFrame({"key": chunk})).tolist() for chunk in chunks]
+    assert kept == [[True, True, False], [True, False], [True, False, False, True], [False, True]]
+    assert len(deduplicator) == 6
@@ -0,0 +1,84 @@
+from io import StringIO
+import numpy as np
+import pandas as pd
+import pytest
+from src.exporter import RankingExporter
+
+TABLES = {
+    "top_libros_numero_resenas": pd.DataFrame({
+        "Title": ["Dune", "Emma", None, "Ñandú: relatos"],
+        "authors": ["['Frank Herbert']", None, "['Anónimo']", "['A', 'B']"],
+        "categories": ["['Fiction']", "['Fiction']", None, "['Poetry', 'Fiction']"],
+        "Review Count": [12, 7, 3, 3],
+    }),
+    "top_libros_calificacion_promedio": pd.DataFrame({
+        "Title": ["Emma", "Dune"],
+        "authors": [None, "['Frank Herbert']"],
+        "categories": ["['Fiction']", "['Fiction']"],
+        "Average Rating": [4.25, np.nan],
+    }),
+}
+
+
+def baseline(env, name: str) -> pd.DataFrame:
+    """
+    Tabla escrita con to_excel, como antes del exportador, y leída de nuevo.
+    """
+    path = env / f"baseline_{name}.xlsx"
+    TABLES[name].to_excel(path, index=False)
+    return pd.read_excel(path)
+
+
+def test_every_format_reads_back_like_to_excel(env):
+    output = env / "output"
+    exporter = RankingExporter(formats=["xlsx", "workbook", "csv", "parquet"])
+    exporter.export(TABLES)
+
+    workbook = pd.read_excel(output / "top_libros.xlsx", sheet_name=None)
+    assert list(workbook) == ["numero_resenas", "calificacion_promedio"]
+    for name, table in TABLES.items():
+        expected = baseline(env, name)
+        assert pd.ExcelFile(output / f"{name}.xlsx").sheet_names == [RankingExporter.SINGLE_SHEET_NAME]
+        pd.testing.assert_frame_equal(pd.read_excel(output / f"{name}.xlsx"), expected)
+        pd.testing.assert_frame_equal(workbook[name[len("top_libros_"):]], expected)
+        pd.testing.assert_frame_equal(pd.read_csv(output / f"{name}.csv"), pd.read_csv(StringIO(table.to_csv(index=False))))
+        pd.testing.assert_frame_equal(pd.read_parquet(output / f"{name}.parquet"), table)
+
+
+def test_single_ranking_skips_the_workbook(env):
+    RankingExporter(formats=["workbook", "csv"]).export({"top_libros_numero_resenas": TABLES["top_libros_numero_resenas"]}, combined=False)
+    assert sorted(path.name for path in (env / "output").iterdir()) == ["top_libros_numero_resenas.csv"]
+
+
+def test_sheet_names_are_truncated_to_31_characters(env):
+    exporter = RankingExporter(formats=["workbook"])
+    long_name = "top_libros_" + "sentimiento_promedio_por_categoria"
+    assert exporter._sheet_name(long_name) == "sentimiento_promedio_por_catego"
+    assert len(exporter._sheet_name(long_name)) == RankingExporter.MAX_SHEET_NAME
+    assert exporter._sheet_name("otra_tabla") == "otra_tabla"
+
+    exporter.export({long_name: TABLES["top_libros_calificacion_promedio"]})
+    assert pd.ExcelFile(env / "output" / "top_libros.xlsx").sheet_names == ["sentimiento_promedio_por_catego"]
+
+
+def test_background_error_is_raised_from_close(env, monkeypatch):
+    def failing_workbook(path, sheets):
+        raise OSError(f"Disco lleno: {path}")
+
+    exporter = RankingExporter(formats=["xlsx"], background=True)
+    monkeypatch.setattr(RankingExporter, "_write_workbook", staticmethod(failing_workbook))
+    future = exporter.export(TABLES)
+    assert future is not None
+    with pytest.raises(OSError, match="Disco lleno"):
+        exporter.close()
+    # El error se propaga una sola vez; después el exportador puede volver a usarse
+    exporter.close()
+
+
+def test_background_writes_finish_before_close_returns(env):
+    with RankingExporter(formats=["csv"], background=True) as exporter:
+        futures = [exporter.export({name: table}) for name, table in TABLES.items()]
+    assert all(future.done() for future in futures)
+    assert [future.result() for future in futures] == [
+        [str(env / "output" / f"{name}.csv")] for name in TABLES
+    ]
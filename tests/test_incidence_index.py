@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.incidence_index import IncidenceIndex
+
+CATEGORY_PATTERN = r",\s+(?![a-z])"
+
+
+def make_rows(n_rows: int = 3000, seed: int = 0) -> pd.DataFrame:
+    """
+    Filas con columnas multivaluadas (incluidos elementos repetidos dentro de una fila, nulos y
+    elementos con comas internas) y una columna numérica con nulos y muchos empates.
+    """
+    rng = np.random.default_rng(seed)
+    items = ["Ana", "Luis", "Marta", "Pedro, hijo", "Zoe", "Íñigo"]
+    authors = [
+        ", ".join(rng.choice(items, size=rng.integers(1, 4))) if rng.random() > 0.1 else None
+        for _ in range(n_rows)
+    ]
+    categories = rng.choice(
+        ["Fiction", "History, general", "Fiction, Poetry", "Poetry", "Arts, crafts, and hobbies, Fiction", None],
+        size=n_rows,
+    )
+    scores = rng.integers(1, 6, n_rows).astype(np.float64)
+    scores[rng.random(n_rows) < 0.15] = np.nan
+    return pd.DataFrame({"authors": authors, "categories": categories, "review/score": scores})
+
+
+def exploded(data: pd.DataFrame, column: str, separator: str = ", ", regex: bool = False) -> pd.DataFrame:
+    """
+    Filas replicadas por elemento, como antes del índice.
+    """
+    split = data[column].str.split(separator, regex=regex) if regex else data[column].str.split(separator)
+    return data.assign(**{column: split}).explode(column).dropna(subset=[column])
+
+
+@pytest.mark.parametrize("column, separator, regex", [
+    ("authors", ", ", False),
+    ("categories", CATEGORY_PATTERN, True),
+])
+def test_matches_explode_and_groupby(column, separator, regex):
+    data = make_rows()
+    index = IncidenceIndex(data[column], separator, regex)
+    reference = exploded(data, column, separator, regex)
+
+    pd.testing.assert_series_equal(index.value_counts(), reference[column].value_counts(), check_dtype=False)
+    pd.testing.assert_series_equal(
+        index.value_counts(top_n=3), reference[column].value_counts().head(3), check_dtype=False
+    )
+    mask = (data["review/score"] >= 4).to_numpy()
+    pd.testing.assert_series_equal(
+        index.value_counts(mask=mask), reference.loc[reference["review/score"] >= 4, column].value_counts(),
+        check_dtype=False,
+    )
+
+    expected_mean = reference.groupby(column)["review/score"].mean()
+    pd.testing.assert_series_equal(index.mean(data["review/score"]), expected_mean, check_names=False, check_index_type=False)
+
+    totals = index.totals(data["review/score"]).sort_index()
+    grouped = reference.groupby(column)["review/score"]
+    np.testing.assert_array_equal(totals.index.to_numpy(dtype=object), grouped.size().index.to_numpy(dtype=object))
+    np.testing.assert_array_equal(totals["n_rows"], grouped.size())
+    np.testing.assert_array_equal(totals["n_values"], grouped.count())
+    np.testing.assert_allclose(totals["sum"], grouped.sum())
+
+
+def test_regex_separator_keeps_lowercase_continuations():
+    index = IncidenceIndex(pd.Series(["Arts, crafts, and hobbies, Fiction", "History, general"]), CATEGORY_PATTERN, regex=True)
+    assert list(index.items) == ["Arts, crafts, and hobbies", "Fiction", "History, general"]
+
+
+def test_ties_keep_first_appearance_order():
+    column = pd.Series(["B, A", "C", None, "A, C", "B"], name="authors")
+    counts = IncidenceIndex(column).value_counts()
+    assert list(counts.index) == ["B", "A", "C"] and list(counts) == [2, 2, 2]
+    assert list(IncidenceIndex(column).value_counts(top_n=2).index) == ["B", "A"]
@@ -0,0 +1,124 @@
+import os
+import json
+import subprocess
+import sys
+import pandas as pd
+import pytest
+import cli
+from src.data_loader import DataLoader
+from src.eda import EDA
+from src.incidence_index import IncidenceIndexes
+from src.incremental import IncrementalUpdater
+from src.sentiment_analysis import SentimentAnalysis
+from src.sentiment_query import SentimentQueryIndex
+from tests.helpers import make_data
+
+
+def save_state(data_path, state_path, monkeypatch) -> IncrementalUpdater:
+    """
+    Procesa los archivos de `data_path`, calcula el sentimiento y guarda el estado base en `state_path`.
+    """
+    monkeypatch.setenv("DATA_PATH", str(data_path))
+    loader = DataLoader(chunksize=50)
+    processed, _ = loader.process_data(loader.load_data(streaming=True))
+    analyzer = SentimentAnalysis(processed)
+    analyzer.preprocess_text()
+    updater = IncrementalUpdater(str(state_path))
+    updater.save_baseline(analyzer.calculate_sentiment_scores())
+    return updater
+
+
+def test_delta_matches_full_recompute(env, monkeypatch):
+    data = make_data()
+    history, delta = data["books_rating"].iloc[:300], data["books_rating"].iloc[300:]
+    for folder, ratings in {"full": data["books_rating"], "history": history}.items():
+        (env / folder).mkdir()
+        data["books_data"].to_csv(env / folder / "books_data.csv", index=False)
+        ratings.to_csv(env / folder / "books_rating.csv", index=False)
+    delta.to_csv(env / "delta.csv", index=False)
+
+    full = save_state(env / "full", env / "state_full", monkeypatch)
+    incremental = save_state(env / "history", env / "state_history", monkeypatch)
+    new_rows = incremental.apply_delta(str(env / "delta.csv"), export=False)
+    # Las copias de reseñas del historial que trae el lote no se vuelven a contar
+    assert 0 < len(new_rows) < len(delta)
+
+    pd.testing.assert_frame_equal(incremental.book_stats().table, full.book_stats().table, check_dtype=False)
+    pd.testing.assert_frame_equal(incremental.author_stats(), full.author_stats(), check_dtype=False)
+    pd.testing.assert_frame_equal(incremental.category_stats(), full.category_stats(), check_dtype=False)
+
+    # Un lote ya aplicado no se vuelve a sumar
+    assert incremental.apply_delta(str(env / "delta.csv"), export=False).empty
+    pd.testing.assert_frame_equal(incremental.book_stats().table, full.book_stats().table, check_dtype=False)
+
+
+def test_query_index_reads_the_saved_totals(env, monkeypatch):
+    data = make_data()
+    (env / "full").mkdir()
+    for name, frame in data.items():
+        frame.to_csv(env / "full" / f"{name}.csv", index=False)
+    save_state(env / "full", env / "state", monkeypatch)
+
+    queries = {"books": ["Book 1", "book 2", "Unknown book"], "categories": ["Category 0"], "match": "ignore_case"}
+    from_json = SentimentQueryIndex.from_state(str(env / "state")).batch(**queries)
+    # Sin el archivo de totales (estado de una versión anterior), se leen las tablas del estado
+    (totals_file,) = (env / "state").glob("query_totals.*.json")
+    totals_file.unlink()
+    assert SentimentQueryIndex.from_state(str(env / "state")).batch(**queries) == from_json
+    assert from_json["books"]["Book 1"][0]["reviews"] > 0 and from_json["books"]["Unknown book"] == []
+
+
+def test_query_command_does_not_import_pandas(env, monkeypatch):
+    data = make_data()
+    (env / "full").mkdir()
+    for name, frame in data.items():
+        frame.to_csv(env / "full" / f"{name}.csv", index=False)
+    save_state(env / "full", env / "state", monkeypatch)
+    monkeypatch.setenv("STATE_PATH", str(env / "state"))
+
+    script = ("import sys, cli; cli.main(['query', '--book', 'Book 1']); "
+              "print([name for name in ('pandas', 'numpy', 'pyarrow') if name in sys.modules])")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert '"name": "Book 1"' in result.stdout
+    assert result.stdout.strip().endswith("[]")
+
+
+def test_query_command_rejects_unknown_match_modes(capsys):
+    parser = cli.build_parser()
+    assert parser.parse_args(["query", "--book", "Dune", "--match", "prefix"]).match == "prefix"
+    with pytest.raises(SystemExit):
+        parser.parse_args(["query", "--book", "Dune", "--match", "fuzzy"])
+    assert "invalid choice: 'fuzzy'" in capsys.readouterr().err
+
+
+def test_query_index_splits_categories_like_eda(env):
+    data = pd.DataFrame({
+        "Title": ["Dune", "Emma", "Ulises"],
+        "authors": ["Frank Herbert", "Jane Austen", "James Joyce"],
+        "categories": ["Arts, crafts, and hobbies, Fiction", "Fiction", "History, general"],
+        "compound": [0.5, -0.25, 0.0],
+    })
+    indexes = IncidenceIndexes(data)
+    query = SentimentQueryIndex.from_data(data, indexes=indexes)
+    assert sorted(EDA(data, indexes=indexes)._popular_categories(10)["Category"]) == sorted(indexes.categories().items)
+    assert query.category_sentiment("Arts, crafts, and hobbies")[0]["reviews"] == 1
+    assert query.category_sentiment("Fiction")[0]["average_compound"] == pytest.approx(0.125)
+    assert query.category_sentiment("History, general")[0]["reviews"] == 1
+    assert query.category_sentiment("crafts") == []
+
+
+def test_apply_delta_rejects_states_with_another_category_split(env, monkeypatch):
+    data = make_data()
+    (env / "full").mkdir()
+    for name, frame in data.items():
+        frame.to_csv(env / "full" / f"{name}.csv", index=False)
+    updater = save_state(env / "full", env / "state", monkeypatch)
+    data["books_rating"].iloc[:10].to_csv(env / "delta.csv", index=False)
+
+    manifest_path = env / "state" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    del manifest["category_pattern"]  # Estado guardado antes de separar las categorías como EDA
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="separa las categorías"):
+        updater.apply_delta(str(env / "delta.csv"), export=False)
@@ -0,0 +1,55 @@
+import sys
+import pytest
+from src.metrics import MetricsRecorder
+
+
+def allocate_and_free(size: int):
+    block = bytearray(size)
+    del block
+
+
+def test_traced_peak_catches_spikes_between_samples(monkeypatch):
+    # Sin muestras durante la etapa: el pico solo puede venir de tracemalloc
+    monkeypatch.setattr(MetricsRecorder, "SAMPLE_INTERVAL", 60)
+    recorder = MetricsRecorder(enabled=True, live=False, trace_memory=True)
+    with recorder.stage("outer") as outer:
+        allocate_and_free(30 * 2**20)
+        with recorder.stage("inner") as inner:
+            allocate_and_free(10 * 2**20)
+        with recorder.stage("later") as later:
+            pass
+    assert outer.peak_traced >= 30 * 2**20
+    assert 10 * 2**20 <= inner.peak_traced < 30 * 2**20
+    assert later.peak_traced < 10 * 2**20
+    assert recorder.report()["stages"][0]["traced_peak_mb"] >= 30
+
+
+def test_without_proc_or_resource(monkeypatch):
+    # Sin /proc (macOS, Windows) no hay memoria actual, y sin 'resource' (Windows) tampoco máximo del proceso
+    def no_proc(*args, **kwargs):
+        raise OSError("sin /proc")
+
+    recorder = MetricsRecorder(enabled=True, live=True, trace_memory=False)
+    monkeypatch.setattr("builtins.open", no_proc)
+    monkeypatch.setitem(sys.modules, "resource", None)
+    assert MetricsRecorder.rss() is None
+    assert MetricsRecorder.process_peak_rss() is None
+
+    with recorder.stage("stage"):
+        pass
+    report = recorder.report()
+    assert report["peak_rss_mb"] is None and report["process_peak_rss_mb"] is None
+    assert report["stages"][0]["peak_rss_mb"] is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Solo Linux expone la memoria actual en /proc")
+def test_stage_peak_is_not_the_process_high_water_mark():
+    recorder = MetricsRecorder(enabled=True, live=False, trace_memory=False)
+    with recorder.stage("heavy"):
+        block = b"x" * (200 * 2**20)
+        recorder._update_peaks(list(recorder._open))
+        del block
+    with recorder.stage("light") as light:
+        pass
+    heavy = recorder.stages[0]
+    assert light.peak_rss < heavy.peak_rss - 100 * 2**20
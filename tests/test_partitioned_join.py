@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+from src.data_loader import DataLoader
+from src.partitioned_join import PartitionedJoin
+from src.preview import StratifiedSampler
+from tests.helpers import as_plain, assert_same_rows, reference_process
+
+
+def prepared_inputs(data: dict):
+    """
+    'books_data' limpio y codificado, y bloques de 'books_rating', como los recibe PartitionedJoin.
+    """
+    books = data["books_data"][DataLoader.BOOKS_DATA_COLUMNS].copy()
+    for column in ("authors", "categories"):
+        books[column] = DataLoader.clean_series(books[column])
+    ratings = data["books_rating"][DataLoader.BOOKS_RATING_COLUMNS]
+    chunks = [ratings.iloc[start:start + 60] for start in range(0, len(ratings), 60)]
+    return DataLoader.encode_columns(books), chunks
+
+
+def test_partitions_are_streamed(data_files, env, monkeypatch):
+    books, chunks = prepared_inputs(data_files)
+    join = PartitionedJoin(books, n_partitions=8, n_workers=2, spill_path=str(env / "spill"))
+    joined = []
+    original = PartitionedJoin._join_partition
+    monkeypatch.setattr(PartitionedJoin, "_join_partition",
+                        lambda self, partition: joined.append(partition) or original(self, partition))
+
+    parts, joined_at_yield = [], []
+    for merged, unmatched in join.partitions(chunks):
+        joined_at_yield.append(len(joined))
+        parts.append((merged, unmatched))
+    # Cada partición se entrega antes de unir todas las siguientes: como mucho n_workers por delante
+    assert joined_at_yield[0] <= 2 and len(parts) > 2
+    assert all(len(merged) < sum(len(part[0]) for part in parts) for merged, _ in parts)
+    assert not list((env / "spill").iterdir())
+
+    merged = pd.concat([part[0] for part in parts]).sort_values([PartitionedJoin.BOOK, PartitionedJoin.ROW])
+    merged = merged.drop(columns=[PartitionedJoin.BOOK, PartitionedJoin.ROW])
+    unmatched = PartitionedJoin.combine_unmatched([part[1] for part in parts])
+    assert_same_rows((merged, unmatched), reference_process(data_files))
+
+
+def test_join_matches_in_memory_merge(data_files, env):
+    books, chunks = prepared_inputs(data_files)
+    result = PartitionedJoin(books, n_partitions=5, n_workers=3, spill_path=str(env / "spill")).join(chunks)
+    assert_same_rows(result, reference_process(data_files))
+
+
+@pytest.mark.parametrize("join_partitions", [0, 6])
+def test_preview_sample_streams_partitions(data_files, join_partitions):
+    # La muestra no depende del orden de carga: la misma con la unión en memoria y por particiones
+    samples = []
+    for streaming in (False, True):
+        loader = DataLoader(chunksize=50, join_partitions=join_partitions if streaming else 0)
+        sampler = StratifiedSampler(size=40, seed=1)
+        sample, _ = loader.process_data(loader.load_data(streaming=streaming), sampler)
+        samples.append(as_plain(sample).sort_values(list(sample.columns)).reset_index(drop=True))
+    pd.testing.assert_frame_equal(*samples, check_dtype=False)
+    assert len(samples[0]) < len(reference_process(data_files)[0])
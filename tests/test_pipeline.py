@@ -0,0 +1,70 @@
+from collections import Counter
+import pytest
+from src.pipeline import Pipeline, PipelineError, Stage
+
+
+def build(tmp_path, calls: Counter, fail: set, run_key: str = "data-1") -> Pipeline:
+    """
+    Flujo de ejemplo: load -> (left, right) -> report, con puntos de control en las tres primeras etapas.
+    """
+    def stage(name, value):
+        def function(**inputs):
+            calls[name] += 1
+            if name in fail:
+                raise RuntimeError(f"fallo en {name}")
+            return value(**inputs)
+        return function
+
+    return Pipeline([
+        Stage("load", stage("load", lambda: [1, 2, 3]), checkpoint=True),
+        Stage("left", stage("left", lambda load: sum(load)), ["load"], checkpoint=True),
+        Stage("right", stage("right", lambda load: max(load)), ["load"], checkpoint=True),
+        Stage("report", stage("report", lambda left, right: f"{left}/{right}"), ["left", "right"], main_thread=True),
+    ], checkpoint_path=str(tmp_path / "checkpoints"), n_workers=2, run_key=run_key)
+
+
+def test_resume_reuses_completed_stages(env):
+    calls = Counter()
+    with pytest.raises(PipelineError, match="report"):
+        build(env, calls, fail={"report"}).run()
+    assert calls == Counter(load=1, left=1, right=1, report=1)
+
+    results = build(env, calls, fail=set()).run()
+    assert results["report"] == "6/3"
+    # Solo se repite la etapa que falló; sus dependencias salen de los puntos de control
+    assert calls == Counter(load=1, left=1, right=1, report=2)
+    # Tras una ejecución completa no quedan puntos de control
+    assert not list((env / "checkpoints").glob("*.pkl"))
+
+
+def test_only_missing_dependencies_run_again(env):
+    calls = Counter()
+    with pytest.raises(PipelineError, match="right"):
+        build(env, calls, fail={"right"}).run()
+    assert calls["report"] == 0
+
+    build(env, calls, fail=set()).run()
+    assert calls == Counter(load=1, left=1, right=2, report=1)
+
+
+def test_checkpoints_of_other_data_or_without_resume_are_ignored(env):
+    calls = Counter()
+    with pytest.raises(PipelineError):
+        build(env, calls, fail={"report"}).run()
+    build(env, calls, fail=set(), run_key="data-2").run()
+    assert calls["load"] == 2
+
+    with pytest.raises(PipelineError):
+        build(env, calls, fail={"report"}).run()
+    build(env, calls, fail=set()).run(resume=False)
+    assert calls["load"] == 4
+
+
+def test_targets_select_only_their_dependencies(env):
+    calls = Counter()
+    pipeline = build(env, calls, fail=set())
+    assert pipeline.select(["left"]) == ["load", "left"]
+    assert pipeline.run(["left"]) == {"load": [1, 2, 3], "left": 6}
+    assert calls == Counter(load=1, left=1)
+    with pytest.raises(ValueError):
+        pipeline.select(["unknown"])
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.preview import PreviewEstimator, StratifiedSampler
+
+
+def make_population(n_rows: int = 4000, seed: int = 0) -> pd.DataFrame:
+    """
+    Reseñas sintéticas distintas entre sí, con títulos de todos los niveles de popularidad y la
+    puntuación y el sentimiento correlacionados con el estrato.
+    """
+    rng = np.random.default_rng(seed)
+    ratings_count = rng.choice([np.nan, 0, 5, 50, 500, 5000], size=n_rows, p=[0.1, 0.1, 0.3, 0.3, 0.15, 0.05])
+    level = np.nan_to_num(np.log10(np.maximum(ratings_count, 1)))
+    scores = np.clip(np.round(rng.normal(2.5 + level / 2, 1.0)), 1, 5)
+    compound = np.clip(rng.normal(level / 5 - 0.2, 0.4), -1, 1)
+    compound[rng.random(n_rows) < 0.1] = np.nan
+    return pd.DataFrame({
+        "Id": np.arange(n_rows),
+        "Title": np.array([f"Libro {i}" for i in range(8)])[rng.integers(0, 8, n_rows)],
+        "ratingsCount": ratings_count,
+        "review/score": scores,
+        "compound": compound,
+    })
+
+
+def sample(population: pd.DataFrame, size: int, seed: int, chunk_size: int = 1000) -> StratifiedSampler:
+    sampler = StratifiedSampler(size=size, seed=seed)
+    for start in range(0, len(population), chunk_size):
+        sampler.add(population.iloc[start:start + chunk_size])
+    return sampler
+
+
+def test_sample_does_not_depend_on_chunk_size(env):
+    population = make_population(2000)
+    reference = sample(population, size=250, seed=7, chunk_size=len(population))
+    for chunk_size in (13, 250, 999):
+        sampler = sample(population, size=250, seed=7, chunk_size=chunk_size)
+        pd.testing.assert_frame_equal(sampler.sample(), reference.sample())
+        np.testing.assert_array_equal(sampler.codes, reference.codes)
+        np.testing.assert_array_equal(sampler.weights(), reference.weights())
+    assert not sample(population, size=250, seed=8).sample()["Id"].equals(reference.sample()["Id"])
+
+
+def test_full_sample_gives_exact_totals_with_zero_width(env):
+    population = make_population(1000)
+    sampler = sample(population, size=5 * len(population), seed=3)
+    assert len(sampler.sample()) == len(population)
+    estimator = PreviewEstimator(sampler, confidence=0.95)
+    data = sampler.sample()
+
+    total = estimator.total(data["review/score"])
+    assert total["estimate"] == pytest.approx(population["review/score"].sum())
+    assert total["low"] == pytest.approx(total["estimate"]) and total["high"] == pytest.approx(total["estimate"])
+
+    mean = estimator.mean(data["compound"])
+    assert mean["estimate"] == pytest.approx(population["compound"].mean())
+    assert mean["high"] - mean["low"] == pytest.approx(0.0, abs=1e-12)
+
+    groups = estimator.group_totals(data["Title"])
+    counts = population["Title"].value_counts()
+    np.testing.assert_allclose(groups["estimate"].to_numpy(), counts[groups.index].to_numpy())
+    np.testing.assert_allclose(groups["high"] - groups["low"], 0.0, atol=1e-9)
+
+
+def test_group_totals_match_indicator_totals(env):
+    sampler = sample(make_population(), size=400, seed=1)
+    estimator = PreviewEstimator(sampler)
+    titles = sampler.sample()["Title"]
+    groups = estimator.group_totals(titles)
+    for title, row in groups.iterrows():
+        expected = estimator.total((titles == title).to_numpy())
+        assert row.to_dict() == pytest.approx(expected)
+
+
+def test_mean_uses_linearized_ratio_variance(env):
+    sampler = sample(make_population(), size=400, seed=2)
+    estimator = PreviewEstimator(sampler)
+    values = sampler.sample()["compound"].to_numpy()
+    present = ~np.isnan(values)
+
+    # Estimador de cociente calculado a mano, estrato por estrato
+    population, sizes, codes = estimator.population, estimator.sizes, estimator.codes
+    total = sum(population[h] * np.nansum(values[codes == h]) / sizes[h] for h in range(5) if sizes[h])
+    count = sum(population[h] * present[codes == h].sum() / sizes[h] for h in range(5) if sizes[h])
+    ratio = total / count
+    residuals = np.where(present, values - ratio, 0.0)
+    variance = sum(
+        population[h] ** 2 * (1 - sizes[h] / population[h]) * residuals[codes == h].var(ddof=1) / sizes[h]
+        for h in range(5) if sizes[h] > 1
+    ) / count ** 2
+
+    mean = estimator.mean(values)
+    assert mean["estimate"] == pytest.approx(ratio)
+    assert mean["high"] - mean["estimate"] == pytest.approx(estimator.z * np.sqrt(variance))
+
+
+def test_intervals_cover_the_true_values(env):
+    population = make_population()
+    true_total = population["review/score"].sum()
+    true_mean = population["compound"].mean()
+    true_group = (population["Title"] == "Libro 0").sum()
+
+    repetitions = 200
+    covered = {"total": 0, "mean": 0, "group": 0}
+    for seed in range(repetitions):
+        sampler = sample(population, size=300, seed=seed, chunk_size=len(population))
+        estimator = PreviewEstimator(sampler, confidence=0.9)
+        data = sampler.sample()
+        total = estimator.total(data["review/score"])
+        mean = estimator.mean(data["compound"])
+        group = estimator.group_totals(data["Title"]).loc["Libro 0"]
+        covered["total"] += total["low"] <= true_total <= total["high"]
+        covered["mean"] += mean["low"] <= true_mean <= mean["high"]
+        covered["group"] += group["low"] <= true_group <= group["high"]
+
+    # Cobertura nominal del 90 %; con 200 repeticiones, el error estándar es de unos 2 puntos
+    for name, hits in covered.items():
+        assert 0.82 <= hits / repetitions <= 0.97, name
@@ -0,0 +1,74 @@
+import itertools
+import pandas as pd
+import pytest
+from src.sentiment_analysis import SentimentAnalysis
+from src.sentiment_cache import SentimentScoreCache
+
+REVIEWS = ["Great book!", "Terrible.", "Great book!", "great   book!\n", None, "", "It was ok", "Terrible."]
+
+
+def score(cache: SentimentScoreCache, engine: str = "vader") -> pd.DataFrame:
+    analyzer = SentimentAnalysis(pd.DataFrame({"review/text": REVIEWS}), score_cache=cache, engine=engine)
+    analyzer.preprocess_text()
+    return analyzer.calculate_sentiment_scores()
+
+
+def test_text_key_ignores_whitespace_only():
+    key = SentimentScoreCache.text_key
+    assert key("great book!") == key("  great\tbook!\n") == key("great   book!")
+    assert key("great book!") != key("greatbook!") != key("Great book!")
+
+
+def test_second_run_hits_every_row(env, monkeypatch):
+    cache = SentimentScoreCache()
+    first = score(cache)
+    # Textos distintos tras pasar a minúsculas: 'great book!' (con sus variantes de espacios), 'terrible.', '' y 'it was ok'
+    assert cache.stats() == {"hits": 0, "misses": 5, "evictions": 0, "size": 4}
+    cache.close()
+
+    def no_scoring(self, reviews):
+        raise AssertionError(f"Textos puntuados de nuevo: {reviews}")
+
+    monkeypatch.setattr(SentimentAnalysis, "_polarity_scores", no_scoring)
+    cache = SentimentScoreCache()
+    second = score(cache)
+    assert cache.stats() == {"hits": 5, "misses": 0, "evictions": 0, "size": 4}
+    pd.testing.assert_series_equal(second["compound"], first["compound"])
+    pd.testing.assert_series_equal(second["Sentiment"], first["Sentiment"])
+    cache.close()
+
+
+def test_eviction_keeps_the_most_recently_used(env, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr("src.sentiment_cache.time.time_ns", lambda: next(clock))
+    scores = {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
+
+    def stored(cache):  # Sin get_many, que actualizaría 'last_used'
+        return {row[0] for row in cache.connection.execute("SELECT key FROM scores")}
+
+    cache = SentimentScoreCache(max_entries=3)
+    for key in (1, 2, 3):
+        cache.put_many({key: scores})
+    assert set(cache.get_many([1])) == {1}  # 1 pasa a ser el más reciente; 2 es ahora el más antiguo
+    cache.put_many({4: scores})
+    assert stored(cache) == {1, 3, 4}
+    cache.get_many([3])
+    cache.put_many({5: scores, 6: scores})
+    assert stored(cache) == {3, 5, 6}
+    assert cache.size() == 3 and cache.evictions == 3
+    cache.close()
+
+
+def test_engines_never_share_scores(env):
+    vader = SentimentScoreCache(engine="vader")
+    batch = SentimentScoreCache(engine="batch")
+    assert vader.cache_file != batch.cache_file
+    score(vader, "vader")
+    assert vader.size() == 4 and batch.size() == 0
+
+    score(batch, "batch")
+    assert batch.stats()["hits"] == 0 and batch.size() == 4
+    with pytest.raises(ValueError):
+        SentimentAnalysis(pd.DataFrame({"review/text": REVIEWS}), score_cache=vader, engine="batch")
+    vader.close()
+    batch.close()
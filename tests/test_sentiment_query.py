@@ -0,0 +1,87 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+import pandas as pd
+import pytest
+from src.sentiment_query import SentimentQueryIndex
+
+
+@pytest.fixture
+def index(env):
+    books = pd.DataFrame({"n_compound": [2, 1, 0], "sum_compound": [1.2, -0.5, 0.0]},
+                         index=["Dune", "Dune Messiah", "Empty"])
+    categories = pd.DataFrame({"n_compound": [3], "sum_compound": [0.7]}, index=["Fiction"])
+    return SentimentQueryIndex(books, categories)
+
+
+@pytest.fixture
+def server(index):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), index._handler_class())
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, body=None):
+    """
+    Hace una petición y devuelve el código de estado y el cuerpo JSON, también en las respuestas de error.
+    """
+    data = body if body is None or isinstance(body, bytes) else json.dumps(body).encode()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_lookups(index):
+    assert index.book_sentiment("Dune")[0]["reviews"] == 2
+    assert [result["name"] for result in index.book_sentiment("dune", "prefix")] == ["Dune", "Dune Messiah"]
+    assert index.book_sentiment("DUNE", "ignore_case")[0]["average_compound"] == pytest.approx(0.6)
+    assert index.book_sentiment("Empty")[0]["sentiment"] is None
+    assert index.category_sentiment("Fiction")[0]["reviews"] == 3
+
+
+def test_results_are_copies_of_the_cache(index):
+    index.book_sentiment("Dune")[0]["reviews"] = -1
+    index.book_sentiment("Dune").clear()
+    assert index.book_sentiment("Dune")[0]["reviews"] == 2
+    assert index.cache_stats()["hits"] == 2
+
+
+@pytest.mark.parametrize("arguments", [
+    (["Dune"], "exact", None), ("Dune", "fuzzy", None), ("Dune", ["exact"], None),
+    ("Dune", "prefix", -1), ("Dune", "prefix", "5"), ("Dune", "prefix", 2.5),
+])
+def test_invalid_queries_raise_value_error(index, arguments):
+    with pytest.raises(ValueError):
+        index.book_sentiment(*arguments)
+
+
+def test_server_answers(server):
+    assert request(f"{server}/book?title=Dune")[1][0]["name"] == "Dune"
+    assert request(f"{server}/category?name=fic&match=prefix&limit=1") == (200, request(f"{server}/category?name=Fiction")[1])
+    status, payload = request(f"{server}/batch", {"books": ["Dune"], "categories": ["Fiction"], "limit": 1})
+    assert status == 200 and payload["books"]["Dune"][0]["reviews"] == 2
+    assert request(f"{server}/unknown")[0] == 404
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/book?title=Dune&limit=abc", None),
+    ("/book?title=Dune&limit=-3", None),
+    ("/book?title=Dune&match=fuzzy", None),
+    ("/batch", b"not json"),
+    ("/batch", ["Dune"]),
+    ("/batch", {"books": "Dune"}),
+    ("/batch", {"books": [["Dune"]]}),
+    ("/batch", {"categories": [{"name": "Fiction"}]}),
+    ("/batch", {"books": ["Dune"], "limit": "2"}),
+    ("/batch", {"books": ["Dune"], "limit": -1}),
+])
+def test_server_rejects_invalid_requests_with_400(server, path, body):
+    status, payload = request(server + path, body)
+    assert status == 400 and "error" in payload
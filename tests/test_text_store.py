@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from src.key_index import KeyIndex
+from src.text_store import TextStore
+
+
+def test_same_text_gets_same_id(tmp_path):
+    store = TextStore.create(str(tmp_path / "texts"))
+    first = store.add(["a", None, "b", "a", "ñandú"])
+    second = store.add(["b", "c", np.nan, "ñandú"])
+    store = store.finish()
+
+    assert first.tolist() == [0, -1, 1, 0, 2]
+    assert second.tolist() == [1, 3, -1, 2]
+    assert len(store) == 4
+    assert store.get(np.concatenate([first, second])) == ["a", None, "b", "a", "ñandú", "b", "c", None, "ñandú"]
+
+
+def test_hash_collisions_keep_texts_apart(tmp_path, monkeypatch):
+    # Todos los textos con el mismo hash: solo la comparación de bytes los distingue
+    monkeypatch.setattr(pd.util, "hash_array", lambda values: np.zeros(len(values), dtype=np.uint64))
+    store = TextStore.create(str(tmp_path / "texts"))
+    ids = [store.add(batch) for batch in (["x", "y"], ["y", "z"], ["x", "z", "w"])]
+    store = store.finish()
+
+    assert [batch.tolist() for batch in ids] == [[0, 1], [1, 2], [0, 2, 3]]
+    assert store.get(range(4)) == ["x", "y", "z", "w"]
+
+
+def test_key_index_matches_a_dict():
+    rng = np.random.default_rng(0)
+    index, expected = KeyIndex(), {}
+    for batch in range(40):
+        keys = np.unique(rng.integers(0, 2**64, size=rng.integers(0, 200), dtype=np.uint64))
+        keys = keys[~np.isin(keys, np.fromiter(expected, dtype=np.uint64, count=len(expected)))]
+        values = np.arange(len(expected), len(expected) + len(keys))
+        index.add(keys, values)
+        expected.update(zip(keys.tolist(), values.tolist()))
+
+        probes = np.concatenate([np.fromiter(expected, dtype=np.uint64, count=len(expected)),
+                                 rng.integers(0, 2**64, size=50, dtype=np.uint64)])
+        found, values = index.find(probes)
+        assert found.tolist() == [key in expected for key in probes.tolist()]
+        assert values[found].tolist() == [expected[key] for key in probes[found].tolist()]
+    assert len(index) == len(expected)
+    assert len(index._runs) <= np.log2(len(expected)) + 1
@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+from src.data_loader import DataLoader
+from src.title_resolver import TitleResolver
+from tests.helpers import assert_same_rows, make_data, reference_process
+
+BOOKS = pd.Series([
+    "The Hobbit", "Café de Flore", "Harry Potter and the Sorcerer's Stone", "Night Train North",
+    "Night Train South", "Dune", "DUNE!", None,
+])
+
+
+def decisions(resolver: TitleResolver, titles: list) -> list:
+    resolver.resolve(pd.Series(titles, dtype=object))
+    return [resolver._decisions.get(title, (title, "exact", 1.0))[:2] for title in titles]
+
+
+def test_normalized_keys():
+    resolver = TitleResolver(BOOKS, fuzzy=False)
+    titles = ["The Hobbit", "the  hobbit", "CAFE DE FLORE", "Harry Potter and the Sorcerers Stone", "dune", "The Hobit"]
+    assert decisions(resolver, titles) == [
+        ("The Hobbit", "exact"),
+        ("The Hobbit", "normalized"),
+        ("Café de Flore", "normalized"),
+        ("Harry Potter and the Sorcerer's Stone", "normalized"),
+        (None, "ambiguous"),  # 'Dune' y 'DUNE!' comparten clave
+        (None, "unmatched"),  # Sin coincidencia aproximada
+    ]
+
+
+def test_fuzzy_matches_above_the_threshold():
+    resolver = TitleResolver(BOOKS, threshold=0.8)
+    titles = ["The Hobit", "Hary Potter and the Sorcerers Stone", "Night Train", "Dune Messiah", "Cafe de Flore"]
+    result = decisions(resolver, titles)
+    assert result[:2] == [("The Hobbit", "fuzzy"), ("Harry Potter and the Sorcerer's Stone", "fuzzy")]
+    assert result[2:4] == [(None, "unmatched"), (None, "unmatched")]
+    assert result[4] == ("Café de Flore", "normalized")
+    assert all(0.8 <= confidence <= 1 for _, method, confidence in resolver._decisions.values() if method == "fuzzy")
+
+
+def test_fuzzy_ties_stay_unmatched():
+    # Igual de parecido a los dos trenes nocturnos: no se elige ninguno
+    resolver = TitleResolver(BOOKS, threshold=0.6)
+    assert decisions(resolver, ["Night Train East"]) == [(None, "ambiguous")]
+
+
+def test_resolve_keeps_exact_and_null_titles():
+    resolver = TitleResolver(BOOKS)
+    titles = pd.Series(["Dune", None, "the hobbit", "Nothing like it"], index=[10, 11, 12, 13], dtype=object)
+    resolved = resolver.resolve(titles)
+    assert resolved.tolist() == ["Dune", None, "The Hobbit", "Nothing like it"]
+    assert resolved.index.tolist() == [10, 11, 12, 13]
+    matches = resolver.matches()
+    assert matches[["Title", "Resolved Title", "Method", "Rows"]].values.tolist() == [["the hobbit", "The Hobbit", "normalized", 1]]
+
+
+def test_invalid_threshold():
+    with pytest.raises(ValueError):
+        TitleResolver(BOOKS, threshold=0)
+
+
+@pytest.fixture
+def misspelled_files(env):
+    """
+    Archivos de ejemplo con parte de los títulos de las reseñas en minúsculas o con una errata.
+    """
+    data = make_data()
+    titles = data["books_rating"]["Title"].copy()
+    every = titles.index % 5
+    lowered = (every == 1) & titles.notna()
+    titles[lowered] = titles[lowered].str.lower()
+    titles[(every == 2) & (titles == "Book 12")] = "Bok 12"
+    data["books_rating"] = data["books_rating"].assign(Title=titles)
+    for name, frame in data.items():
+        frame.to_csv(env / "data" / f"{name}.csv", index=False)
+    # Releídos del CSV, donde los textos vacíos pasan a ser nulos
+    return {name: pd.read_csv(env / "data" / f"{name}.csv") for name in data}
+
+
+def test_exact_mode_is_unchanged(misspelled_files):
+    loader = DataLoader(chunksize=53, title_matching="exact")
+    assert_same_rows(loader.process_data(loader.load_data(streaming=True)), reference_process(misspelled_files))
+    assert loader.title_resolver is None
+
+
+@pytest.mark.parametrize("mode", ["normalized", "fuzzy"])
+@pytest.mark.parametrize("streaming", [False, True])
+def test_loader_recovers_titles(misspelled_files, monkeypatch, mode, streaming):
+    monkeypatch.setenv("TITLE_MATCH_THRESHOLD", "0.6")
+    loader = DataLoader(chunksize=53, title_matching=mode)
+    merged, unmatched = loader.process_data(loader.load_data(streaming=streaming))
+
+    ratings = misspelled_files["books_rating"]
+    books = {title.lower(): title for title in misspelled_files["books_data"]["Title"].dropna()}
+    if mode == "fuzzy":
+        books["Bok 12"] = "Book 12"
+    resolved = ratings["Title"].map(lambda title: books.get(title, title))
+    expected = reference_process({**misspelled_files, "books_rating": ratings.assign(Title=resolved)})
+    assert_same_rows((merged, unmatched), expected)
+    assert (ratings["Title"] == "Bok 12").any()
+    assert ("Bok 12" in unmatched["Title"].tolist()) == (mode == "normalized")
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.topk import TopK, bottom_k, top_k, top_k_positions
+
+
+def make_values(n_rows: int, seed: int) -> np.ndarray:
+    """
+    Valores con muchos empates, nulos y ceros con signo.
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.integers(-5, 6, n_rows).astype(np.float64) / 2
+    values[rng.random(n_rows) < 0.2] = np.nan
+    values[rng.random(n_rows) < 0.05] = -0.0
+    return values
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [0, 1, 7, 60, 250])
+@pytest.mark.parametrize("ascending", [False, True])
+def test_matches_stable_sort(seed, k, ascending):
+    values = make_values(200, seed)
+    frame = pd.DataFrame({"Title": [f"Libro {i}" for i in range(len(values))], "score": values})
+    ordered = frame.sort_values("score", ascending=ascending, kind="stable")
+
+    pd.testing.assert_frame_equal(top_k(frame, k, by="score", ascending=ascending), ordered.head(k))
+    pd.testing.assert_frame_equal(bottom_k(frame, k, by="score", ascending=ascending), ordered.tail(k))
+    pd.testing.assert_series_equal(top_k(frame["score"], k, ascending=ascending), ordered["score"].head(k))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 13, 64])
+def test_partitions_merge_like_a_single_pass(chunk_size):
+    values = make_values(500, 9)
+    for ascending in (False, True):
+        expected = pd.Series(values).sort_values(ascending=ascending, kind="stable").index[:40].to_numpy()
+        np.testing.assert_array_equal(top_k_positions(values, 40, ascending, chunk_size=chunk_size), expected)
+
+
+def test_update_by_blocks_keeps_k_candidates():
+    values = make_values(300, 3)
+    accumulator = TopK(10)
+    for start in range(0, len(values), 17):
+        accumulator.update(values[start:start + 17], np.arange(start, min(start + 17, len(values))))
+        assert len(accumulator.values) <= 10
+    np.testing.assert_array_equal(accumulator.positions, top_k_positions(values, 10))
+
+
+def test_all_missing_values_keep_their_order():
+    values = np.full(6, np.nan)
+    np.testing.assert_array_equal(top_k_positions(values, 4), [0, 1, 2, 3])
+    np.testing.assert_array_equal(bottom_k(pd.Series(values), 2).index, [4, 5])